@@ -1,11 +1,39 @@
 import json
+import os
+import tempfile
+import time
+from dataclasses import asdict
 from datetime import date
+from hashlib import sha256
+from pathlib import Path
+from typing import Iterator
 
-from models.positions_data import PositionsData
+from pydantic import TypeAdapter
+
+from entities.financial_metrics import FinancialMetrics
+from entities.positions_table import PositionsTable
+from models.basket_engine import BasketEngine
+from models.basket_grouping import BasketGrouping
+from models.financial_metrics_export import ExportFormat, ExportLayout
+from models.performativ_api import PostSubmitPayload
+from models.performativ_resource import PerformativResource
+from models.reporting_window import ReportingPeriod, ReportingWindow
 from repositories.enviroment_loader import config
 from repositories.performativ_api_repo import PerformativApiRepo
 from repositories.positions_data_repo import PositionsDataRepo
+from repositories.result_cache_repo import ResultCacheRepo
+from repositories.spill_repo import SpillRepo
+from repositories.submit_fingerprint_repo import SubmitFingerprintRepo
+from services.analytics_calculator import AnalyticsCalculator
+from services.attribution_calculator import DEFAULT_TOP_CONTRIBUTORS, AttributionCalculator
+from services.delta_submitter import DeltaSubmitter
 from services.financial_metrics_calculator import FinancialMetricsCalculator
+from services.memory_tracker import MemoryTracker
+from services.risk_calculator import DEFAULT_VAR_CONFIDENCE, RiskCalculator
+from services.streaming_resource_loader import StreamingResourceLoader
+
+SPILLED_PAYLOAD_FILE_NAME = "payload.json"
+WINDOWS_PAYLOADS_ADAPTER = TypeAdapter(dict[str, PostSubmitPayload])
 
 
 class MainController:
@@ -18,17 +46,87 @@ class MainController:
         positions_data_repo: PositionsDataRepo | None = None,
         financial_metrics_calculator: FinancialMetricsCalculator | None = None,
         performativ_api_repo: PerformativApiRepo | None = None,
+        result_cache_repo: ResultCacheRepo | None = None,
+        export_file: str | None = None,
+        export_layout: ExportLayout = ExportLayout.LONG,
+        export_format: ExportFormat = ExportFormat.ARROW,
+        analytics_window: int | None = None,
+        streaming_startup: bool = False,
+        streaming_resource_loader: StreamingResourceLoader | None = None,
+        basket_groupings: list[BasketGrouping] | None = None,
+        basket_engine: BasketEngine = BasketEngine.GROUPBY,
+        memory_report: bool = False,
+        memory_budget_bytes: int | None = None,
+        memory_tracker: MemoryTracker | None = None,
+        delta_submitter: DeltaSubmitter | None = None,
+        chunk_size: int | None = None,
+        spill_dir: str | None = None,
+        spill_repo: SpillRepo | None = None,
+        report_periods: list[ReportingPeriod] | None = None,
+        custom_windows: list[tuple[str, str, str]] | None = None,
+        risk_file: str | None = None,
+        var_confidence: float = DEFAULT_VAR_CONFIDENCE,
+        attribution_file: str | None = None,
+        attribution_top: int = DEFAULT_TOP_CONTRIBUTORS,
     ):
+        if chunk_size and export_file:
+            raise MainControllerException("Export is not available in chunked mode")
+        if analytics_window is not None and not export_file:
+            raise MainControllerException("Analytics are only written to the export and need an export file")
+        if (risk_file or attribution_file) and (chunk_size or report_periods or custom_windows):
+            raise MainControllerException(
+                "Risk and attribution are not available in chunked mode or with reporting windows"
+            )
+        if chunk_size and (report_periods or custom_windows):
+            raise MainControllerException("Reporting windows are not available in chunked mode")
+        if basket_groupings and (not export_file or chunk_size or report_periods or custom_windows):
+            raise MainControllerException(
+                "Sub-baskets are only written to the export and are not available in chunked mode or with reporting "
+                "windows"
+            )
+        self.memory_tracker = memory_tracker or MemoryTracker(memory_report, memory_budget_bytes)
+        self.path_to_positions_file = path_to_positions_file
         self._positions_data_repo = positions_data_repo or PositionsDataRepo(path_to_positions_file)
         self.start_date = self._try_parse_datestr(start_date_str)
         self.end_date = self._try_parse_datestr(end_date_str)
-        self.positions_data = self._get_positions_data()
         self.target_currency = target_currency
+        self.report_windows = self._get_report_windows(report_periods or [], custom_windows or [])
+        self.performativ_api_repo = performativ_api_repo or PerformativApiRepo()
+        self.performativ_api_repo.start_run()
+        self.result_cache_repo = result_cache_repo or self._get_default_result_cache_repo()
+        self.delta_submitter = delta_submitter or self._get_default_delta_submitter()
+        self.export_file = export_file
+        self.export_layout = export_layout
+        self.export_format = export_format
+        self.risk_file = risk_file
+        self.attribution_file = attribution_file
+        self.chunk_size = chunk_size
+        self.basket_groupings = basket_groupings or []
+        self.spill_repo = spill_repo or (
+            SpillRepo(spill_dir or tempfile.mkdtemp(prefix="financial-metrics-")) if chunk_size else None
+        )
+        # a spill directory created here is removed after the submit, a supplied one keeps the payload file
+        self._removes_spill_dir = spill_repo is None and spill_dir is None and bool(chunk_size)
+        self.performativ_resource: PerformativResource | None = None
+        with self.memory_tracker.stage("load_positions"):
+            # the cache key and the memory budget estimate need every position, a run that checks either one loads
+            # its market data after them, so a cache hit or a run over budget does not fetch it
+            if streaming_startup and self.memory_tracker.budget_bytes is None and not self._looks_up_result_cache():
+                self.positions_table, self.performativ_resource = self._stream_positions_data_and_resources(
+                    streaming_resource_loader or StreamingResourceLoader()
+                )
+            else:
+                self.positions_table = self._get_positions_table()
 
         self.financial_metrics_calculator = financial_metrics_calculator or FinancialMetricsCalculator(
-            self.positions_data
+            self.positions_table,
+            analytics_calculator=AnalyticsCalculator(analytics_window) if analytics_window is not None else None,
+            basket_groupings=basket_groupings,
+            basket_engine=basket_engine,
+            memory_tracker=self.memory_tracker,
+            risk_calculator=RiskCalculator(var_confidence) if risk_file else None,
+            attribution_calculator=AttributionCalculator(attribution_top) if attribution_file else None,
         )
-        self.performativ_api_repo = performativ_api_repo or PerformativApiRepo()
 
     def run(self) -> tuple[str, str]:
         try:
@@ -36,30 +134,268 @@ class MainController:
         except Exception as e:
             raise MainControllerException(str(e)) from e
 
+    def watch(self, poll_interval_seconds: float) -> Iterator[tuple[str, str]]:
+        # yields the result of the run, then a result every time the positions file changes, until closed
+        if self.chunk_size or self.report_windows or self.basket_groupings or self.risk_file:
+            raise MainControllerException(
+                "Watch mode is not available with chunked mode, reporting windows, sub-baskets or risk"
+            )
+        try:
+            file_state = self._get_positions_file_state()
+            watch_state, financial_metrics = self.financial_metrics_calculator.start_watch(
+                self.target_currency, self.start_date, self.end_date, self.performativ_resource
+            )
+            result = self._submit_financial_metrics(financial_metrics)
+        except Exception as e:
+            raise MainControllerException(str(e)) from e
+        yield result
+
+        while True:
+            time.sleep(poll_interval_seconds)
+            current_file_state = self._get_positions_file_state()
+            if current_file_state == file_state:
+                continue
+            file_state = current_file_state
+            try:
+                positions_table = self._get_positions_table()
+            except MainControllerException:
+                # a file caught in the middle of a save is read again on its next change
+                continue
+            # every update is a run of its own, with a fresh retry budget
+            self.performativ_api_repo.start_run()
+            try:
+                financial_metrics = self.financial_metrics_calculator.update_watch(
+                    self.target_currency, watch_state, positions_table
+                )
+                result = self._submit_financial_metrics(financial_metrics)
+            except Exception as e:
+                raise MainControllerException(str(e)) from e
+            yield result
+
+    def stream(self) -> Iterator[str]:
+        # NDJSON records of the positions and the basket, the whole payload is never built so it is not submitted
+        if (
+            self.chunk_size
+            or self.report_windows
+            or self.basket_groupings
+            or self.export_file
+            or self.risk_file
+            or self.attribution_file
+        ):
+            raise MainControllerException(
+                "NDJSON output is not available with chunked mode, reporting windows, sub-baskets, export, "
+                "risk or attribution"
+            )
+        try:
+            yield from self.financial_metrics_calculator.calculate_streamed(
+                self.target_currency, self.start_date, self.end_date, config.VALUE_PRECISION, self.performativ_resource
+            )
+        except Exception as e:
+            raise MainControllerException(str(e)) from e
+
+    def get_memory_report(self) -> str:
+        # retries and throttling of the API client are reported with the stages they slowed down
+        return self.memory_tracker.get_report(retry_metrics=asdict(self.performativ_api_repo.retry_metrics))
+
     def _try_parse_datestr(self, date_str: str) -> date:
         try:
             return date.fromisoformat(date_str)
         except Exception as e:
             raise MainControllerException("Supplied date is invalid isoformat") from e
 
-    def _get_positions_data(self) -> PositionsData:
+    def _get_report_windows(
+        self, report_periods: list[ReportingPeriod], custom_windows: list[tuple[str, str, str]]
+    ) -> list[ReportingWindow]:
+        if not report_periods and not custom_windows:
+            return []
+        # the inception window is the window of the run, it is the one submitted
+        windows = [ReportingWindow.for_period(ReportingPeriod.INCEPTION, self.end_date, self.start_date)]
+        windows += [
+            ReportingWindow.for_period(period, self.end_date, self.start_date)
+            for period in report_periods
+            if period != ReportingPeriod.INCEPTION
+        ]
+        for name, start_date_str, end_date_str in custom_windows:
+            start_date, end_date = self._try_parse_datestr(start_date_str), self._try_parse_datestr(end_date_str)
+            if not self.start_date <= start_date <= end_date <= self.end_date:
+                raise MainControllerException(f"Reporting window {name} is not within the start and end dates")
+            windows.append(ReportingWindow(name=name, start_date=start_date, end_date=end_date))
+        return windows
+
+    def _get_positions_file_state(self) -> tuple[int, int] | None:
+        try:
+            file_stat = os.stat(self.path_to_positions_file)
+        except OSError:
+            return None
+        return file_stat.st_mtime_ns, file_stat.st_size
+
+    def _get_positions_table(self) -> PositionsTable:
         try:
-            return self._positions_data_repo.get()
+            return self._positions_data_repo.get_table()
         except Exception as e:
             raise MainControllerException("Failed to load positions data from file") from e
 
+    def _stream_positions_data_and_resources(
+        self, streaming_resource_loader: StreamingResourceLoader
+    ) -> tuple[PositionsTable, PerformativResource]:
+        try:
+            positions_data, performativ_resource = streaming_resource_loader.load(
+                self._positions_data_repo.iter_positions(), self.target_currency, self.start_date, self.end_date
+            )
+            return PositionsTable.from_positions_data(positions_data), performativ_resource
+        except Exception as e:
+            raise MainControllerException("Failed to stream positions data and market data") from e
+
+    def _get_default_result_cache_repo(self) -> ResultCacheRepo | None:
+        if not config.RESULT_CACHE_DIR:
+            return None
+        return ResultCacheRepo(config.RESULT_CACHE_DIR, config.RESULT_CACHE_MAX_BYTES)
+
+    def _get_default_delta_submitter(self) -> DeltaSubmitter | None:
+        if not config.SUBMIT_DELTA_STATE_FILE:
+            return None
+        return DeltaSubmitter(self.performativ_api_repo, SubmitFingerprintRepo(config.SUBMIT_DELTA_STATE_FILE))
+
+    def _looks_up_result_cache(self) -> bool:
+        # an export or a report needs the calculated arrays, which the cached payload does not hold
+        is_reporting = self.export_file or self.risk_file or self.attribution_file
+        return (
+            self.result_cache_repo is not None and not self.chunk_size and not self.report_windows and not is_reporting
+        )
+
+    def _get_result_cache_key(self) -> str:
+        key_source = {
+            "positions": self.positions_table.fingerprint(),
+            "target_currency": self.target_currency,
+            "start_date": self.start_date.isoformat(),
+            "end_date": self.end_date.isoformat(),
+            "precision": config.VALUE_PRECISION,
+            "market_data_version": config.MARKET_DATA_VERSION,
+            "market_data_fill_policy": config.MARKET_DATA_FILL_POLICY.value,
+        }
+        return sha256(json.dumps(key_source, sort_keys=True).encode("utf-8")).hexdigest()
+
     def _run(self) -> tuple[str, str]:
+        if self.chunk_size and self.spill_repo is not None:
+            return self._run_chunked(self.chunk_size, self.spill_repo)
+        financial_metrics_result, financial_metrics_post_submit_payload = self._get_financial_metrics_result()
+        with self.memory_tracker.stage("submit"):
+            submit_result = json.dumps(self._submit(financial_metrics_post_submit_payload), indent=4)
+        return financial_metrics_result, submit_result
+
+    def _run_chunked(self, chunk_size: int, spill_repo: SpillRepo) -> tuple[str, str]:
+        # out-of-core run: the payload is assembled on disk from the spilled chunks and streamed to the API,
+        # the result is the path of the payload file instead of the payload itself
+        try:
+            if self.memory_tracker.budget_bytes is not None:
+                self.memory_tracker.check_budget(
+                    min(chunk_size, len(self.positions_table)), (self.end_date - self.start_date).days + 1
+                )
+            payload_path = self._write_spilled_payload(chunk_size, spill_repo)
+            with self.memory_tracker.stage("submit"):
+                # the file bypasses the delta submitter, clear its fingerprints so the next delta submit is full
+                if self.delta_submitter is not None:
+                    self.delta_submitter.reset()
+                submit_result = json.dumps(
+                    self.performativ_api_repo.post_submit_financial_metrics_file(payload_path), indent=4
+                )
+        finally:
+            if self._removes_spill_dir:
+                spill_repo.remove()
+        return str(payload_path), submit_result
+
+    def _write_spilled_payload(self, chunk_size: int, spill_repo: SpillRepo) -> Path:
+        try:
+            spilled_financial_metrics = self.financial_metrics_calculator.calculate_chunked(
+                self.target_currency,
+                self.start_date,
+                self.end_date,
+                spill_repo,
+                chunk_size,
+                config.VALUE_PRECISION,
+                self.performativ_resource,
+            )
+            with self.memory_tracker.stage("payload"):
+                return spill_repo.write_file(
+                    SPILLED_PAYLOAD_FILE_NAME,
+                    spilled_financial_metrics.iter_submit_api_payload(spill_repo.iter_chunks(), config.VALUE_PRECISION),
+                )
+        finally:
+            # the chunks are in the payload file once it is written, and of no use after a failed run
+            spill_repo.clear()
+
+    def _submit(self, payload: PostSubmitPayload) -> dict[str, str]:
+        if self.delta_submitter is None:
+            return self.performativ_api_repo.post_submit_financial_metrics(payload)
+        return self.delta_submitter.submit(payload)
+
+    def _get_financial_metrics_result(self) -> tuple[str, PostSubmitPayload]:
+        if self.report_windows:
+            return self._calculate_windows_result()
+        if self.result_cache_repo is None:
+            return self._calculate_financial_metrics_result()
+
+        cache_key = self._get_result_cache_key()
+        cached_result = self.result_cache_repo.get(cache_key) if self._looks_up_result_cache() else None
+        if cached_result is not None:
+            return cached_result, PostSubmitPayload.model_validate_json(cached_result)
+
+        financial_metrics_result, financial_metrics_post_submit_payload = self._calculate_financial_metrics_result()
+        self.result_cache_repo.put(cache_key, financial_metrics_result)
+        return financial_metrics_result, financial_metrics_post_submit_payload
+
+    def _calculate_financial_metrics_result(self) -> tuple[str, PostSubmitPayload]:
+        if self.memory_tracker.budget_bytes is not None:
+            # fails before any market data is requested when the run cannot fit in the memory budget
+            self.memory_tracker.check_budget(len(self.positions_table), (self.end_date - self.start_date).days + 1)
         financial_metrics = self.financial_metrics_calculator.calculate(
-            self.target_currency, self.start_date, self.end_date
+            self.target_currency, self.start_date, self.end_date, self.performativ_resource
         )
-        financial_metrics_post_submit_payload = financial_metrics.to_submit_api_payload(config.VALUE_PRECISION)
-        submit_result = json.dumps(
-            self.performativ_api_repo.post_submit_financial_metrics(financial_metrics_post_submit_payload),
-            indent=4,
+        return self._get_financial_metrics_payload(financial_metrics)
+
+    def _get_financial_metrics_payload(self, financial_metrics: FinancialMetrics) -> tuple[str, PostSubmitPayload]:
+        if self.export_file:
+            with self.memory_tracker.stage("export"):
+                financial_metrics.export(self.export_file, self.export_layout, self.export_format)
+        if self.risk_file and financial_metrics.risk is not None:
+            with open(self.risk_file, "w", encoding="utf-8") as file:
+                file.write(financial_metrics.risk.to_json(config.VALUE_PRECISION))
+        if self.attribution_file and financial_metrics.attribution is not None:
+            with open(self.attribution_file, "w", encoding="utf-8") as file:
+                file.write(financial_metrics.attribution.to_json(financial_metrics.dates, config.VALUE_PRECISION))
+        with self.memory_tracker.stage("payload"):
+            financial_metrics_post_submit_payload = financial_metrics.to_submit_api_payload(config.VALUE_PRECISION)
+            financial_metrics_result = financial_metrics_post_submit_payload.model_dump_json(indent=4)
+        return financial_metrics_result, financial_metrics_post_submit_payload
+
+    def _submit_financial_metrics(self, financial_metrics: FinancialMetrics) -> tuple[str, str]:
+        financial_metrics_result, financial_metrics_post_submit_payload = self._get_financial_metrics_payload(
+            financial_metrics
         )
-        financial_metrics_result = financial_metrics_post_submit_payload.model_dump_json(indent=4)
+        with self.memory_tracker.stage("submit"):
+            submit_result = json.dumps(self._submit(financial_metrics_post_submit_payload), indent=4)
         return financial_metrics_result, submit_result
 
+    def _calculate_windows_result(self) -> tuple[str, PostSubmitPayload]:
+        # one calculation over the union of the windows, the result holds the payload of every window
+        if self.memory_tracker.budget_bytes is not None:
+            self.memory_tracker.check_budget(len(self.positions_table), (self.end_date - self.start_date).days + 1)
+        windows_financial_metrics = self.financial_metrics_calculator.calculate_windows(
+            self.target_currency, self.report_windows, self.performativ_resource
+        )
+        inception_financial_metrics = windows_financial_metrics[ReportingPeriod.INCEPTION.value]
+        if self.export_file:
+            with self.memory_tracker.stage("export"):
+                inception_financial_metrics.export(self.export_file, self.export_layout, self.export_format)
+        with self.memory_tracker.stage("payload"):
+            windows_payloads = {
+                name: financial_metrics.to_submit_api_payload(config.VALUE_PRECISION)
+                for name, financial_metrics in windows_financial_metrics.items()
+            }
+            # serialized as model_dump_json is for a single window, missing values are written as null
+            financial_metrics_result = WINDOWS_PAYLOADS_ADAPTER.dump_json(windows_payloads, indent=4).decode("utf-8")
+        return financial_metrics_result, windows_payloads[ReportingPeriod.INCEPTION.value]
+
 
 class MainControllerException(Exception):
     pass
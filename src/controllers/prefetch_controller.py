@@ -0,0 +1,98 @@
+import json
+from datetime import date
+
+from pandas import date_range
+
+from entities.positions_table import PositionsTable
+from repositories.enviroment_loader import config
+from repositories.market_data_store_repo import MarketDataStoreRepo
+from repositories.performativ_api_repo import PerformativApiRepo
+from repositories.positions_data_repo import PositionsDataRepo
+from services.market_data_aligner import MarketDataAligner
+from services.performativ_resource_loader import PerformativResourceLoader
+
+
+class PrefetchController:
+    def __init__(
+        self,
+        start_date_str: str,
+        end_date_str: str,
+        target_currencies: list[str],
+        path_to_positions_file: str | None = None,
+        instrument_ids: list[str] | None = None,
+        currencies: list[str] | None = None,
+        store_dir: str | None = None,
+        positions_data_repo: PositionsDataRepo | None = None,
+        performativ_api_repo: PerformativApiRepo | None = None,
+        market_data_aligner: MarketDataAligner | None = None,
+        market_data_store_repo: MarketDataStoreRepo | None = None,
+    ):
+        self.start_date = self._try_parse_datestr(start_date_str)
+        self.end_date = self._try_parse_datestr(end_date_str)
+        self.target_currencies = target_currencies
+        store_dir = store_dir or config.MARKET_DATA_STORE_DIR
+        if market_data_store_repo is None and not store_dir:
+            raise PrefetchControllerException("A market data store directory is required, set MARKET_DATA_STORE_DIR")
+        self.market_data_store_repo = market_data_store_repo or MarketDataStoreRepo(store_dir)
+        self.instrument_ids = set(instrument_ids or [])
+        self.currencies = set(currencies or [])
+        if path_to_positions_file:
+            positions_table = self._get_positions_table(
+                positions_data_repo or PositionsDataRepo(path_to_positions_file)
+            )
+            self.instrument_ids |= {str(instrument_id) for instrument_id in positions_table.instrument_ids.tolist()}
+            self.currencies |= set(positions_table.instrument_currencies.tolist())
+        if not self.instrument_ids and not self.currencies:
+            raise PrefetchControllerException("Nothing to prefetch, supply a positions file, instruments or currencies")
+        self.performativ_api_repo = performativ_api_repo or PerformativApiRepo()
+        self.market_data_aligner = market_data_aligner or MarketDataAligner(config.MARKET_DATA_FILL_POLICY)
+
+    def run(self) -> str:
+        try:
+            return self._run()
+        except Exception as e:
+            raise PrefetchControllerException(str(e)) from e
+
+    def _try_parse_datestr(self, date_str: str) -> date:
+        try:
+            return date.fromisoformat(date_str)
+        except Exception as e:
+            raise PrefetchControllerException("Supplied date is invalid isoformat") from e
+
+    def _get_positions_table(self, positions_data_repo: PositionsDataRepo) -> PositionsTable:
+        try:
+            return positions_data_repo.get_table()
+        except Exception as e:
+            raise PrefetchControllerException("Failed to load positions data from file") from e
+
+    def _get_fx_pairs(self) -> list[str]:
+        return sorted(
+            f"{currency}{target_currency}"
+            for currency in self.currencies
+            for target_currency in self.target_currencies
+            if currency != target_currency
+        )
+
+    def _run(self) -> str:
+        # every instrument and FX pair is requested concurrently, under the client policy of the API repo
+        instrument_ids = sorted(self.instrument_ids)
+        fx_pairs = self._get_fx_pairs()
+        resource_loader = PerformativResourceLoader(PositionsTable.from_records([]), self.performativ_api_repo)
+        resource = resource_loader.load_universe_resources(instrument_ids, fx_pairs, self.start_date, self.end_date)
+        market_data = self.market_data_aligner.align(resource, date_range(self.start_date, self.end_date))
+        self.market_data_store_repo.save(market_data)
+        return json.dumps(
+            {
+                "store_dir": str(self.market_data_store_repo.store_dir),
+                "start_date": self.start_date.isoformat(),
+                "end_date": self.end_date.isoformat(),
+                "instruments": len(market_data.instrument_ids),
+                "fx_pairs": len(market_data.fx_pairs),
+                "retries": self.performativ_api_repo.retry_metrics.retries,
+            },
+            indent=4,
+        )
+
+
+class PrefetchControllerException(Exception):
+    pass
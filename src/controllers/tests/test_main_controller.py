@@ -1,11 +1,45 @@
 import json
+import tempfile
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
 from unittest.mock import Mock
 
 import pytest
+from httpx import AsyncClient
 from pandas import Series, date_range
 
 from controllers.main_controller import MainController, MainControllerException
 from entities.financial_metrics import BasketMetric, FinancialMetrics, PositionMetric
+from entities.positions_table import PositionsTable
+from models.basket_grouping import BasketGrouping
+from models.financial_metrics_export import ExportFormat, ExportLayout
+from models.market_data_fill_policy import MarketDataFillPolicy
+from models.performativ_api import PositionPayload, PostSubmitPayload
+from models.positions_data import PositionDTO, PositionsData
+from models.reporting_window import ReportingPeriod
+from repositories.adaptive_client_policy import RetryMetrics
+from repositories.enviroment_loader import config
+from repositories.performativ_api_repo import PerformativApiRepo
+from repositories.result_cache_repo import ResultCacheRepo
+from services.memory_tracker import MemoryTracker, get_rss_bytes
+
+
+class KeepAliveSubmitHandler(BaseHTTPRequestHandler):
+    # an HTTP/1.1 server keeps the connection open, so the client pools it for the next request
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        body = b'{"message": "ok"}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
 
 
 class TestMainController:
@@ -31,7 +65,7 @@ class TestMainController:
         assert "Supplied date is invalid isoformat" in str(ex)
 
     def test_init_when_get_positions_data_failed_should_raise_expected_error_message(self):
-        self.mock_positions_data_repo.get.side_effect = Exception("Fake error message")
+        self.mock_positions_data_repo.get_table.side_effect = Exception("Fake error message")
 
         with pytest.raises(MainControllerException) as ex:
             MainController(
@@ -107,3 +141,735 @@ class TestMainController:
         test = json.loads(actual_financial_metric_result)
         assert json.loads(actual_submit_result) == expected_submit_api_result
         assert test == json.loads(expected_financial_metrics.to_submit_api_payload(8).model_dump_json())
+
+    def _make_controller(self, result_cache_repo, positions=None) -> MainController:
+        self.mock_positions_data_repo.get_table.return_value = PositionsTable.from_positions_data(
+            PositionsData(positions=positions or [])
+        )
+        return MainController(
+            self.mock_file,
+            "USD",
+            "2020-01-01",
+            "2020-01-02",
+            self.mock_positions_data_repo,
+            self.mock_financial_metrics_calculator,
+            self.mock_performativ_api_repo,
+            result_cache_repo,
+        )
+
+    def test_run_when_result_cached_should_return_cached_payload_without_calculating(self):
+        cached_payload = PostSubmitPayload(positions={}, basket=None, dates=["2020-01-01", "2020-01-02"])
+        mock_result_cache_repo = Mock()
+        mock_result_cache_repo.get.return_value = cached_payload.model_dump_json(indent=4)
+        self.mock_performativ_api_repo.post_submit_financial_metrics.return_value = {"message": "ok"}
+        controller = self._make_controller(mock_result_cache_repo)
+
+        actual_financial_metric_result, _ = controller.run()
+
+        assert actual_financial_metric_result == cached_payload.model_dump_json(indent=4)
+        self.mock_financial_metrics_calculator.calculate.assert_not_called()
+        self.mock_performativ_api_repo.post_submit_financial_metrics.assert_called_once_with(cached_payload)
+        mock_result_cache_repo.put.assert_not_called()
+
+    def test_run_when_result_not_cached_should_store_calculated_payload(self):
+        mock_date_index = date_range("2020-01-01", "2020-01-02")
+        mock_result_cache_repo = Mock()
+        mock_result_cache_repo.get.return_value = None
+        self.mock_financial_metrics_calculator.calculate.return_value = FinancialMetrics(
+            positions={},
+            basket=BasketMetric(
+                is_open=Series(0.0, index=mock_date_index),
+                price=Series(0.0, index=mock_date_index),
+                value=Series(0.0, index=mock_date_index),
+                return_per_period=Series(0.0, index=mock_date_index),
+                return_per_period_percentage=Series(0.0, index=mock_date_index),
+            ),
+            dates=mock_date_index,
+        )
+        self.mock_performativ_api_repo.post_submit_financial_metrics.return_value = {"message": "ok"}
+        controller = self._make_controller(mock_result_cache_repo)
+
+        actual_financial_metric_result, _ = controller.run()
+
+        cache_key = mock_result_cache_repo.get.call_args.args[0]
+        mock_result_cache_repo.put.assert_called_once_with(cache_key, actual_financial_metric_result)
+
+    def test_run_when_cached_payload_has_missing_values_should_return_and_submit_it_unchanged(self, tmp_path):
+        mock_date_index = date_range("2020-01-01", "2020-01-02")
+        # the instrument has no price on the first day
+        series = {
+            "is_open": Series([1.0, 1.0], index=mock_date_index),
+            "price": Series([float("nan"), 2.0], index=mock_date_index),
+            "value": Series([float("nan"), 2.0], index=mock_date_index),
+            "return_per_period": Series([float("nan"), float("nan")], index=mock_date_index),
+            "return_per_period_percentage": Series([float("nan"), float("nan")], index=mock_date_index),
+        }
+        self.mock_financial_metrics_calculator.calculate.return_value = FinancialMetrics(
+            positions={1: PositionMetric(**series, value_start=series["value"])},
+            basket=BasketMetric(**series),
+            dates=mock_date_index,
+        )
+        self.mock_performativ_api_repo.post_submit_financial_metrics.return_value = {"message": "ok"}
+        result_cache_repo = ResultCacheRepo(str(tmp_path), 1024 * 1024)
+
+        calculated_result, _ = self._make_controller(result_cache_repo).run()
+        cached_result, _ = self._make_controller(result_cache_repo).run()
+
+        assert cached_result == calculated_result
+        assert json.loads(cached_result)["positions"]["1"]["Price"] == [None, 2.0]
+        self.mock_financial_metrics_calculator.calculate.assert_called_once()
+        calculated_payload, cached_payload = [
+            call.args[0] for call in self.mock_performativ_api_repo.post_submit_financial_metrics.call_args_list
+        ]
+        assert cached_payload.model_dump_json() == calculated_payload.model_dump_json()
+
+    def test_get_result_cache_key_should_depend_on_market_data_fill_policy(self, monkeypatch):
+        controller = self._make_controller(Mock())
+        key = controller._get_result_cache_key()
+
+        monkeypatch.setattr(config, "MARKET_DATA_FILL_POLICY", MarketDataFillPolicy.NONE)
+
+        assert controller._get_result_cache_key() != key
+
+    def test_get_result_cache_key_should_ignore_positions_order_and_depend_on_window(self):
+        positions = [
+            PositionDTO(
+                id=position_id,
+                open_date="2020-01-01",
+                close_date=None,
+                open_price=1.0,
+                close_price=None,
+                quantity=1,
+                instrument_id=1,
+                instrument_currency="USD",
+            )
+            for position_id in (1, 2)
+        ]
+        key = self._make_controller(Mock(), positions)._get_result_cache_key()
+        reordered_controller = self._make_controller(Mock(), positions[::-1])
+        reordered_key = reordered_controller._get_result_cache_key()
+        reordered_controller.end_date = date(2020, 1, 3)
+
+        assert reordered_key == key
+        assert reordered_controller._get_result_cache_key() != key
+
+    def test_run_when_export_file_supplied_should_export_calculated_metrics(self):
+        self.mock_positions_data_repo.get_table.return_value = PositionsTable.from_records([])
+        self.mock_performativ_api_repo.post_submit_financial_metrics.return_value = {"message": "ok"}
+        mock_result_cache_repo = Mock()
+        controller = MainController(
+            self.mock_file,
+            "USD",
+            "2020-01-01",
+            "2020-01-02",
+            self.mock_positions_data_repo,
+            self.mock_financial_metrics_calculator,
+            self.mock_performativ_api_repo,
+            mock_result_cache_repo,
+            export_file="metrics.parquet",
+            export_layout=ExportLayout.WIDE,
+            export_format=ExportFormat.PARQUET,
+        )
+
+        controller.run()
+
+        self.mock_financial_metrics_calculator.calculate.return_value.export.assert_called_once_with(
+            "metrics.parquet", ExportLayout.WIDE, ExportFormat.PARQUET
+        )
+        mock_result_cache_repo.get.assert_not_called()
+
+    def test_init_when_streaming_startup_should_calculate_with_streamed_resources(self):
+        mock_streaming_resource_loader = Mock()
+        streamed_positions_data = PositionsData(positions=[])
+        mock_streaming_resource_loader.load.return_value = (streamed_positions_data, "streamed resource")
+        self.mock_performativ_api_repo.post_submit_financial_metrics.return_value = {"message": "ok"}
+
+        controller = MainController(
+            self.mock_file,
+            "USD",
+            "2020-01-01",
+            "2020-01-02",
+            self.mock_positions_data_repo,
+            self.mock_financial_metrics_calculator,
+            self.mock_performativ_api_repo,
+            streaming_startup=True,
+            streaming_resource_loader=mock_streaming_resource_loader,
+        )
+        controller.run()
+
+        assert len(controller.positions_table) == 0
+        self.mock_positions_data_repo.get_table.assert_not_called()
+        mock_streaming_resource_loader.load.assert_called_once_with(
+            self.mock_positions_data_repo.iter_positions.return_value, "USD", date(2020, 1, 1), date(2020, 1, 2)
+        )
+        self.mock_financial_metrics_calculator.calculate.assert_called_once_with(
+            "USD", date(2020, 1, 1), date(2020, 1, 2), "streamed resource"
+        )
+
+    def test_run_when_streaming_startup_and_result_cached_should_not_fetch_market_data(self):
+        cached_payload = PostSubmitPayload(positions={}, basket=None, dates=["2020-01-01", "2020-01-02"])
+        mock_result_cache_repo = Mock()
+        mock_result_cache_repo.get.return_value = cached_payload.model_dump_json(indent=4)
+        mock_streaming_resource_loader = Mock()
+        self.mock_positions_data_repo.get_table.return_value = PositionsTable.from_records([])
+        self.mock_performativ_api_repo.post_submit_financial_metrics.return_value = {"message": "ok"}
+
+        controller = MainController(
+            self.mock_file,
+            "USD",
+            "2020-01-01",
+            "2020-01-02",
+            self.mock_positions_data_repo,
+            self.mock_financial_metrics_calculator,
+            self.mock_performativ_api_repo,
+            mock_result_cache_repo,
+            streaming_startup=True,
+            streaming_resource_loader=mock_streaming_resource_loader,
+        )
+        actual_financial_metric_result, _ = controller.run()
+
+        assert actual_financial_metric_result == cached_payload.model_dump_json(indent=4)
+        mock_streaming_resource_loader.load.assert_not_called()
+        self.mock_financial_metrics_calculator.calculate.assert_not_called()
+
+    def test_run_when_streaming_startup_and_over_memory_budget_should_fail_before_fetching_market_data(self):
+        mock_streaming_resource_loader = Mock()
+        self.mock_positions_data_repo.get_table.return_value = PositionsTable.from_records(
+            [
+                {
+                    "id": position_id,
+                    "open_date": "2000-01-01",
+                    "close_date": None,
+                    "open_price": 1.0,
+                    "close_price": None,
+                    "quantity": 1,
+                    "instrument_id": 1,
+                    "instrument_currency": "USD",
+                }
+                for position_id in range(1000)
+            ]
+        )
+        controller = MainController(
+            self.mock_file,
+            "USD",
+            "2000-01-01",
+            "2099-12-31",
+            self.mock_positions_data_repo,
+            self.mock_financial_metrics_calculator,
+            self.mock_performativ_api_repo,
+            streaming_startup=True,
+            streaming_resource_loader=mock_streaming_resource_loader,
+            memory_budget_bytes=get_rss_bytes() + 1024 * 1024 * 1024,
+        )
+
+        with pytest.raises(MainControllerException) as ex:
+            controller.run()
+
+        assert "Estimated peak memory" in str(ex.value)
+        mock_streaming_resource_loader.load.assert_not_called()
+        self.mock_financial_metrics_calculator.calculate.assert_not_called()
+
+    def test_init_when_streaming_startup_failed_should_raise_expected_error_message(self):
+        mock_streaming_resource_loader = Mock()
+        mock_streaming_resource_loader.load.side_effect = Exception("Fake error message")
+
+        with pytest.raises(MainControllerException) as ex:
+            MainController(
+                self.mock_file,
+                "USD",
+                "2020-01-01",
+                "2020-01-02",
+                self.mock_positions_data_repo,
+                self.mock_financial_metrics_calculator,
+                self.mock_performativ_api_repo,
+                streaming_startup=True,
+                streaming_resource_loader=mock_streaming_resource_loader,
+            )
+
+        assert "Failed to stream positions data and market data" in str(ex)
+
+    def test_run_when_estimate_exceeds_memory_budget_should_fail_before_calculating(self):
+        positions = [
+            PositionDTO(
+                id=position_id,
+                open_date="2020-01-01",
+                close_date=None,
+                open_price=1.0,
+                close_price=None,
+                quantity=1,
+                instrument_id=1,
+                instrument_currency="USD",
+            )
+            for position_id in range(3)
+        ]
+        controller = self._make_controller(None, positions)
+        controller.memory_tracker = MemoryTracker(budget_bytes=1)
+
+        with pytest.raises(MainControllerException) as ex:
+            controller.run()
+
+        assert "Estimated peak memory" in str(ex.value)
+        self.mock_financial_metrics_calculator.calculate.assert_not_called()
+
+    def test_get_memory_report_when_enabled_should_report_run_stages_and_retry_metrics(self):
+        self.mock_positions_data_repo.get_table.return_value = PositionsTable.from_records([])
+        self.mock_performativ_api_repo.post_submit_financial_metrics.return_value = {"message": "ok"}
+        self.mock_performativ_api_repo.retry_metrics = RetryMetrics(requests=5, retries=2, throttled=1)
+        controller = MainController(
+            self.mock_file,
+            "USD",
+            "2020-01-01",
+            "2020-01-02",
+            self.mock_positions_data_repo,
+            self.mock_financial_metrics_calculator,
+            self.mock_performativ_api_repo,
+            memory_report=True,
+        )
+        self.mock_financial_metrics_calculator.calculate.return_value.to_submit_api_payload.return_value = (
+            PostSubmitPayload(positions={}, basket=None, dates=[])
+        )
+
+        controller.run()
+
+        actual = json.loads(controller.get_memory_report())
+        assert [stage["stage"] for stage in actual["stages"]] == ["load_positions", "payload", "submit"]
+        assert actual["retry_metrics"]["retries"] == 2
+        assert actual["retry_metrics"]["throttled"] == 1
+
+    def test_run_when_delta_submitter_supplied_should_submit_through_it(self):
+        payload = PostSubmitPayload(positions={}, basket=None, dates=["2020-01-01", "2020-01-02"])
+        mock_result_cache_repo = Mock()
+        mock_result_cache_repo.get.return_value = payload.model_dump_json(indent=4)
+        mock_delta_submitter = Mock()
+        mock_delta_submitter.submit.return_value = {"message": "No changes since the last submit"}
+        self.mock_positions_data_repo.get_table.return_value = PositionsTable.from_records([])
+        controller = MainController(
+            self.mock_file,
+            "USD",
+            "2020-01-01",
+            "2020-01-02",
+            self.mock_positions_data_repo,
+            self.mock_financial_metrics_calculator,
+            self.mock_performativ_api_repo,
+            mock_result_cache_repo,
+            delta_submitter=mock_delta_submitter,
+        )
+
+        _, actual_submit_result = controller.run()
+
+        assert json.loads(actual_submit_result) == {"message": "No changes since the last submit"}
+        mock_delta_submitter.submit.assert_called_once_with(payload)
+        self.mock_performativ_api_repo.post_submit_financial_metrics.assert_not_called()
+
+    def test_run_when_chunked_should_write_spilled_payload_and_submit_the_file(self, tmp_path):
+        self.mock_positions_data_repo.get_table.return_value = PositionsTable.from_records([])
+        self.mock_financial_metrics_calculator.calculate_chunked.return_value.iter_submit_api_payload.return_value = (
+            iter(['{"positions":{', "}}"])
+        )
+        self.mock_performativ_api_repo.post_submit_financial_metrics_file.return_value = {"message": "ok"}
+        controller = MainController(
+            self.mock_file,
+            "USD",
+            "2020-01-01",
+            "2020-01-02",
+            self.mock_positions_data_repo,
+            self.mock_financial_metrics_calculator,
+            self.mock_performativ_api_repo,
+            chunk_size=100,
+            spill_dir=str(tmp_path),
+        )
+
+        actual_financial_metric_result, actual_submit_result = controller.run()
+
+        assert actual_financial_metric_result == str(tmp_path / "payload.json")
+        assert (tmp_path / "payload.json").read_text(encoding="utf-8") == '{"positions":{}}'
+        assert json.loads(actual_submit_result) == {"message": "ok"}
+        assert self.mock_financial_metrics_calculator.calculate_chunked.call_args.args[4] == 100
+        self.mock_financial_metrics_calculator.calculate.assert_not_called()
+        self.mock_performativ_api_repo.post_submit_financial_metrics_file.assert_called_once_with(
+            tmp_path / "payload.json"
+        )
+
+    def _spill_chunk(self, target_currency, start_date, end_date, spill_repo, *args):
+        spill_repo.clear()
+        spill_repo.append_chunk('"1":{}')
+        return self.mock_financial_metrics_calculator.calculate_chunked.return_value
+
+    def test_run_when_chunked_should_remove_consumed_chunks_and_keep_the_payload_file(self, tmp_path):
+        self.mock_positions_data_repo.get_table.return_value = PositionsTable.from_records([])
+        self.mock_financial_metrics_calculator.calculate_chunked.side_effect = self._spill_chunk
+        self.mock_financial_metrics_calculator.calculate_chunked.return_value.iter_submit_api_payload.side_effect = (
+            lambda chunks, precision: iter(['{"positions":{', *chunks, "}}"])
+        )
+        self.mock_performativ_api_repo.post_submit_financial_metrics_file.return_value = {"message": "ok"}
+        controller = MainController(
+            self.mock_file,
+            "USD",
+            "2020-01-01",
+            "2020-01-02",
+            self.mock_positions_data_repo,
+            self.mock_financial_metrics_calculator,
+            self.mock_performativ_api_repo,
+            chunk_size=100,
+            spill_dir=str(tmp_path),
+        )
+
+        controller.run()
+
+        assert [path.name for path in tmp_path.iterdir()] == ["payload.json"]
+        assert (tmp_path / "payload.json").read_text(encoding="utf-8") == '{"positions":{"1":{}}}'
+
+    def test_run_when_chunked_without_spill_dir_should_remove_the_created_directory(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+        self.mock_positions_data_repo.get_table.return_value = PositionsTable.from_records([])
+        self.mock_financial_metrics_calculator.calculate_chunked.side_effect = self._spill_chunk
+        self.mock_financial_metrics_calculator.calculate_chunked.return_value.iter_submit_api_payload.return_value = (
+            iter(['{"positions":{}}'])
+        )
+        self.mock_performativ_api_repo.post_submit_financial_metrics_file.side_effect = Exception("Failed to submit")
+        controller = MainController(
+            self.mock_file,
+            "USD",
+            "2020-01-01",
+            "2020-01-02",
+            self.mock_positions_data_repo,
+            self.mock_financial_metrics_calculator,
+            self.mock_performativ_api_repo,
+            chunk_size=100,
+        )
+        assert len(list(tmp_path.iterdir())) == 1
+
+        with pytest.raises(MainControllerException) as ex:
+            controller.run()
+
+        assert "Failed to submit" in str(ex.value)
+        assert list(tmp_path.iterdir()) == []
+
+    def test_run_when_chunked_with_delta_submitter_should_reset_it_before_submitting_the_file(self, tmp_path):
+        self.mock_positions_data_repo.get_table.return_value = PositionsTable.from_records([])
+        self.mock_financial_metrics_calculator.calculate_chunked.return_value.iter_submit_api_payload.return_value = (
+            iter(['{"positions":{', "}}"])
+        )
+        calls = Mock()
+        calls.attach_mock(self.mock_performativ_api_repo.post_submit_financial_metrics_file, "post")
+        calls.post.return_value = {"message": "ok"}
+        mock_delta_submitter = Mock()
+        calls.attach_mock(mock_delta_submitter.reset, "reset")
+        controller = MainController(
+            self.mock_file,
+            "USD",
+            "2020-01-01",
+            "2020-01-02",
+            self.mock_positions_data_repo,
+            self.mock_financial_metrics_calculator,
+            self.mock_performativ_api_repo,
+            chunk_size=100,
+            spill_dir=str(tmp_path),
+            delta_submitter=mock_delta_submitter,
+        )
+
+        controller.run()
+
+        assert [name for name, _, _ in calls.mock_calls] == ["reset", "post"]
+        mock_delta_submitter.submit.assert_not_called()
+
+    def test_init_when_analytics_window_without_export_file_should_raise_expected_error_message(self):
+        with pytest.raises(MainControllerException) as ex:
+            MainController(
+                self.mock_file,
+                "USD",
+                "2020-01-01",
+                "2020-01-02",
+                self.mock_positions_data_repo,
+                self.mock_financial_metrics_calculator,
+                self.mock_performativ_api_repo,
+                analytics_window=20,
+            )
+
+        assert "Analytics are only written to the export and need an export file" in str(ex.value)
+
+    @pytest.mark.parametrize(
+        "mode_kwargs",
+        [
+            {},
+            {"export_file": "metrics.arrow", "report_periods": [ReportingPeriod.MTD]},
+            {"export_file": "metrics.arrow", "custom_windows": [("h1", "2020-01-01", "2020-01-02")]},
+            {"chunk_size": 100},
+        ],
+    )
+    def test_init_when_basket_groupings_without_export_or_in_chunked_or_window_mode_should_raise_expected_error_message(
+        self, mode_kwargs
+    ):
+        with pytest.raises(MainControllerException) as ex:
+            MainController(
+                self.mock_file,
+                "USD",
+                "2020-01-01",
+                "2020-01-02",
+                self.mock_positions_data_repo,
+                self.mock_financial_metrics_calculator,
+                self.mock_performativ_api_repo,
+                basket_groupings=[BasketGrouping.CURRENCY],
+                **mode_kwargs,
+            )
+
+        assert "Sub-baskets are only written to the export" in str(ex.value)
+
+    def test_init_when_chunked_with_export_file_should_raise_expected_error_message(self):
+        with pytest.raises(MainControllerException) as ex:
+            MainController(
+                self.mock_file,
+                "USD",
+                "2020-01-01",
+                "2020-01-02",
+                self.mock_positions_data_repo,
+                self.mock_financial_metrics_calculator,
+                self.mock_performativ_api_repo,
+                export_file="metrics.arrow",
+                chunk_size=100,
+            )
+
+        assert "Export is not available in chunked mode" in str(ex.value)
+
+    def test_run_when_report_windows_should_calculate_once_and_submit_inception_window(self):
+        self.mock_positions_data_repo.get_table.return_value = PositionsTable.from_records([])
+        self.mock_performativ_api_repo.post_submit_financial_metrics.return_value = {"message": "ok"}
+        windows_payloads = {
+            name: PostSubmitPayload(positions={}, basket=None, dates=[name])
+            for name in ["inception", "mtd", "qtd", "h2"]
+        }
+        self.mock_financial_metrics_calculator.calculate_windows.return_value = {
+            name: Mock(**{"to_submit_api_payload.return_value": payload}) for name, payload in windows_payloads.items()
+        }
+        controller = MainController(
+            self.mock_file,
+            "USD",
+            "2019-11-15",
+            "2020-02-20",
+            self.mock_positions_data_repo,
+            self.mock_financial_metrics_calculator,
+            self.mock_performativ_api_repo,
+            Mock(),
+            report_periods=[ReportingPeriod.MTD, ReportingPeriod.QTD],
+            custom_windows=[("h2", "2019-12-01", "2020-01-31")],
+        )
+
+        actual_financial_metric_result, _ = controller.run()
+
+        _, actual_windows, _ = self.mock_financial_metrics_calculator.calculate_windows.call_args.args
+        assert [(window.name, window.start_date, window.end_date) for window in actual_windows] == [
+            ("inception", date(2019, 11, 15), date(2020, 2, 20)),
+            ("mtd", date(2020, 2, 1), date(2020, 2, 20)),
+            ("qtd", date(2020, 1, 1), date(2020, 2, 20)),
+            ("h2", date(2019, 12, 1), date(2020, 1, 31)),
+        ]
+        assert list(json.loads(actual_financial_metric_result)) == ["inception", "mtd", "qtd", "h2"]
+        self.mock_performativ_api_repo.post_submit_financial_metrics.assert_called_once_with(
+            windows_payloads["inception"]
+        )
+        self.mock_financial_metrics_calculator.calculate.assert_not_called()
+
+    def test_run_when_report_window_has_missing_values_should_print_them_as_null(self):
+        self.mock_positions_data_repo.get_table.return_value = PositionsTable.from_records([])
+        self.mock_performativ_api_repo.post_submit_financial_metrics.return_value = {"message": "ok"}
+        series = {field: [float("nan")] for field in ["IsOpen", "Price", "Value", "ReturnPerPeriod"]}
+        payload = PostSubmitPayload(
+            positions={"1": PositionPayload(**series, ReturnPerPeriodPercentage=[float("nan")])},
+            basket=None,
+            dates=["2020-01-31"],
+        )
+        self.mock_financial_metrics_calculator.calculate_windows.return_value = {
+            name: Mock(**{"to_submit_api_payload.return_value": payload}) for name in ["inception", "mtd"]
+        }
+        controller = MainController(
+            self.mock_file,
+            "USD",
+            "2020-01-01",
+            "2020-01-31",
+            self.mock_positions_data_repo,
+            self.mock_financial_metrics_calculator,
+            self.mock_performativ_api_repo,
+            Mock(),
+            report_periods=[ReportingPeriod.MTD],
+        )
+
+        actual_financial_metric_result, _ = controller.run()
+
+        def reject_constant(constant):
+            raise ValueError(f"{constant} is not valid JSON")
+
+        actual = json.loads(actual_financial_metric_result, parse_constant=reject_constant)
+        assert actual["mtd"]["positions"]["1"]["Price"] == [None]
+        assert actual["inception"] == json.loads(payload.model_dump_json())
+
+    def test_init_when_custom_window_outside_run_should_raise_expected_error_message(self):
+        with pytest.raises(MainControllerException) as ex:
+            MainController(
+                self.mock_file,
+                "USD",
+                "2020-01-01",
+                "2020-01-31",
+                self.mock_positions_data_repo,
+                self.mock_financial_metrics_calculator,
+                self.mock_performativ_api_repo,
+                custom_windows=[("q4", "2019-10-01", "2019-12-31")],
+            )
+
+        assert "Reporting window q4 is not within the start and end dates" in str(ex.value)
+
+    def test_watch_when_positions_file_changes_should_yield_updated_result(self, tmp_path):
+        positions_file = tmp_path / "positions.json"
+        positions_file.write_text("[]")
+        initial_table, edited_table = PositionsTable.from_records([]), Mock()
+        self.mock_positions_data_repo.get_table.side_effect = [initial_table, edited_table]
+        mock_watch_state = Mock()
+        payloads = [PostSubmitPayload(positions={}, basket=None, dates=[day]) for day in ["2020-01-01", "2020-01-02"]]
+        initial_metrics, edited_metrics = [Mock(**{"to_submit_api_payload.return_value": p}) for p in payloads]
+        self.mock_financial_metrics_calculator.start_watch.return_value = (mock_watch_state, initial_metrics)
+        self.mock_financial_metrics_calculator.update_watch.return_value = edited_metrics
+        self.mock_performativ_api_repo.post_submit_financial_metrics.return_value = {"message": "ok"}
+        controller = MainController(
+            str(positions_file),
+            "USD",
+            "2020-01-01",
+            "2020-01-02",
+            self.mock_positions_data_repo,
+            self.mock_financial_metrics_calculator,
+            self.mock_performativ_api_repo,
+            Mock(),
+        )
+
+        results = controller.watch(0.0)
+        initial_result, _ = next(results)
+        positions_file.write_text('[{"id": 1}]')
+        edited_result, edited_submit_result = next(results)
+
+        assert json.loads(initial_result)["dates"] == ["2020-01-01"]
+        assert json.loads(edited_result)["dates"] == ["2020-01-02"]
+        assert json.loads(edited_submit_result) == {"message": "ok"}
+        self.mock_financial_metrics_calculator.update_watch.assert_called_once_with(
+            "USD", mock_watch_state, edited_table
+        )
+        assert self.mock_performativ_api_repo.post_submit_financial_metrics.call_count == 2
+        assert self.mock_performativ_api_repo.start_run.call_count == 2
+
+    def test_watch_when_submitting_over_pooled_connection_should_submit_every_result(self, tmp_path):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveSubmitHandler)
+        Thread(target=server.serve_forever, daemon=True).start()
+        positions_file = tmp_path / "positions.json"
+        positions_file.write_text("[]")
+        self.mock_positions_data_repo.get_table.return_value = PositionsTable.from_records([])
+        payload = PostSubmitPayload(positions={}, basket=None, dates=["2020-01-01"])
+        metrics = Mock(**{"to_submit_api_payload.return_value": payload})
+        self.mock_financial_metrics_calculator.start_watch.return_value = (Mock(), metrics)
+        self.mock_financial_metrics_calculator.update_watch.return_value = metrics
+        performativ_api_repo = PerformativApiRepo(
+            client=AsyncClient(base_url=f"http://127.0.0.1:{server.server_port}"),
+            submit_chunk_size=0,
+            submit_gzip=False,
+        )
+        controller = MainController(
+            str(positions_file),
+            "USD",
+            "2020-01-01",
+            "2020-01-02",
+            self.mock_positions_data_repo,
+            self.mock_financial_metrics_calculator,
+            performativ_api_repo,
+            Mock(),
+        )
+
+        try:
+            results = controller.watch(0.0)
+            _, initial_submit_result = next(results)
+            positions_file.write_text('[{"id": 1}]')
+            _, edited_submit_result = next(results)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        assert json.loads(initial_submit_result) == {"message": "ok"}
+        assert json.loads(edited_submit_result) == {"message": "ok"}
+
+    def test_watch_when_chunked_should_raise_expected_error_message(self):
+        controller = MainController(
+            self.mock_file,
+            "USD",
+            "2020-01-01",
+            "2020-01-02",
+            self.mock_positions_data_repo,
+            self.mock_financial_metrics_calculator,
+            self.mock_performativ_api_repo,
+            chunk_size=10,
+        )
+
+        with pytest.raises(MainControllerException) as ex:
+            next(controller.watch(0.0))
+
+        assert "Watch mode is not available with chunked mode" in str(ex.value)
+
+    def test_stream_should_yield_calculated_records_without_submitting(self):
+        self.mock_financial_metrics_calculator.calculate_streamed.return_value = iter(['{"id":"1"}', '{"dates":[]}'])
+        controller = MainController(
+            self.mock_file,
+            "USD",
+            "2020-01-01",
+            "2020-01-02",
+            self.mock_positions_data_repo,
+            self.mock_financial_metrics_calculator,
+            self.mock_performativ_api_repo,
+        )
+
+        actual = list(controller.stream())
+
+        assert actual == ['{"id":"1"}', '{"dates":[]}']
+        self.mock_financial_metrics_calculator.calculate_streamed.assert_called_once_with(
+            "USD", date(2020, 1, 1), date(2020, 1, 2), config.VALUE_PRECISION, None
+        )
+        self.mock_performativ_api_repo.post_submit_financial_metrics.assert_not_called()
+
+    def test_stream_when_export_file_supplied_should_raise_expected_error_message(self):
+        controller = MainController(
+            self.mock_file,
+            "USD",
+            "2020-01-01",
+            "2020-01-02",
+            self.mock_positions_data_repo,
+            self.mock_financial_metrics_calculator,
+            self.mock_performativ_api_repo,
+            export_file="metrics.arrow",
+        )
+
+        with pytest.raises(MainControllerException) as ex:
+            next(controller.stream())
+
+        assert "NDJSON output is not available" in str(ex.value)
+
+    def test_run_when_risk_file_supplied_should_write_risk_report(self, tmp_path):
+        risk_file = tmp_path / "risk.json"
+        self.mock_positions_data_repo.get_table.return_value = PositionsTable.from_records([])
+        mock_financial_metrics = Mock()
+        mock_financial_metrics.to_submit_api_payload.return_value = PostSubmitPayload(
+            positions={}, basket=None, dates=[]
+        )
+        mock_financial_metrics.risk.to_json.return_value = '{"value_at_risk": 1.5}'
+        self.mock_financial_metrics_calculator.calculate.return_value = mock_financial_metrics
+        self.mock_performativ_api_repo.post_submit_financial_metrics.return_value = {"message": "ok"}
+        mock_result_cache_repo = Mock()
+        controller = MainController(
+            self.mock_file,
+            "USD",
+            "2020-01-01",
+            "2020-01-10",
+            self.mock_positions_data_repo,
+            self.mock_financial_metrics_calculator,
+            self.mock_performativ_api_repo,
+            mock_result_cache_repo,
+            risk_file=str(risk_file),
+        )
+
+        controller.run()
+
+        assert json.loads(risk_file.read_text()) == {"value_at_risk": 1.5}
+        mock_financial_metrics.risk.to_json.assert_called_once_with(config.VALUE_PRECISION)
+        mock_result_cache_repo.get.assert_not_called()
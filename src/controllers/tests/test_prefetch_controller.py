@@ -0,0 +1,119 @@
+from datetime import date
+from unittest.mock import Mock
+
+import pytest
+from httpx import AsyncClient, MockTransport, Request, Response
+
+from controllers.prefetch_controller import PrefetchController, PrefetchControllerException
+from entities.positions_table import PositionsTable
+from repositories.market_data_store_repo import MarketDataStoreRepo
+from repositories.performativ_api_repo import PerformativApiRepo
+from services.financial_metrics_calculator import FinancialMetricsCalculator
+from services.performativ_resource_loader import PerformativResourceLoader
+
+
+class TestPrefetchController:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        self.requests = []
+        self.store_dir = str(tmp_path / "market-data")
+        self.mock_positions_data_repo = Mock()
+        self.mock_positions_data_repo.get_table.return_value = PositionsTable.from_records(
+            [
+                {
+                    "id": 1,
+                    "open_date": "2023-01-01",
+                    "close_date": None,
+                    "open_price": 1.0,
+                    "close_price": None,
+                    "quantity": 1,
+                    "instrument_id": 1000,
+                    "instrument_currency": "EUR",
+                }
+            ]
+        )
+
+        def handler(request: Request) -> Response:
+            self.requests.append(request)
+            if request.url.path.endswith("fx-rates"):
+                pairs = request.url.params["pairs"].split(",")
+                return Response(200, json={pair: [{"date": "2023-01-01", "rate": 1.1}] for pair in pairs})
+            instrument_id = request.url.params["instrument_id"]
+            return Response(200, json={instrument_id: [{"date": "2023-01-01", "price": 10.0}]})
+
+        self.performativ_api_repo = PerformativApiRepo(
+            client=AsyncClient(transport=MockTransport(handler), base_url="http://stand-in/")
+        )
+
+    def test_run_should_store_market_data_of_positions_and_supplied_universe(self):
+        controller = PrefetchController(
+            "2023-01-01",
+            "2023-01-05",
+            ["USD", "GBP"],
+            path_to_positions_file="positions.json",
+            instrument_ids=["2000"],
+            store_dir=self.store_dir,
+            positions_data_repo=self.mock_positions_data_repo,
+            performativ_api_repo=self.performativ_api_repo,
+        )
+
+        controller.run()
+
+        stored_market_data = MarketDataStoreRepo(self.store_dir).load()
+        assert stored_market_data is not None
+        assert stored_market_data.covers({"1000", "2000"}, {"EURUSD", "EURGBP"}, date(2023, 1, 2), date(2023, 1, 5))
+        assert stored_market_data.get_prices("2000").tolist() == [10.0] * 5
+        assert len(self.requests) == 3
+
+    def test_run_when_later_run_adds_an_instrument_should_keep_prefetched_market_data(self):
+        PrefetchController(
+            "2023-01-01",
+            "2023-01-05",
+            ["USD"],
+            path_to_positions_file="positions.json",
+            instrument_ids=["2000"],
+            store_dir=self.store_dir,
+            positions_data_repo=self.mock_positions_data_repo,
+            performativ_api_repo=self.performativ_api_repo,
+        ).run()
+        positions_table = PositionsTable.from_records(
+            [
+                {
+                    "id": position_id,
+                    "open_date": "2023-01-01",
+                    "close_date": None,
+                    "open_price": 1.0,
+                    "close_price": None,
+                    "quantity": 1,
+                    "instrument_id": instrument_id,
+                    "instrument_currency": currency,
+                }
+                for position_id, instrument_id, currency in [(1, 1000, "EUR"), (2, 3000, "USD")]
+            ]
+        )
+        self.requests.clear()
+
+        FinancialMetricsCalculator(
+            positions_table,
+            PerformativResourceLoader(positions_table, self.performativ_api_repo),
+            market_data_store_repo=MarketDataStoreRepo(self.store_dir),
+        ).calculate("USD", date(2023, 1, 2), date(2023, 1, 5))
+
+        stored_market_data = MarketDataStoreRepo(self.store_dir).load()
+        assert stored_market_data is not None
+        assert stored_market_data.covers({"1000", "2000", "3000"}, {"EURUSD"}, date(2023, 1, 1), date(2023, 1, 5))
+        assert [request.url.params.get("instrument_id") for request in self.requests] == ["3000"]
+
+    def test_init_when_store_dir_missing_should_raise_expected_error_message(self, monkeypatch):
+        monkeypatch.setattr("controllers.prefetch_controller.config.MARKET_DATA_STORE_DIR", "")
+
+        with pytest.raises(PrefetchControllerException) as ex:
+            PrefetchController("2023-01-01", "2023-01-05", ["USD"], instrument_ids=["1000"])
+
+        assert "A market data store directory is required" in str(ex.value)
+
+    def test_init_when_universe_empty_should_raise_expected_error_message(self):
+        with pytest.raises(PrefetchControllerException) as ex:
+            PrefetchController("2023-01-01", "2023-01-05", ["USD"], store_dir=self.store_dir)
+
+        assert "Nothing to prefetch" in str(ex.value)
@@ -0,0 +1,87 @@
+import struct
+from dataclasses import dataclass
+
+from numpy import concatenate, dtype, errstate, fmax, frombuffer, full, nan, nan_to_num, zeros
+from numpy.typing import NDArray
+from pandas import DatetimeIndex, Series
+
+from entities.financial_metrics import BasketMetric, PositionMetric
+
+# magic, format version and dates count, followed by the four little-endian float64 arrays
+SERIALIZED_HEADER = struct.Struct("<4sBI")
+SERIALIZED_MAGIC = b"BSKT"
+SERIALIZED_VERSION = 1
+SERIALIZED_DTYPE = dtype("<f8")
+SERIALIZED_ARRAYS_COUNT = 4
+
+
+@dataclass
+class BasketAccumulator:
+    # running per-date reductions of the basket, O(dates) whatever the number of added positions
+    is_open: NDArray
+    value: NDArray
+    value_start: NDArray
+    return_per_period: NDArray
+
+    @classmethod
+    def empty(cls, dates_count: int) -> BasketAccumulator:
+        return cls(
+            is_open=full(dates_count, nan),
+            value=zeros(dates_count),
+            value_start=zeros(dates_count),
+            return_per_period=zeros(dates_count),
+        )
+
+    def add(self, position_metric: PositionMetric) -> None:
+        # missing values are skipped, as in the groupby aggregation of BasketCalculator.calculate
+        fmax(self.is_open, position_metric.get_values("is_open"), out=self.is_open)
+        self.value += nan_to_num(position_metric.get_values("value"))
+        self.value_start += nan_to_num(position_metric.value_start.to_numpy(dtype=float))
+        self.return_per_period += nan_to_num(position_metric.get_values("return_per_period"))
+
+    def merge(self, other: BasketAccumulator) -> BasketAccumulator:
+        # sums and a nan-skipping max are associative and commutative, shards can be reduced in any order
+        if len(self.value) != len(other.value):
+            raise BasketAccumulatorException(
+                f"Cannot merge basket accumulators over {len(self.value)} and {len(other.value)} dates"
+            )
+        return BasketAccumulator(
+            is_open=fmax(self.is_open, other.is_open),
+            value=self.value + other.value,
+            value_start=self.value_start + other.value_start,
+            return_per_period=self.return_per_period + other.return_per_period,
+        )
+
+    def to_bytes(self) -> bytes:
+        header = SERIALIZED_HEADER.pack(SERIALIZED_MAGIC, SERIALIZED_VERSION, len(self.value))
+        arrays = concatenate([self.is_open, self.value, self.value_start, self.return_per_period])
+        return header + bytes(arrays.astype(SERIALIZED_DTYPE, copy=False).tobytes())
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> BasketAccumulator:
+        if len(data) < SERIALIZED_HEADER.size:
+            raise BasketAccumulatorException("Serialized basket accumulator is truncated")
+        magic, version, dates_count = SERIALIZED_HEADER.unpack_from(data)
+        if magic != SERIALIZED_MAGIC or version != SERIALIZED_VERSION:
+            raise BasketAccumulatorException("Unsupported serialized basket accumulator format")
+        if len(data) != SERIALIZED_HEADER.size + SERIALIZED_ARRAYS_COUNT * dates_count * SERIALIZED_DTYPE.itemsize:
+            raise BasketAccumulatorException("Serialized basket accumulator is truncated")
+        arrays = frombuffer(data, dtype=SERIALIZED_DTYPE, offset=SERIALIZED_HEADER.size).astype(float)
+        is_open, value, value_start, return_per_period = arrays.reshape(SERIALIZED_ARRAYS_COUNT, dates_count)
+        return cls(is_open=is_open, value=value, value_start=value_start, return_per_period=return_per_period)
+
+    def finalize(self, date_index: DatetimeIndex) -> BasketMetric:
+        with errstate(divide="ignore", invalid="ignore"):
+            return_per_period_percentage = self.return_per_period / self.value_start
+        return_per_period_percentage[self.value_start == 0] = 0.0
+        return BasketMetric(
+            is_open=Series(self.is_open, index=date_index),
+            price=Series(0.0, index=date_index),
+            value=Series(self.value, index=date_index),
+            return_per_period=Series(self.return_per_period, index=date_index),
+            return_per_period_percentage=Series(return_per_period_percentage, index=date_index),
+        )
+
+
+class BasketAccumulatorException(Exception):
+    pass
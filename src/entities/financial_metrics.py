@@ -1,8 +1,14 @@
-from dataclasses import dataclass
+import json
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator
 
-from numpy import trunc
+import pyarrow
+from numpy import array, concatenate, full, int64, nan, ones, repeat, tile, trunc, zeros
+from numpy.typing import NDArray
 from pandas import DatetimeIndex, Series
+from pyarrow import feather, parquet
 
+from models.financial_metrics_export import ExportFormat, ExportLayout
 from models.performativ_api import (
     BasketPayload,
     PositionPayload,
@@ -15,6 +21,11 @@ class FinancialMetrics:
     positions: dict[int, PositionMetric]
     basket: BasketMetric
     dates: DatetimeIndex
+    analytics: FinancialAnalytics | None = None
+    risk: RiskMetrics | None = None
+    attribution: FinancialAttribution | None = None
+    # grouping -> group key -> aggregated basket of the positions in that group
+    sub_baskets: dict[str, dict[str, BasketMetric]] = field(default_factory=dict)
 
     def to_submit_api_payload(self, precision: int) -> PostSubmitPayload:
         return PostSubmitPayload(
@@ -26,6 +37,130 @@ class FinancialMetrics:
             dates=self.dates.strftime("%Y-%m-%d").tolist(),
         )
 
+    def to_arrow_table(self, layout: ExportLayout = ExportLayout.LONG) -> pyarrow.Table:
+        if layout == ExportLayout.WIDE:
+            return self._to_wide_arrow_table()
+        return self._to_long_arrow_table()
+
+    def export(
+        self, path: str, layout: ExportLayout = ExportLayout.LONG, export_format: ExportFormat = ExportFormat.ARROW
+    ) -> None:
+        table = self.to_arrow_table(layout)
+        if export_format == ExportFormat.PARQUET:
+            parquet.write_table(table, path)
+        else:
+            # uncompressed arrow IPC files can be memory-mapped by readers without decoding
+            feather.write_feather(table, path, compression="uncompressed")
+
+    def _to_long_arrow_table(self) -> pyarrow.Table:
+        export_values = [values for _, values in self._iter_export_values()]
+        dates_count = len(self.dates)
+        baskets_count = len(export_values) - len(self.positions)
+        position_ids = repeat(array(list(self.positions), dtype=int64), dates_count)
+        # basket rows have a null position_id
+        columns = {
+            "position_id": pyarrow.array(
+                concatenate([position_ids, zeros(baskets_count * dates_count, dtype=int64)]),
+                mask=concatenate([zeros(len(position_ids), dtype=bool), ones(baskets_count * dates_count, dtype=bool)]),
+            ),
+            "date": pyarrow.array(tile(self.dates.values.astype("datetime64[D]"), len(export_values))),
+        }
+        if self.sub_baskets:
+            # sub-basket rows are told apart from the total basket by a "<grouping>=<key>" label
+            basket_labels = [label for label, _ in self._iter_sub_basket_metrics()]
+            columns["basket"] = pyarrow.array(
+                [None] * len(position_ids) + [label for label in [None, *basket_labels] for _ in range(dates_count)],
+                type=pyarrow.string(),
+            )
+        for column in export_values[0]:
+            columns[column] = pyarrow.array(concatenate([values[column] for values in export_values]))
+        return pyarrow.table(columns)
+
+    def _to_wide_arrow_table(self) -> pyarrow.Table:
+        columns = {"date": self.dates.values.astype("datetime64[D]")}
+        for prefix, values in self._iter_export_values():
+            for column, column_values in values.items():
+                columns[f"{prefix}.{column}"] = column_values
+        return pyarrow.table(columns)
+
+    def _iter_export_values(self) -> Iterator[tuple[str, dict[str, NDArray]]]:
+        for row, (position_id, position_metric) in enumerate(self.positions.items()):
+            position_analytics = self.analytics.positions[position_id] if self.analytics else None
+            values = self._get_export_values(position_metric, position_analytics)
+            if self.attribution is not None:
+                values[ATTRIBUTION_COLUMN] = self.attribution.contributions[row]
+            yield str(position_id), values
+        values = self._get_export_values(self.basket, self.analytics.basket if self.analytics else None)
+        if self.attribution is not None:
+            values[ATTRIBUTION_COLUMN] = self.attribution.contributions.sum(axis=0)
+        yield "basket", values
+        for label, basket_metric in self._iter_sub_basket_metrics():
+            values = self._get_export_values(basket_metric, None)
+            if self.analytics is not None:
+                # analytics are calculated for positions and the total basket only
+                values |= {column: full(len(self.dates), nan) for column in ANALYTICS_COLUMNS}
+            if self.attribution is not None:
+                values[ATTRIBUTION_COLUMN] = full(len(self.dates), nan)
+            yield f"basket[{label}]", values
+
+    def _iter_sub_basket_metrics(self) -> Iterator[tuple[str, BasketMetric]]:
+        for grouping, group_metrics in self.sub_baskets.items():
+            for group_key, basket_metric in group_metrics.items():
+                yield f"{grouping}={group_key}", basket_metric
+
+    def _get_export_values(self, metric: BaseMetric, analytics: AnalyticsMetric | None) -> dict[str, NDArray]:
+        values = {column: metric.get_values(field_name) for column, field_name in EXPORT_COLUMNS.items()}
+        if analytics is not None:
+            values |= {column: analytics.get_values(field_name) for column, field_name in ANALYTICS_COLUMNS.items()}
+        return values
+
+
+@dataclass
+class SpilledFinancialMetrics:
+    # position results were spilled to disk as payload fragments or streamed out as NDJSON records,
+    # only the basket is held in memory
+    basket: BasketMetric
+    dates: DatetimeIndex
+    positions_count: int
+
+    def iter_submit_api_payload(self, position_fragments: Iterable[str], precision: int) -> Iterator[str]:
+        # yields the compact JSON of the PostSubmitPayload, one spilled fragment at a time
+        yield '{"positions":{'
+        is_first = True
+        for fragment in position_fragments:
+            if not fragment:
+                continue
+            yield fragment if is_first else "," + fragment
+            is_first = False
+        yield '},"basket":'
+        yield self.basket.to_submit_api_basket_payload(precision).model_dump_json()
+        yield ',"dates":'
+        yield json.dumps(self.dates.strftime("%Y-%m-%d").tolist(), separators=(",", ":"))
+        yield "}"
+
+    def to_ndjson_summary_record(self, precision: int) -> str:
+        # the last NDJSON record, after the record of every position
+        return (
+            f'{{"basket":{self.basket.to_submit_api_basket_payload(precision).model_dump_json()},'
+            f'"dates":{json.dumps(self.dates.strftime("%Y-%m-%d").tolist(), separators=(",", ":"))}}}'
+        )
+
+    @staticmethod
+    def to_ndjson_position_record(position_id: int, position_metric: PositionMetric, precision: int) -> str:
+        return (
+            f'{{"id":{json.dumps(str(position_id))},'
+            f'"position":{position_metric.to_submit_api_position_payload(precision).model_dump_json()}}}'
+        )
+
+    @staticmethod
+    def to_position_fragment(positions: dict[int, PositionMetric], precision: int) -> str:
+        # "<id>":{...} members of the positions object, without the enclosing braces
+        return ",".join(
+            f"{json.dumps(str(position_id))}:"
+            f"{position_metric.to_submit_api_position_payload(precision).model_dump_json()}"
+            for position_id, position_metric in positions.items()
+        )
+
 
 @dataclass
 class BaseMetric:
@@ -47,6 +182,10 @@ class BaseMetric:
     def _truncate_fields(self, precision: int, value: Series[float]) -> Series[float]:
         return trunc(value.astype(float) * 10**precision) / 10**precision
 
+    def get_values(self, field_name: str) -> NDArray:
+        values: NDArray = getattr(self, field_name).to_numpy(dtype=float, copy=False)
+        return values
+
 
 @dataclass
 class PositionMetric(BaseMetric):
@@ -60,3 +199,100 @@ class PositionMetric(BaseMetric):
 class BasketMetric(BaseMetric):
     def to_submit_api_basket_payload(self, precision: int) -> BasketPayload:
         return BasketPayload(**self._to_submit_api_payload_dict(precision))
+
+
+@dataclass
+class AnalyticsMetric:
+    cumulative_return: Series[float]
+    rolling_volatility: Series[float]
+    drawdown: Series[float]
+    max_drawdown: float
+
+    def get_values(self, field_name: str) -> NDArray:
+        if field_name == "max_drawdown":
+            # a single value per series, repeated on every date of the export
+            return full(len(self.drawdown), self.max_drawdown)
+        values: NDArray = getattr(self, field_name).to_numpy(dtype=float, copy=False)
+        return values
+
+
+@dataclass
+class FinancialAnalytics:
+    positions: dict[int, AnalyticsMetric]
+    basket: AnalyticsMetric
+
+
+@dataclass
+class FinancialAttribution:
+    # contribution of every position to the basket return percentage, one row per position in positions order
+    contributions: NDArray
+    # the largest absolute contributions of every date, one row per rank
+    top_position_ids: NDArray[int64]
+    top_contributions: NDArray
+
+    def to_json(self, dates: DatetimeIndex, precision: int) -> str:
+        return json.dumps(
+            {
+                date: [
+                    {"id": str(position_id), "contribution": round(float(contribution), precision)}
+                    for position_id, contribution in zip(
+                        self.top_position_ids[:, column], self.top_contributions[:, column], strict=True
+                    )
+                ]
+                for column, date in enumerate(dates.strftime("%Y-%m-%d"))
+            },
+            indent=4,
+        )
+
+
+@dataclass
+class RiskMetrics:
+    # one row and column per instrument and currency held on the last date, in the target currency
+    instrument_ids: list[str]
+    currencies: list[str]
+    exposures: NDArray
+    covariance: NDArray
+    portfolio_volatility: float
+    value_at_risk: float
+    confidence: float
+    observations: int
+
+    def to_json(self, precision: int) -> str:
+        return json.dumps(
+            {
+                "confidence": self.confidence,
+                "observations": self.observations,
+                "portfolio_volatility": round(self.portfolio_volatility, precision),
+                "value_at_risk": round(self.value_at_risk, precision),
+                "instruments": [
+                    {
+                        "instrument_id": instrument_id,
+                        "currency": currency,
+                        "exposure": round(float(exposure), precision),
+                    }
+                    for instrument_id, currency, exposure in zip(
+                        self.instrument_ids, self.currencies, self.exposures, strict=True
+                    )
+                ],
+                "covariance": self.covariance.round(precision).tolist(),
+            },
+            indent=4,
+        )
+
+
+EXPORT_COLUMNS = {
+    "IsOpen": "is_open",
+    "Price": "price",
+    "Value": "value",
+    "ReturnPerPeriod": "return_per_period",
+    "ReturnPerPeriodPercentage": "return_per_period_percentage",
+}
+
+ATTRIBUTION_COLUMN = "Contribution"
+
+ANALYTICS_COLUMNS = {
+    "CumulativeReturn": "cumulative_return",
+    "RollingVolatility": "rolling_volatility",
+    "Drawdown": "drawdown",
+    "MaxDrawdown": "max_drawdown",
+}
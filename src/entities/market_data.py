@@ -0,0 +1,90 @@
+from dataclasses import dataclass, field
+from datetime import date
+
+from numpy import array_equal, datetime64, float64, ones, searchsorted, vstack, zeros
+from numpy.typing import NDArray
+
+
+@dataclass
+class MarketData:
+    dates: NDArray[datetime64]
+    instrument_ids: list[str]
+    prices: NDArray[float64]
+    fx_pairs: list[str]
+    fx_rates: NDArray[float64]
+    _instrument_rows: dict[str, int] = field(init=False, repr=False)
+    _fx_pair_rows: dict[str, int] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._instrument_rows = {instrument_id: row for row, instrument_id in enumerate(self.instrument_ids)}
+        self._fx_pair_rows = {fx_pair: row for row, fx_pair in enumerate(self.fx_pairs)}
+
+    def get_prices(self, instrument_id: str) -> NDArray[float64] | None:
+        row = self._instrument_rows.get(instrument_id)
+        return None if row is None else self.prices[row]
+
+    def get_fx_rates(self, fx_pair: str) -> NDArray[float64] | None:
+        row = self._fx_pair_rows.get(fx_pair)
+        return None if row is None else self.fx_rates[row]
+
+    def get_instruments_prices(self, instrument_ids: NDArray) -> NDArray[float64]:
+        # one row of prices per instrument, in the given order
+        prices = []
+        for instrument_id in instrument_ids:
+            instrument_prices = self.get_prices(str(instrument_id))
+            if instrument_prices is None:
+                raise MarketDataException(f"Prices data is not available for {instrument_id}")
+            prices.append(instrument_prices)
+        return vstack(prices) if prices else zeros((0, len(self.dates)))
+
+    def get_currencies_fx_rates(self, currencies: NDArray, target_currency: str) -> NDArray[float64]:
+        # one row of rates to the target currency per currency, in the given order, the target currency is 1.0
+        fx_rates = []
+        for currency in currencies:
+            if currency == target_currency:
+                fx_rates.append(ones(len(self.dates)))
+                continue
+            currency_fx_rates = self.get_fx_rates(f"{currency}{target_currency}")
+            if currency_fx_rates is None:
+                raise MarketDataException(f"Fx rates data is not available for {currency}{target_currency}")
+            fx_rates.append(currency_fx_rates)
+        return vstack(fx_rates) if fx_rates else zeros((0, len(self.dates)))
+
+    def covers(self, instrument_ids: set[str], fx_pairs: set[str], start_date: date, end_date: date) -> bool:
+        if len(self.dates) == 0:
+            return False
+        return (
+            self.dates[0] <= datetime64(start_date, "D")
+            and self.dates[-1] >= datetime64(end_date, "D")
+            and instrument_ids <= self._instrument_rows.keys()
+            and fx_pairs <= self._fx_pair_rows.keys()
+        )
+
+    def slice(self, start_date: date, end_date: date) -> MarketData:
+        start = int(searchsorted(self.dates, datetime64(start_date, "D"), side="left"))
+        end = int(searchsorted(self.dates, datetime64(end_date, "D"), side="right"))
+        return MarketData(
+            dates=self.dates[start:end],
+            instrument_ids=self.instrument_ids,
+            prices=self.prices[:, start:end],
+            fx_pairs=self.fx_pairs,
+            fx_rates=self.fx_rates[:, start:end],
+        )
+
+    def merge(self, other: MarketData) -> MarketData:
+        # rows of other are added, or replace the rows of the same key, the dates of both must be the same
+        if not array_equal(self.dates, other.dates):
+            raise MarketDataException("Cannot merge market data over different dates")
+        instrument_rows = [row for row, key in enumerate(self.instrument_ids) if key not in other._instrument_rows]
+        fx_pair_rows = [row for row, key in enumerate(self.fx_pairs) if key not in other._fx_pair_rows]
+        return MarketData(
+            dates=self.dates,
+            instrument_ids=[self.instrument_ids[row] for row in instrument_rows] + other.instrument_ids,
+            prices=vstack([self.prices[instrument_rows], other.prices]),
+            fx_pairs=[self.fx_pairs[row] for row in fx_pair_rows] + other.fx_pairs,
+            fx_rates=vstack([self.fx_rates[fx_pair_rows], other.fx_rates]),
+        )
+
+
+class MarketDataException(Exception):
+    pass
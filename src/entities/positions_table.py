@@ -0,0 +1,180 @@
+from dataclasses import dataclass, fields
+from hashlib import sha256
+from typing import Iterator
+
+from numpy import (
+    array,
+    datetime64,
+    float64,
+    iinfo,
+    int64,
+    isfinite,
+    isnan,
+    str_,
+    trunc,
+)
+from numpy.typing import NDArray
+from pandas import DataFrame, Series, isna, to_datetime, to_numeric
+
+from models.positions_data import PositionsData
+
+# close day of a position that is still open, compares greater than any real day
+OPEN_POSITION_CLOSE_DAY = int(iinfo(int64).max)
+
+POSITION_COLUMNS = [
+    "id",
+    "open_date",
+    "close_date",
+    "open_price",
+    "close_price",
+    "quantity",
+    "instrument_id",
+    "instrument_currency",
+    "tag",
+]
+
+# PositionDTO requires these keys although their values may be null
+NULLABLE_REQUIRED_COLUMNS = ["close_date", "close_price"]
+
+
+@dataclass(frozen=True, slots=True)
+class PositionRow:
+    id: int
+    open_date: datetime64
+    close_date: datetime64 | None
+    open_price: float
+    close_price: float | None
+    quantity: int
+    instrument_id: int
+    instrument_currency: str
+    tag: str | None
+
+
+@dataclass
+class PositionsTable:
+    ids: NDArray[int64]
+    # dates are days since the unix epoch
+    open_days: NDArray[int64]
+    close_days: NDArray[int64]
+    open_prices: NDArray[float64]
+    close_prices: NDArray[float64]
+    quantities: NDArray[int64]
+    instrument_ids: NDArray[int64]
+    instrument_currencies: NDArray[str_]
+    # empty string for untagged positions
+    tags: NDArray[str_]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def from_records(cls, records: list[dict]) -> PositionsTable:
+        # every column is validated as a whole, mirroring the PositionDTO field types
+        try:
+            for column in NULLABLE_REQUIRED_COLUMNS:
+                is_missing_key = array([column not in record for record in records], dtype=bool)
+                cls._raise_on_invalid_rows(is_missing_key, f"{column} is missing")
+            # object columns keep the parsed python integers, an inferred float64 column would round them
+            frame = DataFrame(records, columns=POSITION_COLUMNS, dtype=object)
+            open_days = cls._to_epoch_days(frame["open_date"], "open_date", nullable=False)
+            close_days = cls._to_epoch_days(frame["close_date"], "close_date", nullable=True)
+            table = cls(
+                ids=cls._to_integers(frame["id"], "id"),
+                open_days=open_days,
+                close_days=close_days,
+                open_prices=cls._to_floats(frame["open_price"], "open_price", nullable=False),
+                close_prices=cls._to_floats(frame["close_price"], "close_price", nullable=True),
+                quantities=cls._to_integers(frame["quantity"], "quantity"),
+                instrument_ids=cls._to_integers(frame["instrument_id"], "instrument_id"),
+                instrument_currencies=cls._to_strings(frame["instrument_currency"], "instrument_currency"),
+                tags=cls._to_strings(frame["tag"].fillna(""), "tag"),
+            )
+        except (TypeError, ValueError) as e:
+            raise PositionsTableException(str(e)) from e
+        return table
+
+    @classmethod
+    def from_positions_data(cls, positions_data: PositionsData) -> PositionsTable:
+        return cls.from_records([position.model_dump() for position in positions_data.positions])
+
+    def take(self, rows: slice | NDArray) -> PositionsTable:
+        return PositionsTable(**{column.name: getattr(self, column.name)[rows] for column in fields(self)})
+
+    def fingerprint(self) -> str:
+        # positions are hashed in id order, so the fingerprint does not depend on the file order
+        order = self.ids.argsort(kind="stable")
+        digest = sha256()
+        for column in fields(self):
+            digest.update(column.name.encode("utf-8"))
+            digest.update(getattr(self, column.name)[order].tobytes())
+        return digest.hexdigest()
+
+    def get_position(self, row: int) -> PositionRow:
+        close_day = int(self.close_days[row])
+        close_price = float(self.close_prices[row])
+        return PositionRow(
+            id=int(self.ids[row]),
+            open_date=datetime64(int(self.open_days[row]), "D"),
+            close_date=None if close_day == OPEN_POSITION_CLOSE_DAY else datetime64(close_day, "D"),
+            open_price=float(self.open_prices[row]),
+            close_price=None if isnan(close_price) else close_price,
+            quantity=int(self.quantities[row]),
+            instrument_id=int(self.instrument_ids[row]),
+            instrument_currency=str(self.instrument_currencies[row]),
+            tag=str(self.tags[row]) or None,
+        )
+
+    def iter_positions(self) -> Iterator[PositionRow]:
+        for row in range(len(self)):
+            yield self.get_position(row)
+
+    @staticmethod
+    def _raise_on_invalid_rows(is_invalid: NDArray, reason: str) -> None:
+        if is_invalid.any():
+            raise PositionsTableException(f"Invalid position at row {int(is_invalid.argmax())}: {reason}")
+
+    @classmethod
+    def _to_floats(cls, column: Series, name: str, nullable: bool) -> NDArray[float64]:
+        values: NDArray[float64] = to_numeric(column, errors="coerce").to_numpy(dtype=float64, na_value=float("nan"))
+        is_missing = isna(column).to_numpy()
+        cls._raise_on_invalid_rows(isnan(values) & ~is_missing, f"{name} is not a number")
+        if not nullable:
+            cls._raise_on_invalid_rows(is_missing, f"{name} is missing")
+        return values
+
+    @classmethod
+    def _to_integers(cls, column: Series, name: str) -> NDArray[int64]:
+        values = cls._to_floats(column, name, nullable=False)
+        cls._raise_on_invalid_rows(~isfinite(values) | (trunc(values) != values), f"{name} is not an integer")
+        # float64 holds integers up to 2**53 only, the checked column is parsed again as int64
+        numbers = to_numeric(column)
+        if numbers.dtype.kind == "f":
+            numbers = to_numeric(column.map(lambda value: int(value) if isinstance(value, float) else value))
+        try:
+            integers: NDArray[int64] = numbers.astype("Int64").to_numpy(dtype=int64)
+        except (TypeError, OverflowError) as e:
+            raise PositionsTableException(f"Invalid position: {name} is not a 64-bit integer") from e
+        return integers
+
+    @classmethod
+    def _to_strings(cls, column: Series, name: str) -> NDArray[str_]:
+        is_not_string = ~column.map(type).eq(str).to_numpy()
+        cls._raise_on_invalid_rows(is_not_string, f"{name} is not a string")
+        strings: NDArray[str_] = column.to_numpy(dtype=str)
+        return strings
+
+    @classmethod
+    def _to_epoch_days(cls, column: Series, name: str, nullable: bool) -> NDArray[int64]:
+        is_missing = isna(column).to_numpy()
+        if not nullable:
+            cls._raise_on_invalid_rows(is_missing, f"{name} is missing")
+        dates = to_datetime(column, format="%Y-%m-%d", errors="coerce")
+        is_invalid = isna(dates).to_numpy() & ~is_missing
+        cls._raise_on_invalid_rows(is_invalid, f"{name} is not a YYYY-MM-DD date")
+        days: NDArray[int64] = dates.to_numpy(dtype="datetime64[D]").astype(int64)
+        days[is_missing] = OPEN_POSITION_CLOSE_DAY
+        return days
+
+
+class PositionsTableException(Exception):
+    pass
@@ -0,0 +1,89 @@
+import pytest
+from pandas import Series, date_range
+from pandas.testing import assert_series_equal
+
+from entities.basket_accumulator import BasketAccumulator, BasketAccumulatorException
+from entities.financial_metrics import PositionMetric
+from services.basket_calculator import BasketCalculator
+
+
+class TestBasketAccumulator:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.date_index = date_range("2023-01-01", "2023-01-03")
+
+    def _make_position_metric(self, is_open, value, value_start, return_per_period) -> PositionMetric:
+        return PositionMetric(
+            is_open=Series(is_open, index=self.date_index, dtype=float),
+            price=Series(1.0, index=self.date_index),
+            value=Series(value, index=self.date_index, dtype=float),
+            return_per_period=Series(return_per_period, index=self.date_index, dtype=float),
+            return_per_period_percentage=Series(0.0, index=self.date_index),
+            value_start=Series(value_start, index=self.date_index, dtype=float),
+        )
+
+    def test_finalize_should_match_basket_calculator(self):
+        position_metrics = [
+            self._make_position_metric([0, 1, 1], [0, 10, 12], [0, 0, 10], [0, 0, 2]),
+            self._make_position_metric([1, 1, 0], [5, None, 0], [5, 5, 6], [1, None, -6]),
+        ]
+        basket_accumulator = BasketAccumulator.empty(len(self.date_index))
+        for position_metric in position_metrics:
+            basket_accumulator.add(position_metric)
+
+        expected = BasketCalculator().calculate(position_metrics)
+        actual = basket_accumulator.finalize(self.date_index)
+
+        for field_name in ["is_open", "price", "value", "return_per_period", "return_per_period_percentage"]:
+            assert_series_equal(
+                getattr(actual, field_name), getattr(expected, field_name), check_names=False, check_freq=False
+            )
+
+    def test_merge_when_shards_reduced_in_any_order_should_match_single_accumulator(self):
+        position_metrics = [
+            self._make_position_metric([0, 1, 1], [0, 10, 12], [0, 0, 10], [0, 0, 2]),
+            self._make_position_metric([1, 1, 0], [5, None, 0], [5, 5, 6], [1, None, -6]),
+            self._make_position_metric([0, 0, 1], [0, 0, 3], [0, 0, 2], [0, 0, 1]),
+        ]
+        expected = BasketAccumulator.empty(len(self.date_index))
+        shards = []
+        for position_metric in position_metrics:
+            expected.add(position_metric)
+            shard = BasketAccumulator.empty(len(self.date_index))
+            shard.add(position_metric)
+            shards.append(shard)
+
+        left_first = shards[0].merge(shards[1]).merge(shards[2]).finalize(self.date_index)
+        right_first = shards[2].merge(shards[1].merge(shards[0])).finalize(self.date_index)
+
+        for actual in [left_first, right_first]:
+            for field_name in ["is_open", "value", "return_per_period", "return_per_period_percentage"]:
+                assert_series_equal(
+                    getattr(actual, field_name), getattr(expected.finalize(self.date_index), field_name)
+                )
+
+    def test_merge_when_dates_differ_should_raise_expected_error_message(self):
+        with pytest.raises(BasketAccumulatorException) as ex:
+            BasketAccumulator.empty(3).merge(BasketAccumulator.empty(4))
+
+        assert "Cannot merge basket accumulators over 3 and 4 dates" in str(ex.value)
+
+    def test_from_bytes_should_restore_serialized_accumulator(self):
+        basket_accumulator = BasketAccumulator.empty(len(self.date_index))
+        basket_accumulator.add(self._make_position_metric([0, 1, 1], [0, 10, 12], [0, 0, 10], [0, 0, 2]))
+
+        data = basket_accumulator.to_bytes()
+        actual = BasketAccumulator.from_bytes(data)
+
+        assert len(data) == 9 + 4 * 3 * 8
+        assert_series_equal(
+            actual.finalize(self.date_index).is_open, basket_accumulator.finalize(self.date_index).is_open
+        )
+        assert actual.value.tolist() == [0.0, 10.0, 12.0]
+        assert actual.value_start.tolist() == [0.0, 0.0, 10.0]
+        assert actual.return_per_period.tolist() == [0.0, 0.0, 2.0]
+
+    @pytest.mark.parametrize("data", [b"BSKT", b"XXXX\x01\x00\x00\x00\x00", BasketAccumulator.empty(2).to_bytes()[:-1]])
+    def test_from_bytes_when_invalid_should_raise_error(self, data):
+        with pytest.raises(BasketAccumulatorException):
+            BasketAccumulator.from_bytes(data)
@@ -0,0 +1,118 @@
+import json
+from datetime import date
+
+import pytest
+from pandas import Series, date_range
+from pyarrow import feather, ipc, memory_map, parquet
+
+from entities.financial_metrics import BasketMetric, FinancialMetrics, PositionMetric
+from models.financial_metrics_export import ExportFormat, ExportLayout
+from services.analytics_calculator import AnalyticsCalculator
+from services.attribution_calculator import AttributionCalculator
+
+
+class TestFinancialMetrics:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        test_date_index = date_range("2023-01-01", "2023-01-03")
+        self.financial_metrics = FinancialMetrics(
+            positions={
+                position_id: PositionMetric(
+                    is_open=Series([1.0, 1.0, 0.0], index=test_date_index),
+                    price=Series([10.0, 11.0, 12.0], index=test_date_index) * position_id,
+                    value=Series([100.0, 110.0, 0.0], index=test_date_index) * position_id,
+                    return_per_period=Series([0.0, 10.0, 0.0], index=test_date_index) * position_id,
+                    return_per_period_percentage=Series([0.0, 0.1, 0.0], index=test_date_index),
+                    value_start=Series([100.0, 100.0, 0.0], index=test_date_index) * position_id,
+                )
+                for position_id in (1, 2)
+            },
+            basket=BasketMetric(
+                is_open=Series([1.0, 1.0, 0.0], index=test_date_index),
+                price=Series(0.0, index=test_date_index),
+                value=Series([300.0, 330.0, 0.0], index=test_date_index),
+                return_per_period=Series([0.0, 30.0, 0.0], index=test_date_index),
+                return_per_period_percentage=Series([0.0, 0.1, 0.0], index=test_date_index),
+            ),
+            dates=test_date_index,
+        )
+
+    def test_to_arrow_table_when_long_should_return_one_row_per_metric_and_date(self):
+        actual = self.financial_metrics.to_arrow_table(ExportLayout.LONG)
+
+        assert actual.column_names == [
+            "position_id",
+            "date",
+            "IsOpen",
+            "Price",
+            "Value",
+            "ReturnPerPeriod",
+            "ReturnPerPeriodPercentage",
+        ]
+        assert actual.num_rows == 9
+        assert actual["position_id"].to_pylist() == [1, 1, 1, 2, 2, 2, None, None, None]
+        assert actual["date"].to_pylist()[3:6] == [date(2023, 1, 1), date(2023, 1, 2), date(2023, 1, 3)]
+        assert actual["Value"].to_pylist() == [100.0, 110.0, 0.0, 200.0, 220.0, 0.0, 300.0, 330.0, 0.0]
+
+    def test_to_arrow_table_when_wide_should_return_one_row_per_date(self):
+        actual = self.financial_metrics.to_arrow_table(ExportLayout.WIDE)
+
+        assert actual.num_rows == 3
+        assert actual.num_columns == 1 + 3 * 5
+        assert actual["2.Price"].to_pylist() == [20.0, 22.0, 24.0]
+        assert actual["basket.ReturnPerPeriod"].to_pylist() == [0.0, 30.0, 0.0]
+
+    def test_export_when_arrow_should_write_memory_mappable_file(self, tmp_path):
+        path = str(tmp_path / "metrics.arrow")
+
+        self.financial_metrics.export(path, ExportLayout.LONG, ExportFormat.ARROW)
+
+        with memory_map(path) as source:
+            actual = ipc.open_file(source).read_all()
+        assert actual.equals(self.financial_metrics.to_arrow_table(ExportLayout.LONG))
+        assert feather.read_table(path).num_rows == 9
+
+    def test_export_when_parquet_should_write_parquet_file(self, tmp_path):
+        path = str(tmp_path / "metrics.parquet")
+
+        self.financial_metrics.export(path, ExportLayout.WIDE, ExportFormat.PARQUET)
+
+        assert parquet.read_table(path).equals(self.financial_metrics.to_arrow_table(ExportLayout.WIDE))
+
+    def test_to_arrow_table_when_analytics_calculated_should_include_analytics_columns(self):
+        self.financial_metrics.analytics = AnalyticsCalculator(rolling_window=2).calculate(self.financial_metrics)
+
+        long_table = self.financial_metrics.to_arrow_table(ExportLayout.LONG)
+        wide_table = self.financial_metrics.to_arrow_table(ExportLayout.WIDE)
+
+        assert long_table.column_names[-4:] == ["CumulativeReturn", "RollingVolatility", "Drawdown", "MaxDrawdown"]
+        assert long_table["CumulativeReturn"].to_pylist()[-3:] == pytest.approx([0.0, 0.1, 0.1])
+        assert wide_table.num_columns == 1 + 3 * 9
+        assert wide_table["1.Drawdown"].to_pylist() == [0.0, 0.0, 0.0]
+        assert wide_table["1.MaxDrawdown"].to_pylist() == [0.0, 0.0, 0.0]
+
+    def test_to_arrow_table_when_attribution_calculated_should_include_contribution_column(self):
+        self.financial_metrics.attribution = AttributionCalculator(top_contributors=1).calculate(self.financial_metrics)
+
+        long_table = self.financial_metrics.to_arrow_table(ExportLayout.LONG)
+
+        assert long_table.column_names[-1] == "Contribution"
+        assert long_table["Contribution"].to_pylist() == pytest.approx(
+            [0.0, 10 / 300, 0.0, 0.0, 20 / 300, 0.0, 0.0, 0.1, 0.0]
+        )
+        assert json.loads(self.financial_metrics.attribution.to_json(self.financial_metrics.dates, 4))[
+            "2023-01-02"
+        ] == [{"id": "2", "contribution": 0.0667}]
+
+    def test_to_arrow_table_when_sub_baskets_calculated_should_include_labelled_basket_rows(self):
+        self.financial_metrics.sub_baskets = {"currency": {"EUR": self.financial_metrics.basket}}
+        self.financial_metrics.analytics = AnalyticsCalculator(rolling_window=2).calculate(self.financial_metrics)
+
+        long_table = self.financial_metrics.to_arrow_table(ExportLayout.LONG)
+        wide_table = self.financial_metrics.to_arrow_table(ExportLayout.WIDE)
+
+        assert long_table.num_rows == 12
+        assert long_table["position_id"].to_pylist()[6:] == [None] * 6
+        assert long_table["basket"].to_pylist() == [None] * 6 + [None] * 3 + ["currency=EUR"] * 3
+        assert long_table["CumulativeReturn"].is_null(nan_is_null=True).to_pylist()[9:] == [True] * 3
+        assert wide_table["basket[currency=EUR].Value"].to_pylist() == [300.0, 330.0, 0.0]
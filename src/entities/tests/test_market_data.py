@@ -0,0 +1,65 @@
+import pytest
+from numpy import array, datetime64
+
+from entities.market_data import MarketData, MarketDataException
+
+
+class TestMarketData:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.dates = array(["2023-01-01", "2023-01-02"], dtype="datetime64[D]")
+        self.market_data = MarketData(
+            dates=self.dates,
+            instrument_ids=["1000", "2000"],
+            prices=array([[1.0, 2.0], [3.0, 4.0]]),
+            fx_pairs=["EURUSD"],
+            fx_rates=array([[1.1, 1.2]]),
+        )
+
+    def test_get_instruments_prices_should_return_a_row_per_instrument_in_order(self):
+        actual = self.market_data.get_instruments_prices(array([2000, 1000]))
+
+        assert actual.tolist() == [[3.0, 4.0], [1.0, 2.0]]
+
+    def test_get_instruments_prices_when_prices_missing_should_raise_expected_exception_message(self):
+        with pytest.raises(MarketDataException) as ex:
+            self.market_data.get_instruments_prices(array([1000, 3000]))
+
+        assert "Prices data is not available for 3000" in str(ex.value)
+
+    def test_get_currencies_fx_rates_should_return_ones_for_the_target_currency(self):
+        actual = self.market_data.get_currencies_fx_rates(array(["EUR", "USD"]), "USD")
+
+        assert actual.tolist() == [[1.1, 1.2], [1.0, 1.0]]
+
+    def test_get_currencies_fx_rates_when_fx_rates_missing_should_raise_expected_exception_message(self):
+        with pytest.raises(MarketDataException) as ex:
+            self.market_data.get_currencies_fx_rates(array(["GBP"]), "USD")
+
+        assert "Fx rates data is not available for GBPUSD" in str(ex.value)
+
+    def test_merge_should_add_new_rows_and_replace_rows_of_the_same_key(self):
+        other = MarketData(
+            dates=self.dates,
+            instrument_ids=["2000", "3000"],
+            prices=array([[5.0, 6.0], [7.0, 8.0]]),
+            fx_pairs=["SEKUSD"],
+            fx_rates=array([[0.1, 0.2]]),
+        )
+
+        actual = self.market_data.merge(other)
+
+        assert actual.instrument_ids == ["1000", "2000", "3000"]
+        assert actual.get_prices("1000").tolist() == [1.0, 2.0]
+        assert actual.get_prices("2000").tolist() == [5.0, 6.0]
+        assert actual.get_prices("3000").tolist() == [7.0, 8.0]
+        assert actual.get_fx_rates("EURUSD").tolist() == [1.1, 1.2]
+        assert actual.get_fx_rates("SEKUSD").tolist() == [0.1, 0.2]
+
+    def test_merge_when_dates_differ_should_raise_expected_exception_message(self):
+        other = self.market_data.slice(datetime64("2023-01-02").item(), datetime64("2023-01-02").item())
+
+        with pytest.raises(MarketDataException) as ex:
+            self.market_data.merge(other)
+
+        assert "Cannot merge market data over different dates" in str(ex.value)
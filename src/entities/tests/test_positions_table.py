@@ -0,0 +1,111 @@
+import pytest
+from numpy import datetime64, isnan
+
+from entities.positions_table import OPEN_POSITION_CLOSE_DAY, PositionsTable, PositionsTableException
+from models.positions_data import PositionDTO, PositionsData
+
+
+class TestPositionsTable:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.test_records = [
+            {
+                "id": 2,
+                "open_date": "2023-01-02",
+                "close_date": "2023-01-05",
+                "open_price": 102.0,
+                "close_price": 105.0,
+                "quantity": 10,
+                "instrument_id": 1001,
+                "instrument_currency": "EUR",
+            },
+            {
+                "id": 1,
+                "open_date": "2023-01-01",
+                "close_date": None,
+                "open_price": 100.5,
+                "close_price": None,
+                "quantity": 5.0,
+                "instrument_id": 1000,
+                "instrument_currency": "USD",
+            },
+        ]
+
+    def test_from_records_should_return_expected_columns(self):
+        actual = PositionsTable.from_records(self.test_records)
+
+        assert actual.ids.tolist() == [2, 1]
+        assert actual.open_days.tolist() == [19359, 19358]
+        assert actual.close_days.tolist() == [19362, OPEN_POSITION_CLOSE_DAY]
+        assert actual.close_prices[0] == 105.0 and isnan(actual.close_prices[1])
+        assert actual.quantities.tolist() == [10, 5]
+        assert actual.instrument_currencies.tolist() == ["EUR", "USD"]
+
+    @pytest.mark.parametrize(
+        "field, value, expected_error",
+        [
+            ("id", 1.5, "id is not an integer"),
+            ("quantity", None, "quantity is missing"),
+            ("open_price", "abc", "open_price is not a number"),
+            ("open_date", "2023-13-01", "open_date is not a YYYY-MM-DD date"),
+            ("instrument_currency", 978, "instrument_currency is not a string"),
+        ],
+    )
+    def test_from_records_when_invalid_should_raise_expected_error_message(self, field, value, expected_error):
+        self.test_records[1][field] = value
+
+        with pytest.raises(PositionsTableException) as ex:
+            PositionsTable.from_records(self.test_records)
+
+        assert f"Invalid position at row 1: {expected_error}" in str(ex.value)
+
+    def test_from_records_when_integers_above_float_precision_should_keep_exact_values(self):
+        self.test_records[0]["id"] = 2**53 + 1
+        self.test_records[1]["instrument_id"] = str(2**62 + 1)
+
+        actual = PositionsTable.from_records(self.test_records)
+
+        assert actual.ids.tolist() == [2**53 + 1, 1]
+        assert actual.instrument_ids.tolist() == [1001, 2**62 + 1]
+        assert actual.quantities.tolist() == [10, 5]
+
+    def test_from_records_when_integer_out_of_range_should_raise_expected_error_message(self):
+        self.test_records[1]["id"] = 2**63
+
+        with pytest.raises(PositionsTableException) as ex:
+            PositionsTable.from_records(self.test_records)
+
+        assert "id is not a 64-bit integer" in str(ex.value)
+
+    @pytest.mark.parametrize("field", ["close_date", "close_price"])
+    def test_from_records_when_nullable_key_missing_should_raise_expected_error_message(self, field):
+        del self.test_records[1][field]
+
+        with pytest.raises(PositionsTableException) as ex:
+            PositionsTable.from_records(self.test_records)
+
+        assert f"Invalid position at row 1: {field} is missing" in str(ex.value)
+
+    def test_from_positions_data_should_match_from_records(self):
+        positions_data = PositionsData(positions=[PositionDTO.model_validate(r) for r in self.test_records])
+
+        actual = PositionsTable.from_positions_data(positions_data)
+
+        assert actual.fingerprint() == PositionsTable.from_records(self.test_records).fingerprint()
+
+    def test_get_position_should_return_parsed_dates(self):
+        table = PositionsTable.from_records(self.test_records)
+
+        actual = list(table.iter_positions())
+
+        assert actual[0].open_date == datetime64("2023-01-02")
+        assert actual[0].close_date == datetime64("2023-01-05")
+        assert actual[1].close_date is None
+        assert actual[1].close_price is None
+
+    def test_fingerprint_should_ignore_positions_order(self):
+        actual = PositionsTable.from_records(self.test_records).fingerprint()
+
+        assert actual == PositionsTable.from_records(self.test_records[::-1]).fingerprint()
+        self.test_records[0]["quantity"] = 11
+        assert actual != PositionsTable.from_records(self.test_records).fingerprint()
@@ -0,0 +1,70 @@
+from dataclasses import dataclass
+
+from numpy import full, int64, isnan, nan, nan_to_num, zeros
+from numpy.typing import NDArray
+from pandas import DatetimeIndex
+
+from entities.basket_accumulator import BasketAccumulator
+from entities.financial_metrics import BasketMetric, PositionMetric
+from entities.market_data import MarketData
+from entities.positions_table import PositionRow
+
+
+@dataclass
+class WatchState:
+    # last calculated positions of a watch session and per-date basket sums that positions can be added to and
+    # removed from, so an edit of the positions file only recalculates the positions it changed
+    date_index: DatetimeIndex
+    market_data: MarketData
+    positions: dict[int, PositionRow]
+    position_metrics: dict[int, PositionMetric]
+    # a max cannot be undone, the basket IsOpen is derived from the count of open positions instead
+    open_counts: NDArray[int64]
+    value: NDArray
+    value_start: NDArray
+    # dates without any value_start left are reset to an exact 0, the subtractions would leave rounding noise
+    value_start_counts: NDArray[int64]
+    return_per_period: NDArray
+
+    @classmethod
+    def empty(cls, date_index: DatetimeIndex, market_data: MarketData) -> WatchState:
+        return cls(
+            date_index=date_index,
+            market_data=market_data,
+            positions={},
+            position_metrics={},
+            open_counts=zeros(len(date_index), dtype=int64),
+            value=zeros(len(date_index)),
+            value_start=zeros(len(date_index)),
+            value_start_counts=zeros(len(date_index), dtype=int64),
+            return_per_period=zeros(len(date_index)),
+        )
+
+    def add(self, position: PositionRow, position_metric: PositionMetric) -> None:
+        self.positions[position.id] = position
+        self.position_metrics[position.id] = position_metric
+        self._update_sums(position_metric, 1)
+
+    def remove(self, position_id: int) -> None:
+        del self.positions[position_id]
+        self._update_sums(self.position_metrics.pop(position_id), -1)
+
+    def get_basket(self) -> BasketMetric:
+        # missing values are skipped, as in BasketAccumulator.add
+        is_open = (self.open_counts > 0).astype(float) if self.position_metrics else full(len(self.date_index), nan)
+        value_start = self.value_start.copy()
+        value_start[self.value_start_counts == 0] = 0.0
+        return BasketAccumulator(
+            is_open=is_open,
+            value=self.value.copy(),
+            value_start=value_start,
+            return_per_period=self.return_per_period.copy(),
+        ).finalize(self.date_index)
+
+    def _update_sums(self, position_metric: PositionMetric, sign: int) -> None:
+        value_start = position_metric.value_start.to_numpy(dtype=float)
+        self.open_counts += sign * (position_metric.get_values("is_open") == 1.0)
+        self.value += sign * nan_to_num(position_metric.get_values("value"))
+        self.value_start += sign * nan_to_num(value_start)
+        self.value_start_counts += sign * ((value_start != 0) & ~isnan(value_start))
+        self.return_per_period += sign * nan_to_num(position_metric.get_values("return_per_period"))
@@ -1,10 +1,19 @@
+import sys
 import traceback
-from argparse import ArgumentParser
+from argparse import ArgumentParser, Namespace
 
 from controllers.main_controller import MainController
+from controllers.prefetch_controller import PrefetchController
+from models.basket_engine import BasketEngine
+from models.basket_grouping import BasketGrouping
+from models.financial_metrics_export import ExportFormat, ExportLayout
+from models.output_format import OutputFormat
+from models.reporting_window import ReportingPeriod
+from services.attribution_calculator import DEFAULT_TOP_CONTRIBUTORS
+from services.risk_calculator import DEFAULT_VAR_CONFIDENCE
 
 
-def main(argv: list[str] | None = None) -> tuple[str, str]:
+def main(argv: list[str] | None = None) -> tuple[str, str] | None:
     parser = ArgumentParser(
         description="Calculate simplified financial metrics for a set of positions \
             over a specified time window."
@@ -39,18 +48,309 @@ def main(argv: list[str] | None = None) -> tuple[str, str]:
         default="2024-11-10",
     )
 
+    parser.add_argument(
+        "--export-file",
+        type=str,
+        help="Optional path of a columnar export of the calculated metrics.",
+        default=None,
+    )
+
+    parser.add_argument(
+        "--export-layout",
+        type=str,
+        choices=[layout.value for layout in ExportLayout],
+        help="Layout of the export: one row per position and date (long) or one row per date (wide).",
+        default=ExportLayout.LONG.value,
+    )
+
+    parser.add_argument(
+        "--export-format",
+        type=str,
+        choices=[export_format.value for export_format in ExportFormat],
+        help="File format of the export: Arrow IPC (arrow) or Parquet (parquet).",
+        default=ExportFormat.ARROW.value,
+    )
+
+    parser.add_argument(
+        "--analytics-window",
+        type=int,
+        help="Enable cumulative return, rolling volatility, drawdown and max drawdown analytics in the export, \
+            using a rolling window of at least 2 days.",
+        default=None,
+    )
+
+    parser.add_argument(
+        "--streaming-startup",
+        action="store_true",
+        help="Request market data for every instrument as soon as it is parsed from the positions file.",
+    )
+
+    parser.add_argument(
+        "--basket-groups",
+        type=str,
+        nargs="+",
+        choices=[grouping.value for grouping in BasketGrouping],
+        help="Add sub-baskets grouped by instrument currency, instrument or position tag to the export.",
+        default=[],
+    )
+
+    parser.add_argument(
+        "--basket-engine",
+        type=str,
+        choices=[engine.value for engine in BasketEngine],
+        help="How the basket is summed: a groupby over every position series (groupby) or a sweep over the \
+            open and close events of the positions (event).",
+        default=BasketEngine.GROUPBY.value,
+    )
+
+    parser.add_argument(
+        "--memory-report",
+        action="store_true",
+        help="Print the peak traced allocations and resident memory of every stage and the API retry metrics \
+            after the results.",
+    )
+
+    parser.add_argument(
+        "--memory-budget",
+        type=int,
+        help="Memory budget in MiB. The run fails early when its estimated or measured peak exceeds it.",
+        default=None,
+    )
+
+    parser.add_argument(
+        "--report-windows",
+        type=str,
+        nargs="+",
+        choices=[period.value for period in ReportingPeriod],
+        help="Also report month, quarter and year to date windows ending on the end date, calculated once with \
+            the window of the run.",
+        default=[],
+    )
+
+    parser.add_argument(
+        "--custom-window",
+        type=str,
+        nargs=3,
+        action="append",
+        metavar=("NAME", "START_DATE", "END_DATE"),
+        help="Also report a named window within the start and end dates. Can be repeated.",
+        default=[],
+    )
+
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        help="Calculate positions in batches of this size and spill their results to disk, for books larger \
+            than memory. The payload is written to a file in the spill directory and streamed to the API.",
+        default=None,
+    )
+
+    parser.add_argument(
+        "--spill-dir",
+        type=str,
+        help="Directory of the spilled position results in chunked mode (default: a new temporary directory).",
+        default=None,
+    )
+
+    parser.add_argument(
+        "--risk-file",
+        type=str,
+        help="Optional path of a JSON risk report: instrument covariance, portfolio volatility and historical VaR \
+            of the positions held on the end date.",
+        default=None,
+    )
+
+    parser.add_argument(
+        "--var-confidence",
+        type=float,
+        help="Confidence level of the historical VaR in the risk report.",
+        default=DEFAULT_VAR_CONFIDENCE,
+    )
+
+    parser.add_argument(
+        "--attribution-file",
+        type=str,
+        help="Optional path of a JSON report of the top contributors to the basket return of every date. \
+            Adds a Contribution column to the export.",
+        default=None,
+    )
+
+    parser.add_argument(
+        "--attribution-top",
+        type=int,
+        help="Number of top contributors per date in the attribution report.",
+        default=DEFAULT_TOP_CONTRIBUTORS,
+    )
+
+    parser.add_argument(
+        "--output-format",
+        type=str,
+        choices=[output_format.value for output_format in OutputFormat],
+        help="Format of the printed result: the indented payload and submit result (json), or one compact JSON \
+            line per position as it is calculated followed by a basket and dates line, without submitting (ndjson).",
+        default=OutputFormat.JSON.value,
+    )
+
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and print updated results every time the positions file changes, \
+            recalculating only the added and changed positions.",
+    )
+
+    parser.add_argument(
+        "--watch-interval",
+        type=float,
+        help="Seconds between two checks of the positions file in watch mode.",
+        default=0.5,
+    )
+
     args = parser.parse_args(argv)
+    _validate_main_args(parser, args)
 
-    return MainController(args.positions_file, args.target_currency, args.start_date, args.end_date).run()
+    main_controller = MainController(
+        args.positions_file,
+        args.target_currency,
+        args.start_date,
+        args.end_date,
+        export_file=args.export_file,
+        export_layout=ExportLayout(args.export_layout),
+        export_format=ExportFormat(args.export_format),
+        analytics_window=args.analytics_window,
+        streaming_startup=args.streaming_startup,
+        basket_groupings=[BasketGrouping(grouping) for grouping in args.basket_groups],
+        basket_engine=BasketEngine(args.basket_engine),
+        memory_report=args.memory_report,
+        memory_budget_bytes=args.memory_budget * 1024 * 1024 if args.memory_budget is not None else None,
+        chunk_size=args.chunk_size,
+        report_periods=[ReportingPeriod(period) for period in args.report_windows],
+        custom_windows=[tuple(custom_window) for custom_window in args.custom_window],
+        spill_dir=args.spill_dir,
+        risk_file=args.risk_file,
+        var_confidence=args.var_confidence,
+        attribution_file=args.attribution_file,
+        attribution_top=args.attribution_top,
+    )
+    try:
+        if args.watch:
+            # every result is printed as soon as it is calculated, the watch only ends when interrupted
+            try:
+                for calculation_result, submit_result in main_controller.watch(args.watch_interval):
+                    print(calculation_result)
+                    print(submit_result, flush=True)
+            except KeyboardInterrupt:
+                pass
+            # every result is printed already
+            return None
+        if args.output_format == OutputFormat.NDJSON.value:
+            # records are written as they are calculated, so downstream readers do not wait for the whole run
+            for record in main_controller.stream():
+                sys.stdout.write(record + "\n")
+            sys.stdout.flush()
+            return None
+        return main_controller.run()
+    finally:
+        # the report is printed for failed runs as well, a stage over the memory budget is what it is for
+        if args.memory_report:
+            print(main_controller.get_memory_report(), file=sys.stderr)
 
 
-if __name__ == "__main__":
-    import sys
+def _validate_main_args(parser: ArgumentParser, args: Namespace) -> None:
+    if args.watch and args.output_format == OutputFormat.NDJSON.value:
+        parser.error("--watch is not available with --output-format ndjson")
+    if args.memory_budget is not None and args.memory_budget <= 0:
+        parser.error("--memory-budget must be greater than 0")
+    if args.chunk_size is not None and args.chunk_size <= 0:
+        parser.error("--chunk-size must be greater than 0")
+    if args.analytics_window is not None and args.analytics_window < 2:
+        parser.error("--analytics-window must be at least 2")
+    if args.analytics_window is not None and not args.export_file:
+        parser.error("--analytics-window requires --export-file")
+
+
+def prefetch(argv: list[str] | None = None) -> str:
+    parser = ArgumentParser(
+        prog="main.py prefetch",
+        description="Download the market data of an instrument universe into the local market data store \
+            ahead of a run, so the run reads it locally instead of waiting on the Performativ API.",
+    )
+
+    parser.add_argument(
+        "--positions-file",
+        type=str,
+        help="Path to a JSON positions file whose instruments and currencies are prefetched.",
+        default=None,
+    )
+
+    parser.add_argument(
+        "--instruments",
+        type=str,
+        nargs="+",
+        help="Instrument ids to prefetch, in addition to those of the positions file.",
+        default=[],
+    )
+
+    parser.add_argument(
+        "--currencies",
+        type=str,
+        nargs="+",
+        help="Instrument currencies whose FX rates to the target currencies are prefetched.",
+        default=[],
+    )
+
+    parser.add_argument(
+        "--target-currencies",
+        type=str,
+        nargs="+",
+        help="Target currencies of the later runs (e.g., 'USD EUR').",
+        default=["USD"],
+    )
 
+    parser.add_argument(
+        "--start-date",
+        type=str,
+        help="The start date of the prefetched window (Format: YYYY-MM-DD).",
+        default="2023-01-01",
+    )
+
+    parser.add_argument(
+        "--end-date",
+        type=str,
+        help="The end date of the prefetched window (Format: YYYY-MM-DD).",
+        default="2024-11-10",
+    )
+
+    parser.add_argument(
+        "--store-dir",
+        type=str,
+        help="Market data store directory (default: MARKET_DATA_STORE_DIR).",
+        default=None,
+    )
+
+    args = parser.parse_args(argv)
+
+    prefetch_controller = PrefetchController(
+        args.start_date,
+        args.end_date,
+        args.target_currencies,
+        path_to_positions_file=args.positions_file,
+        instrument_ids=args.instruments,
+        currencies=args.currencies,
+        store_dir=args.store_dir,
+    )
+    return prefetch_controller.run()
+
+
+if __name__ == "__main__":
     try:
-        calculation_result, submit_result = main()
-        print(calculation_result)
-        print(submit_result)
+        if sys.argv[1:2] == ["prefetch"]:
+            print(prefetch(sys.argv[2:]))
+            sys.exit(0)
+        results = main()
+        if results is not None:
+            calculation_result, submit_result = results
+            print(calculation_result)
+            print(submit_result)
         sys.exit(0)
     except Exception:
         err = traceback.format_exc()
@@ -0,0 +1,6 @@
+from enum import Enum
+
+
+class BasketEngine(str, Enum):
+    GROUPBY = "groupby"
+    EVENT = "event"
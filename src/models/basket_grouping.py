@@ -0,0 +1,7 @@
+from enum import Enum
+
+
+class BasketGrouping(str, Enum):
+    CURRENCY = "currency"
+    INSTRUMENT = "instrument"
+    TAG = "tag"
@@ -0,0 +1,11 @@
+from enum import Enum
+
+
+class ExportLayout(str, Enum):
+    LONG = "long"
+    WIDE = "wide"
+
+
+class ExportFormat(str, Enum):
+    ARROW = "arrow"
+    PARQUET = "parquet"
@@ -0,0 +1,6 @@
+from enum import Enum
+
+
+class MarketDataFillPolicy(str, Enum):
+    FORWARD_FILL = "forward_fill"
+    NONE = "none"
@@ -0,0 +1,6 @@
+from enum import Enum
+
+
+class OutputFormat(str, Enum):
+    JSON = "json"
+    NDJSON = "ndjson"
@@ -1,7 +1,9 @@
 from dataclasses import dataclass
 from datetime import date
+from math import nan
+from typing import Annotated
 
-from pydantic import BaseModel
+from pydantic import BaseModel, BeforeValidator
 
 
 @dataclass
@@ -20,6 +22,10 @@ class GetInstrumentPricesParams(BasePerformativApiParams):
     instrument_id: str
 
 
+# missing values are serialized as null, reading the payload back turns them into NaN again
+PayloadValue = Annotated[float, BeforeValidator(lambda value: nan if value is None else value)]
+
+
 class PostSubmitPayload(BaseModel):
     positions: dict[str, PositionPayload]
     basket: BasketPayload | None
@@ -27,11 +33,11 @@ class PostSubmitPayload(BaseModel):
 
 
 class BasePayload(BaseModel):
-    IsOpen: list[float]
-    Price: list[float]
-    Value: list[float]
-    ReturnPerPeriod: list[float]
-    ReturnPerPeriodPercentage: list[float]
+    IsOpen: list[PayloadValue]
+    Price: list[PayloadValue]
+    Value: list[PayloadValue]
+    ReturnPerPeriod: list[PayloadValue]
+    ReturnPerPeriodPercentage: list[PayloadValue]
 
 
 class PositionPayload(BasePayload):
@@ -10,6 +10,7 @@ class PositionDTO(BaseModel):
     quantity: int
     instrument_id: int
     instrument_currency: str
+    tag: str | None = None
 
 
 class PositionsData(BaseModel):
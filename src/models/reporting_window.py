@@ -0,0 +1,30 @@
+from datetime import date
+from enum import Enum
+
+from pydantic import BaseModel
+
+
+class ReportingPeriod(str, Enum):
+    MTD = "mtd"
+    QTD = "qtd"
+    YTD = "ytd"
+    INCEPTION = "inception"
+
+
+class ReportingWindow(BaseModel):
+    name: str
+    start_date: date
+    end_date: date
+
+    @classmethod
+    def for_period(cls, period: ReportingPeriod, end_date: date, inception_date: date) -> ReportingWindow:
+        if period == ReportingPeriod.MTD:
+            start_date = end_date.replace(day=1)
+        elif period == ReportingPeriod.QTD:
+            start_date = end_date.replace(month=(end_date.month - 1) // 3 * 3 + 1, day=1)
+        elif period == ReportingPeriod.YTD:
+            start_date = end_date.replace(month=1, day=1)
+        else:
+            start_date = inception_date
+        # no window starts before the inception of the book
+        return cls(name=period.value, start_date=max(start_date, inception_date), end_date=end_date)
@@ -0,0 +1,18 @@
+from enum import Enum
+
+from pydantic import BaseModel
+
+
+class ShockType(str, Enum):
+    # multiplicative shocks are relative changes, -0.1 lowers a price or rate by 10%
+    MULTIPLICATIVE = "multiplicative"
+    ADDITIVE = "additive"
+
+
+class Scenario(BaseModel):
+    name: str
+    shock_type: ShockType = ShockType.MULTIPLICATIVE
+    # instrument currency -> shock of its rate against the target currency
+    fx_shocks: dict[str, float] = {}
+    # instrument id -> shock of its price in local currency
+    price_shocks: dict[int, float] = {}
@@ -0,0 +1,8 @@
+from pydantic import BaseModel
+
+
+class SubmitFingerprints(BaseModel):
+    dates: list[str]
+    # position id -> fingerprint of its submitted series over dates
+    positions: dict[str, str]
+    basket: str | None
@@ -0,0 +1,227 @@
+import random
+from asyncio import AbstractEventLoop, Future, get_running_loop, sleep
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from threading import Lock
+from time import monotonic
+from typing import AsyncIterator, Awaitable, Callable, TypeVar
+
+from httpx import HTTPStatusError, TransportError
+
+T = TypeVar("T")
+
+THROTTLING_STATUS_CODES = {429, 503}
+TRANSIENT_STATUS_CODES = THROTTLING_STATUS_CODES | {502, 504}
+
+
+@dataclass
+class RetryMetrics:
+    requests: int = 0
+    retries: int = 0
+    throttled: int = 0
+    transient_errors: int = 0
+    budget_exhausted: int = 0
+    retry_wait_seconds: float = 0.0
+    concurrency_limit: float = 0.0
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float | None = None):
+        # a rate of 0 disables the limit, pauses requested through Retry-After still apply
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated_at = monotonic()
+        self._paused_until = 0.0
+        self._lock = Lock()
+
+    def reserve(self) -> float:
+        # takes a token now and returns how long the caller has to wait before using it
+        with self._lock:
+            now = monotonic()
+            wait = max(self._paused_until - now, 0.0)
+            if self.rate > 0:
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+                self._updated_at = now
+                self._tokens -= 1.0
+                wait = max(wait, -self._tokens / self.rate)
+            return wait
+
+    def pause_for(self, seconds: float) -> None:
+        with self._lock:
+            self._paused_until = max(self._paused_until, monotonic() + seconds)
+
+    async def acquire(self) -> None:
+        wait = self.reserve()
+        if wait > 0:
+            await sleep(wait)
+
+
+class AdaptiveConcurrencyLimiter:
+    def __init__(self, max_limit: int, min_limit: int = 1):
+        self.max_limit = max_limit
+        self.min_limit = min(min_limit, max_limit)
+        self.limit = float(max_limit)
+        # the slots are shared by every event loop of the process, e.g. one asyncio.run per calculation thread, so
+        # the count is guarded by a thread lock and every waiter is a future woken on its own loop
+        self._in_flight = 0
+        self._waiters: deque[tuple[AbstractEventLoop, Future[None]]] = deque()
+        self._lock = Lock()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        await self._acquire()
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def _acquire(self) -> None:
+        loop = get_running_loop()
+        while True:
+            with self._lock:
+                if self._in_flight < int(self.limit):
+                    self._in_flight += 1
+                    return
+                waiter: Future[None] = loop.create_future()
+                self._waiters.append((loop, waiter))
+            try:
+                await waiter
+            except BaseException:
+                with self._lock:
+                    if (loop, waiter) in self._waiters:
+                        self._waiters.remove((loop, waiter))
+                raise
+
+    def _release(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            waiters = list(self._waiters)
+            self._waiters.clear()
+        # every waiter checks the limit again, as with a notify_all
+        for loop, waiter in waiters:
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(self._wake, waiter)
+
+    @staticmethod
+    def _wake(waiter: Future[None]) -> None:
+        if not waiter.done():
+            waiter.set_result(None)
+
+    def on_success(self) -> None:
+        # additive increase: one more slot after a full window of successful requests
+        self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+
+    def on_throttled(self) -> None:
+        # multiplicative decrease
+        self.limit = max(float(self.min_limit), self.limit / 2.0)
+
+
+class AdaptiveClientPolicy:
+    def __init__(
+        self,
+        max_concurrency: int,
+        rate_limit: float = 0.0,
+        max_retries: int = 5,
+        retry_budget: int = 100,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+    ):
+        self.token_bucket = TokenBucket(rate_limit)
+        self.concurrency_limiter = AdaptiveConcurrencyLimiter(max_concurrency)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        # the budget is shared by every request of the run, so a failing API cannot multiply the run time
+        self.run_retry_budget = retry_budget
+        self.retry_budget = retry_budget
+        self._metrics = RetryMetrics()
+        self._metrics_lock = Lock()
+
+    def start_run(self) -> None:
+        # the retry budget and the metrics are per run, the learned concurrency limit is kept
+        with self._metrics_lock:
+            self.retry_budget = self.run_retry_budget
+            self._metrics = RetryMetrics()
+
+    @property
+    def metrics(self) -> RetryMetrics:
+        with self._metrics_lock:
+            return replace(self._metrics, concurrency_limit=self.concurrency_limiter.limit)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        await self.token_bucket.acquire()
+        async with self.concurrency_limiter.slot():
+            yield
+
+    async def call(self, operation: Callable[[], Awaitable[T]]) -> T:
+        attempt = 0
+        while True:
+            with self._metrics_lock:
+                self._metrics.requests += 1
+            try:
+                async with self.slot():
+                    result = await operation()
+            except (HTTPStatusError, TransportError) as ex:
+                if not self._is_transient(ex):
+                    raise
+                delay = self._on_transient_error(ex, attempt)
+                await sleep(delay)
+                attempt += 1
+                continue
+            self.concurrency_limiter.on_success()
+            return result
+
+    def _is_transient(self, ex: HTTPStatusError | TransportError) -> bool:
+        return isinstance(ex, TransportError) or ex.response.status_code in TRANSIENT_STATUS_CODES
+
+    def _on_transient_error(self, ex: HTTPStatusError | TransportError, attempt: int) -> float:
+        retry_after = None
+        with self._metrics_lock:
+            if isinstance(ex, HTTPStatusError) and ex.response.status_code in THROTTLING_STATUS_CODES:
+                self._metrics.throttled += 1
+                self.concurrency_limiter.on_throttled()
+                retry_after = self._parse_retry_after(ex.response.headers.get("retry-after"))
+            else:
+                self._metrics.transient_errors += 1
+
+            if attempt >= self.max_retries:
+                raise ex
+            if self.retry_budget <= 0:
+                self._metrics.budget_exhausted += 1
+                raise AdaptiveClientPolicyException("Retry budget exhausted") from ex
+            self.retry_budget -= 1
+            self._metrics.retries += 1
+
+            if retry_after is not None:
+                # Retry-After holds back every request, not only the throttled one
+                self.token_bucket.pause_for(retry_after)
+                delay = retry_after
+            else:
+                # exponential backoff with full jitter
+                delay = random.uniform(0.0, min(self.max_delay, self.base_delay * 2**attempt))
+            self._metrics.retry_wait_seconds += delay
+            return delay
+
+    def _parse_retry_after(self, value: str | None) -> float | None:
+        if not value:
+            return None
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class AdaptiveClientPolicyException(Exception):
+    pass
@@ -2,6 +2,8 @@ import os
 
 from dotenv import load_dotenv
 
+from models.market_data_fill_policy import MarketDataFillPolicy
+
 load_dotenv(override=False)
 
 
@@ -10,7 +12,26 @@ class EnvironmentLoader:
         self.PERFORMATIV_API_URL = os.environ.get("PERFORMATIV_API_URL", "")
         self.PERFORMATIV_CANDIDATE_ID = os.environ.get("PERFORMATIV_CANDIDATE_ID", "")
         self.PERFORMATIV_API_KEY = os.environ.get("PERFORMATIV_API_KEY", "")
+        self.PERFORMATIV_API_MAX_CONCURRENCY = int(os.environ.get("PERFORMATIV_API_MAX_CONCURRENCY") or 8)
+        self.PERFORMATIV_API_RATE_LIMIT = float(os.environ.get("PERFORMATIV_API_RATE_LIMIT") or 0)
+        self.PERFORMATIV_API_MAX_RETRIES = int(os.environ.get("PERFORMATIV_API_MAX_RETRIES") or 5)
+        self.PERFORMATIV_API_RETRY_BUDGET = int(os.environ.get("PERFORMATIV_API_RETRY_BUDGET") or 100)
+        self.PERFORMATIV_API_RETRY_BASE_DELAY = float(os.environ.get("PERFORMATIV_API_RETRY_BASE_DELAY") or 0.5)
+        self.PERFORMATIV_API_FETCH_WINDOW_DAYS = int(os.environ.get("PERFORMATIV_API_FETCH_WINDOW_DAYS") or 0)
         self.VALUE_PRECISION = int(os.environ.get("VALUE_PRECISION") or 8)
+        self.SUBMIT_CHUNK_SIZE = int(os.environ.get("SUBMIT_CHUNK_SIZE") or 0)
+        self.SUBMIT_GZIP = self._parse_bool(os.environ.get("SUBMIT_GZIP"))
+        self.SUBMIT_DELTA_STATE_FILE = os.environ.get("SUBMIT_DELTA_STATE_FILE", "")
+        self.RESULT_CACHE_DIR = os.environ.get("RESULT_CACHE_DIR", "")
+        self.RESULT_CACHE_MAX_BYTES = int(os.environ.get("RESULT_CACHE_MAX_BYTES") or 256 * 1024 * 1024)
+        self.MARKET_DATA_VERSION = os.environ.get("MARKET_DATA_VERSION", "")
+        self.MARKET_DATA_STORE_DIR = os.environ.get("MARKET_DATA_STORE_DIR", "")
+        self.MARKET_DATA_FILL_POLICY = MarketDataFillPolicy(
+            os.environ.get("MARKET_DATA_FILL_POLICY") or MarketDataFillPolicy.FORWARD_FILL
+        )
+
+    def _parse_bool(self, value: str | None) -> bool:
+        return (value or "").strip().lower() in ("1", "true", "yes")
 
 
 config = EnvironmentLoader()
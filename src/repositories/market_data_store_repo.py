@@ -0,0 +1,93 @@
+import fcntl
+import json
+import os
+import shutil
+from pathlib import Path
+from uuid import uuid4
+
+from numpy import array_equal, load, save
+
+from entities.market_data import MarketData
+
+CURRENT_GENERATION_FILE = "CURRENT"
+LOCK_FILE = "LOCK"
+MANIFEST_FILE = "manifest.json"
+DATES_FILE = "dates.npy"
+PRICES_FILE = "prices.npy"
+FX_RATES_FILE = "fx_rates.npy"
+
+
+class MarketDataStoreRepo:
+    def __init__(self, store_dir: str):
+        self.store_dir = Path(store_dir)
+
+    def load(self) -> MarketData | None:
+        try:
+            generation_dir = self._get_current_generation_dir()
+            if generation_dir is None:
+                return None
+            manifest = json.loads((generation_dir / MANIFEST_FILE).read_text(encoding="utf-8"))
+            return MarketData(
+                dates=load(generation_dir / DATES_FILE, mmap_mode="r"),
+                instrument_ids=manifest["instrument_ids"],
+                prices=load(generation_dir / PRICES_FILE, mmap_mode="r"),
+                fx_pairs=manifest["fx_pairs"],
+                fx_rates=load(generation_dir / FX_RATES_FILE, mmap_mode="r"),
+            )
+        except Exception as e:
+            raise MarketDataStoreRepoException(f"Failed to load market data from: {self.store_dir}") from e
+
+    def save(self, market_data: MarketData) -> None:
+        try:
+            self.store_dir.mkdir(parents=True, exist_ok=True)
+            # writers are serialized, so the rows saved by another process since this one loaded the store are
+            # merged in instead of being replaced
+            with open(self.store_dir / LOCK_FILE, "a", encoding="utf-8") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    current_market_data = self.load()
+                except MarketDataStoreRepoException:
+                    # a corrupted generation is replaced
+                    current_market_data = None
+                if current_market_data is not None and array_equal(current_market_data.dates, market_data.dates):
+                    market_data = current_market_data.merge(market_data)
+                self._save_generation(market_data)
+        except Exception as e:
+            raise MarketDataStoreRepoException(f"Failed to save market data to: {self.store_dir}") from e
+
+    def _save_generation(self, market_data: MarketData) -> None:
+        previous_generation_dir = self._get_current_generation_dir()
+        generation = uuid4().hex
+        generation_dir = self.store_dir / generation
+        generation_dir.mkdir()
+        save(generation_dir / DATES_FILE, market_data.dates)
+        save(generation_dir / PRICES_FILE, market_data.prices)
+        save(generation_dir / FX_RATES_FILE, market_data.fx_rates)
+        manifest = {"instrument_ids": market_data.instrument_ids, "fx_pairs": market_data.fx_pairs}
+        (generation_dir / MANIFEST_FILE).write_text(json.dumps(manifest), encoding="utf-8")
+
+        current_file = self.store_dir / CURRENT_GENERATION_FILE
+        temp_current_file = self.store_dir / f"{CURRENT_GENERATION_FILE}.{generation}"
+        temp_current_file.write_text(generation, encoding="utf-8")
+        os.replace(temp_current_file, current_file)
+        kept_generations = {generation}
+        if previous_generation_dir is not None:
+            kept_generations.add(previous_generation_dir.name)
+        self._remove_stale_generations(kept_generations)
+
+    def _get_current_generation_dir(self) -> Path | None:
+        current_file = self.store_dir / CURRENT_GENERATION_FILE
+        if not current_file.exists():
+            return None
+        return self.store_dir / current_file.read_text(encoding="utf-8").strip()
+
+    def _remove_stale_generations(self, kept_generations: set[str]) -> None:
+        # the previous generation is kept for readers that read CURRENT before it was replaced and did not open
+        # its files yet, processes that still map an older generation keep reading it until their last unmap
+        for entry in self.store_dir.iterdir():
+            if entry.is_dir() and entry.name not in kept_generations:
+                shutil.rmtree(entry, ignore_errors=True)
+
+
+class MarketDataStoreRepoException(Exception):
+    pass
@@ -1,5 +1,12 @@
-from asyncio import gather, run
-from dataclasses import asdict
+import gzip
+import zlib
+from asyncio import AbstractEventLoop, gather, new_event_loop, run, run_coroutine_threadsafe, wrap_future
+from concurrent.futures import Future
+from dataclasses import asdict, replace
+from datetime import datetime, timedelta
+from pathlib import Path
+from threading import Lock, Thread
+from typing import Any, AsyncIterator, Coroutine, TypeVar
 
 from httpx import AsyncClient
 
@@ -11,28 +18,138 @@ from models.performativ_api import (
     PostSubmitPayload,
     PricesData,
 )
+from repositories.adaptive_client_policy import AdaptiveClientPolicy, RetryMetrics
 from repositories.enviroment_loader import config
 
+SUBMIT_STREAM_READ_SIZE = 1024 * 1024
+# zlib window bits of a gzip container
+GZIP_WBITS = 16 + zlib.MAX_WBITS
+API_DATE_FORMAT = "%Y%m%d"
+
+P = TypeVar("P", bound=BasePerformativApiParams)
+T = TypeVar("T")
+
 
 class PerformativApiRepo:
-    def __init__(self, client: AsyncClient | None = None):
+    def __init__(
+        self,
+        client: AsyncClient | None = None,
+        max_concurrency: int | None = None,
+        submit_chunk_size: int | None = None,
+        submit_gzip: bool | None = None,
+        client_policy: AdaptiveClientPolicy | None = None,
+        fetch_window_days: int | None = None,
+    ):
         headers = {
             "x-api-key": config.PERFORMATIV_API_KEY,
             "candidate_id": config.PERFORMATIV_CANDIDATE_ID,
         }
         self.client = client or AsyncClient(headers=headers, base_url=config.PERFORMATIV_API_URL)
+        self.max_concurrency = max_concurrency or config.PERFORMATIV_API_MAX_CONCURRENCY
+        self.submit_chunk_size = submit_chunk_size if submit_chunk_size is not None else config.SUBMIT_CHUNK_SIZE
+        self.submit_gzip = submit_gzip if submit_gzip is not None else config.SUBMIT_GZIP
+        self.fetch_window_days = (
+            fetch_window_days if fetch_window_days is not None else config.PERFORMATIV_API_FETCH_WINDOW_DAYS
+        )
+        # token bucket, AIMD concurrency limit and retries shared by every request of the run
+        self.client_policy = client_policy or AdaptiveClientPolicy(
+            self.max_concurrency,
+            rate_limit=config.PERFORMATIV_API_RATE_LIMIT,
+            max_retries=config.PERFORMATIV_API_MAX_RETRIES,
+            retry_budget=config.PERFORMATIV_API_RETRY_BUDGET,
+            base_delay=config.PERFORMATIV_API_RETRY_BASE_DELAY,
+        )
+        self._responses: dict[tuple, Future[dict[str, str]]] = {}
+        self._responses_lock = Lock()
+        # the connection pool of the client is bound to the event loop it first ran on, so every request is sent
+        # from one loop kept for the repo's lifetime, whichever asyncio.run or thread awaits it
+        self._client_loop: AbstractEventLoop | None = None
+        self._client_loop_lock = Lock()
+
+    @property
+    def retry_metrics(self) -> RetryMetrics:
+        return self.client_policy.metrics
+
+    def start_run(self) -> None:
+        self.client_policy.start_run()
+
+    def _get_client_loop(self) -> AbstractEventLoop:
+        with self._client_loop_lock:
+            if self._client_loop is None:
+                self._client_loop = new_event_loop()
+                Thread(target=self._client_loop.run_forever, name="performativ-api-client", daemon=True).start()
+            return self._client_loop
+
+    async def _on_client_loop(self, request: Coroutine[Any, Any, T]) -> T:
+        return await wrap_future(run_coroutine_threadsafe(request, self._get_client_loop()))
 
     async def _get(self, endpoint: str, params: BasePerformativApiParams) -> dict[str, str]:
+        # single flight: identical requests share one response future, across tasks, threads and event loops
+        key = (endpoint, *asdict(params).items())
+        with self._responses_lock:
+            response_future = self._responses.get(key)
+            is_leader = response_future is None
+            if response_future is None:
+                response_future = self._responses[key] = Future()
+
+        if not is_leader:
+            return await wrap_future(response_future)
+
+        try:
+            data = await self._request(endpoint, params)
+        except BaseException as ex:
+            # failures are not memoized, the next caller retries
+            with self._responses_lock:
+                self._responses.pop(key, None)
+            response_future.set_exception(ex)
+            raise
+        response_future.set_result(data)
+        return data
+
+    async def _request(self, endpoint: str, params: BasePerformativApiParams) -> dict[str, str]:
         try:
-            response = await self.client.get(url=endpoint, params=asdict(params))
-            response.raise_for_status()
-            data: dict[str, str] = response.json()
-            return data
+            return await self.client_policy.call(lambda: self._send_get(endpoint, params))
         except Exception as ex:
             raise PerformativApiRepoException(f"Failed to get {endpoint} data") from ex
 
+    async def _send_get(self, endpoint: str, params: BasePerformativApiParams) -> dict[str, str]:
+        response = await self._on_client_loop(self.client.get(url=endpoint, params=asdict(params)))
+        response.raise_for_status()
+        data: dict[str, str] = response.json()
+        return data
+
+    async def _get_by_windows(self, endpoint: str, params: BasePerformativApiParams) -> dict[str, list]:
+        # a long date range is fetched as concurrent sub-window requests, each one under the shared client policy,
+        # and the items of every key are stitched back in window order
+        windows = self._split_date_range(params)
+        if len(windows) == 1:
+            return await self._get(endpoint, params)  # type: ignore
+        data: dict[str, list] = {}
+        for window_data in await gather(*[self._get(endpoint, window) for window in windows]):
+            for key, items in window_data.items():
+                data.setdefault(key, []).extend(items)
+        return data
+
+    def _split_date_range(self, params: P) -> list[P]:
+        if self.fetch_window_days <= 0:
+            return [params]
+        start_date = datetime.strptime(params.start_date, API_DATE_FORMAT).date()
+        end_date = datetime.strptime(params.end_date, API_DATE_FORMAT).date()
+        windows = []
+        while start_date <= end_date:
+            window_end_date = min(start_date + timedelta(days=self.fetch_window_days - 1), end_date)
+            windows.append(
+                replace(
+                    params,
+                    start_date=start_date.strftime(API_DATE_FORMAT),
+                    end_date=window_end_date.strftime(API_DATE_FORMAT),
+                )
+            )
+            start_date = window_end_date + timedelta(days=1)
+        return windows or [params]
+
     async def get_fx_rates_by_dates(self, params: GetFxRatesParams) -> FxRatesData:
-        return FxRatesData(items=await self._get("fx-rates", params))  # type: ignore
+        return FxRatesData(items=await self._get_by_windows("fx-rates", params))
 
     async def get_instruments_prices_by_dates(self, params: list[GetInstrumentPricesParams]) -> PricesData:
         tasks = [self._get_instrument_prices_by_dates(param) for param in params]
@@ -45,7 +162,7 @@ class PerformativApiRepo:
         return PricesData(items=prices_data)
 
     async def _get_instrument_prices_by_dates(self, params: GetInstrumentPricesParams) -> PricesData:
-        return PricesData(items=await self._get("prices", params))  # type: ignore
+        return PricesData(items=await self._get_by_windows("prices", params))
 
     def post_submit_financial_metrics(self, payload: PostSubmitPayload) -> dict[str, str]:
         try:
@@ -54,10 +171,70 @@ class PerformativApiRepo:
             raise PerformativApiRepoException("Failed to post submit data") from ex
 
     async def _post_submit_financial_metrics(self, payload: PostSubmitPayload) -> dict[str, str]:
-        response = await self.client.post(url="submit", json=payload.model_dump())
+        *positions_chunks, final_chunk = self._split_submit_payload(payload)
+        await gather(*[self._post_submit_chunk(chunk) for chunk in positions_chunks])
+        return await self._post_submit_chunk(final_chunk)
+
+    def _split_submit_payload(self, payload: PostSubmitPayload) -> list[PostSubmitPayload]:
+        position_ids = list(payload.positions)
+        chunk_size = self.submit_chunk_size
+        if chunk_size <= 0 or len(position_ids) <= chunk_size:
+            return [payload]
+
+        chunks = [
+            PostSubmitPayload(
+                positions={
+                    position_id: payload.positions[position_id] for position_id in position_ids[i : i + chunk_size]
+                },
+                basket=None,
+                dates=payload.dates,
+            )
+            for i in range(0, len(position_ids), chunk_size)
+        ]
+        # every chunk carries the dates of its series, the basket is sent once, with the last chunk, after every
+        # positions chunk was accepted. The API has to merge the chunks of a submission by position id
+        chunks[-1].basket = payload.basket
+        return chunks
+
+    async def _post_submit_chunk(self, payload: PostSubmitPayload) -> dict[str, str]:
+        content = payload.model_dump_json().encode("utf-8")
+        headers = {"Content-Type": "application/json"}
+        if self.submit_gzip:
+            content = gzip.compress(content)
+            headers["Content-Encoding"] = "gzip"
+
+        async with self.client_policy.slot():
+            response = await self._on_client_loop(self.client.post(url="submit", content=content, headers=headers))
         response.raise_for_status()
         return response.json()  # type: ignore
 
+    def post_submit_financial_metrics_file(self, path: Path) -> dict[str, str]:
+        try:
+            return run(self._post_submit_financial_metrics_file(path))
+        except Exception as ex:
+            raise PerformativApiRepoException("Failed to post submit data") from ex
+
+    async def _post_submit_financial_metrics_file(self, path: Path) -> dict[str, str]:
+        # the payload file is streamed as a single request body, it is never held in memory as a whole
+        headers = {"Content-Type": "application/json"}
+        if self.submit_gzip:
+            headers["Content-Encoding"] = "gzip"
+
+        async with self.client_policy.slot():
+            response = await self._on_client_loop(
+                self.client.post(url="submit", content=self._iter_file_content(path), headers=headers)
+            )
+        response.raise_for_status()
+        return response.json()  # type: ignore
+
+    async def _iter_file_content(self, path: Path) -> AsyncIterator[bytes]:
+        compressor = zlib.compressobj(wbits=GZIP_WBITS) if self.submit_gzip else None
+        with open(path, "rb") as file:
+            while chunk := file.read(SUBMIT_STREAM_READ_SIZE):
+                yield compressor.compress(chunk) if compressor else chunk
+        if compressor:
+            yield compressor.flush()
+
 
 class PerformativApiRepoException(Exception):
     pass
@@ -1,8 +1,12 @@
 import json
+from typing import Iterator, TextIO
 
 from pydantic import ValidationError
 
-from models.positions_data import PositionsData
+from entities.positions_table import PositionsTable, PositionsTableException
+from models.positions_data import PositionDTO, PositionsData
+
+READ_CHUNK_SIZE = 64 * 1024
 
 
 class PositionsDataRepo:
@@ -22,6 +26,102 @@ class PositionsDataRepo:
         except Exception as e:
             raise PositionDataRepoException(str(e)) from e
 
+    def get_table(self) -> PositionsTable:
+        try:
+            with open(self.path_to_positions_file, "r", encoding="utf-8") as file:
+                records = json.load(file)
+            if not isinstance(records, list):
+                raise PositionsTableException("Expected an array of positions")
+            return PositionsTable.from_records(records)
+        except FileNotFoundError as e:
+            raise PositionDataRepoException(f"Positions file not found: {self.path_to_positions_file}") from e
+        except json.JSONDecodeError as e:
+            raise PositionDataRepoException(f"Failed to load from: {self.path_to_positions_file}") from e
+        except PositionsTableException as e:
+            raise PositionDataRepoException(f"Failed to deserialize: {self.path_to_positions_file}") from e
+        except Exception as e:
+            raise PositionDataRepoException(str(e)) from e
+
+    def iter_positions(self) -> Iterator[PositionDTO]:
+        try:
+            with open(self.path_to_positions_file, "r", encoding="utf-8") as file:
+                for item in self._iter_json_array_items(file):
+                    yield PositionDTO.model_validate(item)
+        except FileNotFoundError as e:
+            raise PositionDataRepoException(f"Positions file not found: {self.path_to_positions_file}") from e
+        except json.JSONDecodeError as e:
+            raise PositionDataRepoException(f"Failed to load from: {self.path_to_positions_file}") from e
+        except ValidationError as e:
+            raise PositionDataRepoException(f"Failed to deserialize: {self.path_to_positions_file}") from e
+        except Exception as e:
+            raise PositionDataRepoException(str(e)) from e
+
+    def _iter_json_array_items(self, file: TextIO) -> Iterator[object]:
+        # as json.load, items are separated by exactly one comma, with none after the [ or before the ]
+        decoder = json.JSONDecoder()
+        buffer, is_eof = self._read_array_start(file)
+        position = 0
+        has_items, expects_item = False, False
+        while True:
+            position = self._skip_whitespace(buffer, position)
+            if position == len(buffer):
+                buffer, is_eof = self._read_more(file, buffer, position, is_eof)
+                position = 0
+                continue
+            if buffer[position] == "]" and not expects_item:
+                return
+            if has_items and not expects_item:
+                if buffer[position] != ",":
+                    raise json.JSONDecodeError("Expected , or ] after a position", buffer, position)
+                position, expects_item = position + 1, True
+                continue
+            if buffer[position] in ",]":
+                raise json.JSONDecodeError("Expected a position", buffer, position)
+            decoded = self._decode_item(decoder, buffer, position, is_eof)
+            if decoded is None:
+                buffer, is_eof = self._read_more(file, buffer, position, is_eof)
+                position = 0
+                continue
+            item, position = decoded
+            has_items, expects_item = True, False
+            yield item
+
+    def _read_more(self, file: TextIO, buffer: str, position: int, is_eof: bool) -> tuple[str, bool]:
+        if is_eof:
+            raise json.JSONDecodeError("Unexpected end of positions array", buffer, len(buffer))
+        chunk = file.read(READ_CHUNK_SIZE)
+        return buffer[position:] + chunk, not chunk
+
+    def _read_array_start(self, file: TextIO) -> tuple[str, bool]:
+        buffer = ""
+        while True:
+            chunk = file.read(READ_CHUNK_SIZE)
+            buffer = (buffer + chunk).lstrip()
+            if buffer and buffer[0] == "[":
+                return buffer[1:], not chunk
+            if buffer or not chunk:
+                raise json.JSONDecodeError("Expected an array of positions", buffer, 0)
+
+    def _skip_whitespace(self, buffer: str, position: int) -> int:
+        while position < len(buffer) and buffer[position] in " \t\r\n":
+            position += 1
+        return position
+
+    def _decode_item(
+        self, decoder: json.JSONDecoder, buffer: str, position: int, is_eof: bool
+    ) -> tuple[object, int] | None:
+        # returns None when the buffer holds an incomplete item and more data has to be read
+        try:
+            item, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            if is_eof:
+                raise
+            return None
+        # an item ending exactly at the buffer end may be a truncated scalar
+        if end == len(buffer) and not is_eof:
+            return None
+        return item, end
+
 
 class PositionDataRepoException(Exception):
     pass
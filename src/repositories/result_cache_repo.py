@@ -0,0 +1,51 @@
+import os
+from pathlib import Path
+
+
+class ResultCacheRepo:
+    def __init__(self, cache_dir: str, max_size_bytes: int):
+        self.cache_dir = Path(cache_dir)
+        self.max_size_bytes = max_size_bytes
+
+    def get(self, key: str) -> str | None:
+        path = self._get_entry_path(key)
+        try:
+            value = path.read_text(encoding="utf-8")
+            os.utime(path)
+            return value
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            raise ResultCacheRepoException(f"Failed to read cached result: {key}") from e
+
+    def put(self, key: str, value: str) -> None:
+        path = self._get_entry_path(key)
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            temp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            temp_path.write_text(value, encoding="utf-8")
+            os.replace(temp_path, path)
+            self._evict(keep=path)
+        except Exception as e:
+            raise ResultCacheRepoException(f"Failed to write cached result: {key}") from e
+
+    def _get_entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def _evict(self, keep: Path) -> None:
+        entries = sorted(
+            ((entry.stat(), entry) for entry in self.cache_dir.glob("*.json")),
+            key=lambda stat_entry: stat_entry[0].st_mtime_ns,
+        )
+        total_size = sum(stat.st_size for stat, _ in entries)
+        for stat, entry in entries:
+            if total_size <= self.max_size_bytes:
+                break
+            if entry == keep:
+                continue
+            entry.unlink(missing_ok=True)
+            total_size -= stat.st_size
+
+
+class ResultCacheRepoException(Exception):
+    pass
@@ -0,0 +1,62 @@
+import os
+import shutil
+from pathlib import Path
+from typing import Iterable, Iterator
+
+SPILL_CHUNK_GLOB = "chunk-*.json"
+
+
+class SpillRepo:
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self._chunks_count = 0
+
+    def clear(self) -> None:
+        try:
+            for path in self.directory.glob(SPILL_CHUNK_GLOB):
+                path.unlink()
+            self.directory.mkdir(parents=True, exist_ok=True)
+        except Exception as e:
+            raise SpillRepoException(f"Failed to clear spill directory: {self.directory}") from e
+        self._chunks_count = 0
+
+    def remove(self) -> None:
+        try:
+            shutil.rmtree(self.directory)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            raise SpillRepoException(f"Failed to remove spill directory: {self.directory}") from e
+        self._chunks_count = 0
+
+    def append_chunk(self, text: str) -> None:
+        path = self.directory / f"chunk-{self._chunks_count:08d}.json"
+        try:
+            path.write_text(text, encoding="utf-8")
+        except Exception as e:
+            raise SpillRepoException(f"Failed to write spill chunk: {path}") from e
+        self._chunks_count += 1
+
+    def iter_chunks(self) -> Iterator[str]:
+        # chunk names are zero padded, so the name order is the write order
+        for path in sorted(self.directory.glob(SPILL_CHUNK_GLOB)):
+            try:
+                yield path.read_text(encoding="utf-8")
+            except Exception as e:
+                raise SpillRepoException(f"Failed to read spill chunk: {path}") from e
+
+    def write_file(self, name: str, parts: Iterable[str]) -> Path:
+        path = self.directory / name
+        temp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            with open(temp_path, "w", encoding="utf-8") as file:
+                for part in parts:
+                    file.write(part)
+            os.replace(temp_path, path)
+        except Exception as e:
+            raise SpillRepoException(f"Failed to write spill file: {path}") from e
+        return path
+
+
+class SpillRepoException(Exception):
+    pass
@@ -0,0 +1,41 @@
+import os
+from pathlib import Path
+
+from pydantic import ValidationError
+
+from models.submit_fingerprints import SubmitFingerprints
+
+
+class SubmitFingerprintRepo:
+    def __init__(self, path: str):
+        self.path = Path(path)
+
+    def load(self) -> SubmitFingerprints | None:
+        try:
+            return SubmitFingerprints.model_validate_json(self.path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        except ValidationError:
+            # unreadable fingerprints only cost a full submit
+            return None
+        except Exception as e:
+            raise SubmitFingerprintRepoException(f"Failed to read submit fingerprints: {self.path}") from e
+
+    def save(self, fingerprints: SubmitFingerprints) -> None:
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+            temp_path.write_text(fingerprints.model_dump_json(), encoding="utf-8")
+            os.replace(temp_path, self.path)
+        except Exception as e:
+            raise SubmitFingerprintRepoException(f"Failed to write submit fingerprints: {self.path}") from e
+
+    def clear(self) -> None:
+        try:
+            self.path.unlink(missing_ok=True)
+        except Exception as e:
+            raise SubmitFingerprintRepoException(f"Failed to remove submit fingerprints: {self.path}") from e
+
+
+class SubmitFingerprintRepoException(Exception):
+    pass
@@ -0,0 +1,202 @@
+from asyncio import create_task, gather, run, sleep
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from threading import Lock
+
+import pytest
+from httpx import ConnectError, HTTPStatusError, Request, Response
+
+from repositories.adaptive_client_policy import (
+    AdaptiveClientPolicy,
+    AdaptiveClientPolicyException,
+    AdaptiveConcurrencyLimiter,
+    TokenBucket,
+)
+
+
+class TestAdaptiveClientPolicy:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.policy = AdaptiveClientPolicy(max_concurrency=4, max_retries=3, retry_budget=10, base_delay=0.001)
+
+    def _make_operation(self, outcomes: list):
+        calls: list[int] = []
+
+        async def operation():
+            calls.append(len(calls))
+            outcome = outcomes[len(calls) - 1]
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        return operation, calls
+
+    def _make_status_error(self, status_code: int, headers: dict | None = None) -> HTTPStatusError:
+        request = Request("GET", "http://stand-in/prices")
+        response = Response(status_code, headers=headers, request=request)
+        return HTTPStatusError("error", request=request, response=response)
+
+    @pytest.mark.asyncio
+    async def test_call_when_transient_errors_should_retry_until_success(self):
+        operation, calls = self._make_operation(
+            [self._make_status_error(502), ConnectError("refused"), self._make_status_error(504), "data"]
+        )
+
+        actual = await self.policy.call(operation)
+
+        assert actual == "data"
+        assert len(calls) == 4
+        assert self.policy.metrics.retries == 3
+        assert self.policy.metrics.transient_errors == 3
+        assert self.policy.retry_budget == 7
+
+    @pytest.mark.asyncio
+    async def test_call_when_throttled_should_honor_retry_after_and_halve_concurrency(self):
+        operation, calls = self._make_operation([self._make_status_error(429, {"Retry-After": "0.05"}), "data"])
+
+        actual = await self.policy.call(operation)
+
+        metrics = self.policy.metrics
+        assert actual == "data"
+        assert metrics.throttled == 1
+        assert metrics.retry_wait_seconds == pytest.approx(0.05)
+        assert metrics.concurrency_limit == pytest.approx(2.5)
+
+    @pytest.mark.asyncio
+    async def test_call_when_error_not_transient_should_raise_without_retry(self):
+        operation, calls = self._make_operation([self._make_status_error(404), "data"])
+
+        with pytest.raises(HTTPStatusError):
+            await self.policy.call(operation)
+
+        assert len(calls) == 1
+        assert self.policy.metrics.retries == 0
+
+    @pytest.mark.asyncio
+    async def test_call_when_max_retries_reached_should_raise_last_error(self):
+        operation, calls = self._make_operation([self._make_status_error(503)] * 5)
+
+        with pytest.raises(HTTPStatusError):
+            await self.policy.call(operation)
+
+        assert len(calls) == 4
+
+    @pytest.mark.asyncio
+    async def test_call_when_retry_budget_exhausted_should_raise_expected_error_message(self):
+        self.policy.retry_budget = 1
+        operation, calls = self._make_operation([ConnectError("refused")] * 3)
+
+        with pytest.raises(AdaptiveClientPolicyException) as ex:
+            await self.policy.call(operation)
+
+        assert "Retry budget exhausted" in str(ex.value)
+        assert len(calls) == 2
+        assert self.policy.metrics.budget_exhausted == 1
+
+    @pytest.mark.asyncio
+    async def test_start_run_should_restore_retry_budget_and_reset_metrics(self):
+        self.policy.retry_budget = 1
+        operation, _ = self._make_operation([self._make_status_error(429), ConnectError("refused"), "data"])
+        with pytest.raises(AdaptiveClientPolicyException):
+            await self.policy.call(operation)
+
+        self.policy.start_run()
+        actual = await self.policy.call(operation)
+
+        assert actual == "data"
+        assert self.policy.retry_budget == 10
+        assert self.policy.metrics.retries == 0
+        assert self.policy.metrics.concurrency_limit == pytest.approx(2.5)
+
+    @pytest.mark.parametrize(
+        "value, expected",
+        [
+            (None, None),
+            ("3", 3.0),
+            ("-1", 0.0),
+            ("not a date", None),
+        ],
+    )
+    def test_parse_retry_after_should_return_expected_seconds(self, value, expected):
+        actual = self.policy._parse_retry_after(value)
+
+        assert actual == expected
+
+    def test_parse_retry_after_when_http_date_should_return_seconds_until_date(self):
+        value = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+
+        actual = self.policy._parse_retry_after(value)
+
+        assert actual == pytest.approx(30.0, abs=1.5)
+
+
+class TestAdaptiveConcurrencyLimiter:
+    @pytest.mark.asyncio
+    async def test_slot_should_not_exceed_limit(self):
+        limiter = AdaptiveConcurrencyLimiter(max_limit=4)
+        limiter.on_throttled()
+        in_flight, peak = 0, 0
+
+        async def request():
+            nonlocal in_flight, peak
+            async with limiter.slot():
+                in_flight += 1
+                peak = max(peak, in_flight)
+                await sleep(0.001)
+                in_flight -= 1
+
+        await gather(*[create_task(request()) for _ in range(10)])
+
+        assert peak == 2
+
+    def test_slot_when_shared_by_event_loops_on_several_threads_should_not_exceed_limit(self):
+        limiter = AdaptiveConcurrencyLimiter(max_limit=2)
+        lock = Lock()
+        in_flight, peak = 0, 0
+
+        async def request():
+            nonlocal in_flight, peak
+            async with limiter.slot():
+                with lock:
+                    in_flight += 1
+                    peak = max(peak, in_flight)
+                await sleep(0.002)
+                with lock:
+                    in_flight -= 1
+
+        async def requests():
+            await gather(*[create_task(request()) for _ in range(5)])
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(lambda _: run(requests()), range(4)))
+
+        assert peak == 2
+        assert limiter._in_flight == 0
+
+    def test_on_success_should_increase_limit_additively_up_to_max(self):
+        limiter = AdaptiveConcurrencyLimiter(max_limit=4)
+        limiter.on_throttled()
+        limiter.on_throttled()
+        limiter.on_throttled()
+
+        assert limiter.limit == 1.0
+        limiter.on_success()
+        assert limiter.limit == 2.0
+        for _ in range(100):
+            limiter.on_success()
+        assert limiter.limit == 4.0
+
+
+class TestTokenBucket:
+    def test_reserve_when_tokens_used_should_return_wait_of_the_refill_rate(self):
+        bucket = TokenBucket(rate=10.0, capacity=1.0)
+
+        assert bucket.reserve() == 0.0
+        assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+
+    def test_reserve_when_paused_should_wait_for_the_pause(self):
+        bucket = TokenBucket(rate=0.0)
+        bucket.pause_for(2.0)
+
+        assert bucket.reserve() == pytest.approx(2.0, abs=0.01)
@@ -1,6 +1,7 @@
 import os
 from unittest.mock import patch
 
+from models.market_data_fill_policy import MarketDataFillPolicy
 from repositories.enviroment_loader import EnvironmentLoader
 
 
@@ -11,7 +12,21 @@ class TestEnvironmentLoader:
             "PERFORMATIV_API_URL": "",
             "PERFORMATIV_CANDIDATE_ID": "",
             "PERFORMATIV_API_KEY": "",
+            "PERFORMATIV_API_MAX_CONCURRENCY": "",
+            "PERFORMATIV_API_RATE_LIMIT": "",
+            "PERFORMATIV_API_MAX_RETRIES": "",
+            "PERFORMATIV_API_RETRY_BUDGET": "",
+            "PERFORMATIV_API_RETRY_BASE_DELAY": "",
+            "PERFORMATIV_API_FETCH_WINDOW_DAYS": "",
             "VALUE_PRECISION": "",
+            "SUBMIT_CHUNK_SIZE": "",
+            "SUBMIT_GZIP": "",
+            "SUBMIT_DELTA_STATE_FILE": "",
+            "RESULT_CACHE_DIR": "",
+            "RESULT_CACHE_MAX_BYTES": "",
+            "MARKET_DATA_VERSION": "",
+            "MARKET_DATA_STORE_DIR": "",
+            "MARKET_DATA_FILL_POLICY": "",
         },
     )
     def test_environment_loader_when_env_not_set_must_return_expected(self):
@@ -20,7 +35,21 @@ class TestEnvironmentLoader:
         assert config.PERFORMATIV_API_URL == ""
         assert config.PERFORMATIV_CANDIDATE_ID == ""
         assert config.PERFORMATIV_API_KEY == ""
+        assert config.PERFORMATIV_API_MAX_CONCURRENCY == 8
+        assert config.PERFORMATIV_API_RATE_LIMIT == 0
+        assert config.PERFORMATIV_API_MAX_RETRIES == 5
+        assert config.PERFORMATIV_API_RETRY_BUDGET == 100
+        assert config.PERFORMATIV_API_RETRY_BASE_DELAY == 0.5
+        assert config.PERFORMATIV_API_FETCH_WINDOW_DAYS == 0
         assert config.VALUE_PRECISION == 8
+        assert config.SUBMIT_CHUNK_SIZE == 0
+        assert config.SUBMIT_GZIP is False
+        assert config.SUBMIT_DELTA_STATE_FILE == ""
+        assert config.RESULT_CACHE_DIR == ""
+        assert config.RESULT_CACHE_MAX_BYTES == 256 * 1024 * 1024
+        assert config.MARKET_DATA_VERSION == ""
+        assert config.MARKET_DATA_STORE_DIR == ""
+        assert config.MARKET_DATA_FILL_POLICY == MarketDataFillPolicy.FORWARD_FILL
 
     @patch.dict(
         os.environ,
@@ -28,7 +57,21 @@ class TestEnvironmentLoader:
             "PERFORMATIV_API_URL": "http://test",
             "PERFORMATIV_CANDIDATE_ID": "id-1234",
             "PERFORMATIV_API_KEY": "api-1234",
+            "PERFORMATIV_API_MAX_CONCURRENCY": "4",
+            "PERFORMATIV_API_RATE_LIMIT": "20",
+            "PERFORMATIV_API_MAX_RETRIES": "2",
+            "PERFORMATIV_API_RETRY_BUDGET": "10",
+            "PERFORMATIV_API_RETRY_BASE_DELAY": "0.1",
+            "PERFORMATIV_API_FETCH_WINDOW_DAYS": "365",
             "VALUE_PRECISION": "10",
+            "SUBMIT_CHUNK_SIZE": "500",
+            "SUBMIT_GZIP": "true",
+            "SUBMIT_DELTA_STATE_FILE": "/tmp/submit-state.json",
+            "RESULT_CACHE_DIR": "/tmp/results",
+            "RESULT_CACHE_MAX_BYTES": "1024",
+            "MARKET_DATA_VERSION": "2025-11-17",
+            "MARKET_DATA_STORE_DIR": "/tmp/market-data",
+            "MARKET_DATA_FILL_POLICY": "none",
         },
     )
     def test_environment_loader_when_invoked_must_return_expected_message(self):
@@ -37,4 +80,18 @@ class TestEnvironmentLoader:
         assert config.PERFORMATIV_API_URL == "http://test"
         assert config.PERFORMATIV_CANDIDATE_ID == "id-1234"
         assert config.PERFORMATIV_API_KEY == "api-1234"
+        assert config.PERFORMATIV_API_MAX_CONCURRENCY == 4
+        assert config.PERFORMATIV_API_RATE_LIMIT == 20
+        assert config.PERFORMATIV_API_MAX_RETRIES == 2
+        assert config.PERFORMATIV_API_RETRY_BUDGET == 10
+        assert config.PERFORMATIV_API_RETRY_BASE_DELAY == 0.1
+        assert config.PERFORMATIV_API_FETCH_WINDOW_DAYS == 365
         assert config.VALUE_PRECISION == 10
+        assert config.SUBMIT_CHUNK_SIZE == 500
+        assert config.SUBMIT_GZIP is True
+        assert config.SUBMIT_DELTA_STATE_FILE == "/tmp/submit-state.json"
+        assert config.RESULT_CACHE_DIR == "/tmp/results"
+        assert config.RESULT_CACHE_MAX_BYTES == 1024
+        assert config.MARKET_DATA_VERSION == "2025-11-17"
+        assert config.MARKET_DATA_STORE_DIR == "/tmp/market-data"
+        assert config.MARKET_DATA_FILL_POLICY == MarketDataFillPolicy.NONE
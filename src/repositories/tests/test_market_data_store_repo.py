@@ -0,0 +1,95 @@
+from datetime import date
+
+import pytest
+from numpy import array, memmap, testing
+from pandas import date_range
+
+from entities.market_data import MarketData
+from repositories.market_data_store_repo import MarketDataStoreRepo, MarketDataStoreRepoException
+
+
+class TestMarketDataStoreRepo:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        self.store_dir = tmp_path / "market-data"
+        self.repo = MarketDataStoreRepo(str(self.store_dir))
+        self.test_market_data = MarketData(
+            dates=date_range("2023-01-01", "2023-01-04").values.astype("datetime64[D]"),
+            instrument_ids=["1000", "1001"],
+            prices=array([[1.0, 2.0, 3.0, 4.0], [5.0, 6.0, 7.0, 8.0]]),
+            fx_pairs=["EURUSD"],
+            fx_rates=array([[1.1, 1.2, 1.3, 1.4]]),
+        )
+
+    def test_load_when_store_empty_should_return_none(self):
+        assert self.repo.load() is None
+
+    def test_load_when_saved_should_return_memory_mapped_market_data(self):
+        self.repo.save(self.test_market_data)
+
+        actual = self.repo.load()
+
+        assert isinstance(actual.prices, memmap)
+        assert actual.instrument_ids == ["1000", "1001"]
+        assert actual.fx_pairs == ["EURUSD"]
+        testing.assert_array_equal(actual.dates, self.test_market_data.dates)
+        testing.assert_array_equal(actual.get_prices("1001"), [5.0, 6.0, 7.0, 8.0])
+        testing.assert_array_equal(actual.get_fx_rates("EURUSD"), [1.1, 1.2, 1.3, 1.4])
+
+    def test_load_when_sliced_should_return_views_of_window(self):
+        self.repo.save(self.test_market_data)
+
+        actual = self.repo.load().slice(date(2023, 1, 2), date(2023, 1, 3))
+
+        testing.assert_array_equal(actual.get_prices("1000"), [2.0, 3.0])
+        assert isinstance(actual.prices, memmap)
+
+    def test_save_when_saved_over_the_same_dates_should_merge_instruments_and_fx_pairs(self):
+        self.repo.save(self.test_market_data)
+        other_market_data = MarketData(
+            dates=self.test_market_data.dates,
+            instrument_ids=["1001", "2000"],
+            prices=array([[9.0, 9.0, 9.0, 9.0], [1.0, 1.0, 1.0, 1.0]]),
+            fx_pairs=["SEKUSD"],
+            fx_rates=array([[0.1, 0.1, 0.1, 0.1]]),
+        )
+
+        self.repo.save(other_market_data)
+
+        actual = self.repo.load()
+        assert actual.instrument_ids == ["1000", "1001", "2000"]
+        assert actual.fx_pairs == ["EURUSD", "SEKUSD"]
+        testing.assert_array_equal(actual.get_prices("1000"), [1.0, 2.0, 3.0, 4.0])
+        testing.assert_array_equal(actual.get_prices("1001"), [9.0, 9.0, 9.0, 9.0])
+
+    def test_save_when_saved_over_other_dates_should_replace_market_data(self):
+        self.repo.save(self.test_market_data)
+
+        self.repo.save(self.test_market_data.slice(date(2023, 1, 2), date(2023, 1, 3)))
+
+        testing.assert_array_equal(self.repo.load().get_prices("1000"), [2.0, 3.0])
+
+    def test_save_when_saved_three_times_should_keep_current_and_previous_generations(self):
+        generations = []
+        for _ in range(3):
+            self.repo.save(self.test_market_data)
+            generations.append((self.store_dir / "CURRENT").read_text())
+
+        assert {entry.name for entry in self.store_dir.iterdir() if entry.is_dir()} == set(generations[1:])
+
+    def test_save_when_store_corrupted_should_replace_it(self):
+        self.store_dir.mkdir()
+        (self.store_dir / "CURRENT").write_text("missing")
+
+        self.repo.save(self.test_market_data)
+
+        assert self.repo.load().instrument_ids == ["1000", "1001"]
+
+    def test_load_when_store_corrupted_should_raise_expected_exception_message(self):
+        self.store_dir.mkdir()
+        (self.store_dir / "CURRENT").write_text("missing")
+
+        with pytest.raises(MarketDataStoreRepoException) as ex:
+            self.repo.load()
+
+        assert "Failed to load market data from" in str(ex.value)
@@ -1,21 +1,49 @@
+import gzip
+import json
+from asyncio import Event, create_task, gather, run, sleep
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
 from unittest.mock import AsyncMock, Mock
+from urllib.parse import parse_qs, urlsplit
 
 import pytest
-from httpx import AsyncClient
+from httpx import AsyncClient, Headers, MockTransport, Request, Response
 
 from models.performativ_api import (
+    BasketPayload,
     FxRatesData,
     GetFxRatesParams,
     GetInstrumentPricesParams,
+    PositionPayload,
     PostSubmitPayload,
     PricesData,
 )
+from repositories.adaptive_client_policy import AdaptiveClientPolicy
 from repositories.performativ_api_repo import (
     PerformativApiRepo,
     PerformativApiRepoException,
 )
 
 
+class KeepAlivePricesHandler(BaseHTTPRequestHandler):
+    # an HTTP/1.1 server keeps the connections open, so the client pools them across requests
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        instrument_id = parse_qs(urlsplit(self.path).query)["instrument_id"][0]
+        body = json.dumps({instrument_id: [{"date": "2023-01-01", "price": 2}]}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
 class TestPerformativApiRepo:
     @pytest.fixture(autouse=True)
     def setup(self):
@@ -119,3 +147,238 @@ class TestPerformativApiRepo:
 
         assert actual == {"test": "data"}
         self.repo.client.post.assert_called_once()
+
+    def _make_stand_in_submit_server(self, received: list[dict], headers: list[Headers]) -> AsyncClient:
+        def handler(request: Request) -> Response:
+            body = request.content
+            if request.headers.get("content-encoding") == "gzip":
+                body = gzip.decompress(body)
+            received.append(json.loads(body))
+            headers.append(request.headers)
+            return Response(200, json={"received_positions": str(len(received[-1]["positions"]))})
+
+        return AsyncClient(transport=MockTransport(handler), base_url="http://stand-in")
+
+    def _make_submit_payload(self, positions_count: int) -> PostSubmitPayload:
+        metric = {
+            "IsOpen": [1.0, 1.0],
+            "Price": [2.0, 2.0],
+            "Value": [3.0, 3.0],
+            "ReturnPerPeriod": [0.0, 0.0],
+            "ReturnPerPeriodPercentage": [0.0, 0.0],
+        }
+        return PostSubmitPayload(
+            positions={str(i): PositionPayload(**metric) for i in range(positions_count)},
+            basket=BasketPayload(**metric),
+            dates=["2023-01-01", "2023-01-02"],
+        )
+
+    def test_post_submit_financial_metrics_when_chunked_should_send_dates_with_every_chunk_and_basket_once(self):
+        received, headers = [], []
+        repo = PerformativApiRepo(
+            client=self._make_stand_in_submit_server(received, headers), max_concurrency=2, submit_chunk_size=2
+        )
+
+        actual = repo.post_submit_financial_metrics(self._make_submit_payload(5))
+
+        assert len(received) == 3
+        assert [chunk["basket"] is not None for chunk in received] == [False, False, True]
+        assert [chunk["dates"] for chunk in received] == [["2023-01-01", "2023-01-02"]] * 3
+        assert sorted(pid for chunk in received for pid in chunk["positions"]) == ["0", "1", "2", "3", "4"]
+        assert actual == {"received_positions": "1"}
+
+    def test_post_submit_financial_metrics_when_gzip_should_send_compressed_body(self):
+        received, headers = [], []
+        payload = self._make_submit_payload(3)
+        repo = PerformativApiRepo(client=self._make_stand_in_submit_server(received, headers), submit_gzip=True)
+
+        repo.post_submit_financial_metrics(payload)
+
+        assert len(received) == 1
+        assert headers[0]["content-encoding"] == "gzip"
+        assert received[0] == json.loads(payload.model_dump_json())
+
+    def test_post_submit_financial_metrics_file_when_gzip_should_stream_compressed_file(self, tmp_path):
+        received, headers = [], []
+        payload = self._make_submit_payload(3)
+        payload_path = tmp_path / "payload.json"
+        payload_path.write_text(payload.model_dump_json(), encoding="utf-8")
+        repo = PerformativApiRepo(client=self._make_stand_in_submit_server(received, headers), submit_gzip=True)
+
+        actual = repo.post_submit_financial_metrics_file(payload_path)
+
+        assert headers[0]["content-encoding"] == "gzip"
+        assert received == [json.loads(payload.model_dump_json())]
+        assert actual == {"received_positions": "3"}
+
+    def test_post_submit_financial_metrics_when_chunk_size_covers_payload_should_send_single_request(self):
+        received, headers = [], []
+        payload = self._make_submit_payload(3)
+        repo = PerformativApiRepo(client=self._make_stand_in_submit_server(received, headers), submit_chunk_size=3)
+
+        repo.post_submit_financial_metrics(payload)
+
+        assert received == [json.loads(payload.model_dump_json())]
+        assert "content-encoding" not in headers[0]
+
+    @pytest.mark.asyncio
+    async def test_get_instrument_prices_by_dates_when_concurrent_identical_requests_should_fetch_once(self):
+        release = Event()
+
+        async def handler(request: Request) -> Response:
+            await release.wait()
+            instrument_id = request.url.params["instrument_id"]
+            return Response(200, json={instrument_id: [{"date": "2023-01-01", "price": 2}]})
+
+        transport = MockTransport(handler)
+        transport.handle_async_request = AsyncMock(side_effect=transport.handle_async_request)
+        repo = PerformativApiRepo(client=AsyncClient(transport=transport, base_url="http://stand-in"))
+
+        pending = [create_task(repo.get_instruments_prices_by_dates(self.test_get_prices_params)) for _ in range(3)]
+        await sleep(0)
+        release.set()
+        results = await gather(*pending)
+
+        assert transport.handle_async_request.call_count == len(self.test_get_prices_params)
+        assert all(result.model_dump() == results[0].model_dump() for result in results)
+        assert set(results[0].items) == {"1", "2"}
+
+    @pytest.mark.asyncio
+    async def test_get_fx_rates_by_dates_when_request_failed_should_not_memoize_failure(self):
+        self.mock_response.raise_for_status = Mock()
+        self.mock_response.json = Mock(side_effect=[Exception(), {"SEKUSD": [{"date": "2023-01-01", "rate": 2}]}])
+        self.repo.client.get = AsyncMock(return_value=self.mock_response)
+
+        with pytest.raises(PerformativApiRepoException):
+            await self.repo.get_fx_rates_by_dates(self.test_get_fx_params)
+        actual = await self.repo.get_fx_rates_by_dates(self.test_get_fx_params)
+        await self.repo.get_fx_rates_by_dates(self.test_get_fx_params)
+
+        assert list(actual.items) == ["SEKUSD"]
+        assert self.repo.client.get.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_get_fx_rates_by_dates_when_throttled_should_retry_and_record_metrics(self):
+        responses = [
+            Response(429, headers={"Retry-After": "0"}),
+            Response(503),
+            Response(200, json={"SEKUSD": [{"date": "2023-01-01", "rate": 2}]}),
+        ]
+        client = AsyncClient(transport=MockTransport(lambda request: responses.pop(0)), base_url="http://stand-in")
+        repo = PerformativApiRepo(
+            client=client, client_policy=AdaptiveClientPolicy(max_concurrency=4, base_delay=0.001)
+        )
+
+        actual = await repo.get_fx_rates_by_dates(self.test_get_fx_params)
+
+        assert list(actual.items) == ["SEKUSD"]
+        assert repo.retry_metrics.retries == 2
+        assert repo.retry_metrics.throttled == 2
+        assert repo.retry_metrics.concurrency_limit == 2.0
+
+    @pytest.mark.asyncio
+    async def test_get_instrument_prices_by_dates_when_fetch_window_set_should_stitch_sub_windows_in_order(self):
+        requested_windows = []
+
+        async def handler(request: Request) -> Response:
+            start_date = date.fromisoformat(request.url.params["start_date"])
+            end_date = date.fromisoformat(request.url.params["end_date"])
+            requested_windows.append((request.url.params["start_date"], request.url.params["end_date"]))
+            # earlier windows answer last, the stitched series must still be in date order
+            await sleep((date(2023, 2, 1) - start_date).days / 10_000)
+            days = [start_date + timedelta(days=offset) for offset in range((end_date - start_date).days + 1)]
+            return Response(200, json={"1": [{"date": day.isoformat(), "price": day.day} for day in days]})
+
+        repo = PerformativApiRepo(
+            client=AsyncClient(transport=MockTransport(handler), base_url="http://stand-in"), fetch_window_days=10
+        )
+
+        actual = await repo.get_instruments_prices_by_dates(
+            [GetInstrumentPricesParams(instrument_id=1, start_date="20230101", end_date="20230125")]
+        )
+
+        assert sorted(requested_windows) == [
+            ("20230101", "20230110"),
+            ("20230111", "20230120"),
+            ("20230121", "20230125"),
+        ]
+        assert [price.date for price in actual.items["1"]] == [
+            date(2023, 1, 1) + timedelta(days=offset) for offset in range(25)
+        ]
+
+    def test_split_date_range_when_fetch_window_not_set_should_return_single_window(self):
+        repo = PerformativApiRepo(fetch_window_days=0)
+
+        actual = repo._split_date_range(self.test_get_fx_params)
+
+        assert actual == [self.test_get_fx_params]
+
+    def test_get_instrument_prices_by_dates_when_called_from_several_threads_should_share_the_concurrency_limit(self):
+        lock = Lock()
+        in_flight, peak = 0, 0
+
+        async def handler(request: Request) -> Response:
+            nonlocal in_flight, peak
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            await sleep(0.002)
+            with lock:
+                in_flight -= 1
+            instrument_id = request.url.params["instrument_id"]
+            return Response(200, json={instrument_id: [{"date": "2023-01-01", "price": 2}]})
+
+        repo = PerformativApiRepo(
+            client=AsyncClient(transport=MockTransport(handler), base_url="http://stand-in"), max_concurrency=2
+        )
+
+        def get_prices(thread):
+            params = [
+                GetInstrumentPricesParams(
+                    instrument_id=str(thread * 10 + instrument), start_date="20230101", end_date="20231231"
+                )
+                for instrument in range(5)
+            ]
+            return run(repo.get_instruments_prices_by_dates(params))
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            actual = list(executor.map(get_prices, range(4)))
+
+        assert peak == 2
+        assert [sorted(result.items) for result in actual] == [
+            [str(thread * 10 + instrument) for instrument in range(5)] for thread in range(4)
+        ]
+
+    def test_get_instrument_prices_by_dates_when_threads_share_a_pooled_client_should_return_every_result(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAlivePricesHandler)
+        Thread(target=server.serve_forever, daemon=True).start()
+        repo = PerformativApiRepo(
+            client=AsyncClient(base_url=f"http://127.0.0.1:{server.server_port}"), max_concurrency=4
+        )
+
+        def get_prices(thread):
+            # every thread runs its own event loop, later steps reuse the connections pooled by earlier loops
+            results = []
+            for step in range(3):
+                params = [
+                    GetInstrumentPricesParams(
+                        instrument_id=str(step * 100 + thread * 10 + instrument),
+                        start_date="20230101",
+                        end_date="20231231",
+                    )
+                    for instrument in range(5)
+                ]
+                results.append(sorted(run(repo.get_instruments_prices_by_dates(params)).items))
+            return results
+
+        try:
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                actual = list(executor.map(get_prices, range(4)))
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        assert actual == [
+            [[str(step * 100 + thread * 10 + instrument) for instrument in range(5)] for step in range(3)]
+            for thread in range(4)
+        ]
@@ -90,3 +90,105 @@ class TestPositionsDataRepo:
         assert len(actual.positions) == 2
         assert set(map(lambda p: p.id, actual.positions)) == {1, 2}
         assert set(map(lambda p: p.instrument_id, actual.positions)) == {1002, 1001}
+
+
+class TestPositionsDataRepoIterPositions:
+    TEST_POSITION = {
+        "id": 1,
+        "open_date": "2023-01-01",
+        "close_date": None,
+        "open_price": 100.5,
+        "close_price": None,
+        "quantity": 10,
+        "instrument_id": 1001,
+        "instrument_currency": "USD",
+    }
+
+    def _make_repo(self, tmp_path, content: str) -> PositionsDataRepo:
+        path = tmp_path / "positions.json"
+        path.write_text(content, encoding="utf-8")
+        return PositionsDataRepo(str(path))
+
+    @patch("repositories.positions_data_repo.READ_CHUNK_SIZE", 7)
+    def test_iter_positions_when_valid_file_should_yield_positions_across_read_chunks(self, tmp_path):
+        positions = [{**self.TEST_POSITION, "id": position_id} for position_id in range(1, 6)]
+        repo = self._make_repo(tmp_path, json.dumps(positions, indent=2))
+
+        actual = list(repo.iter_positions())
+
+        assert [position.id for position in actual] == [1, 2, 3, 4, 5]
+        assert actual[0].instrument_id == 1001
+
+    def test_iter_positions_when_empty_array_should_yield_nothing(self, tmp_path):
+        assert list(self._make_repo(tmp_path, " [ ] ").iter_positions()) == []
+
+    def test_iter_positions_when_file_not_found_should_raise_exception_message(self, tmp_path):
+        repo = PositionsDataRepo(str(tmp_path / "missing.json"))
+
+        with pytest.raises(PositionDataRepoException) as ex:
+            list(repo.iter_positions())
+
+        assert "Positions file not found" in str(ex.value)
+
+    @pytest.mark.parametrize("content", ['{"positions": []}', '[{"id": 1', "[", ""])
+    def test_iter_positions_when_json_invalid_should_raise_exception_message(self, tmp_path, content):
+        repo = self._make_repo(tmp_path, content)
+
+        with pytest.raises(PositionDataRepoException) as ex:
+            list(repo.iter_positions())
+
+        assert "Failed to load from" in str(ex.value)
+
+    @pytest.mark.parametrize("separators", [",,{}]", "{},]", "{},,{}]", "{} {}]", ",]"])
+    def test_iter_positions_when_separators_malformed_should_raise_exception_message(self, tmp_path, separators):
+        repo = self._make_repo(tmp_path, "[" + separators.replace("{}", json.dumps(self.TEST_POSITION)))
+
+        with pytest.raises(PositionDataRepoException) as ex:
+            list(repo.iter_positions())
+
+        assert "Failed to load from" in str(ex.value)
+
+    def test_iter_positions_when_deserialize_failed_should_raise_exception_message(self, tmp_path):
+        repo = self._make_repo(tmp_path, json.dumps([self.TEST_POSITION, {"id": 2}]))
+        positions = repo.iter_positions()
+
+        assert next(positions).id == 1
+        with pytest.raises(PositionDataRepoException) as ex:
+            next(positions)
+
+        assert "Failed to deserialize" in str(ex.value)
+
+
+class TestPositionsDataRepoGetTable:
+    TEST_POSITION = TestPositionsDataRepoIterPositions.TEST_POSITION
+
+    def _make_repo(self, tmp_path, content: str) -> PositionsDataRepo:
+        path = tmp_path / "positions.json"
+        path.write_text(content, encoding="utf-8")
+        return PositionsDataRepo(str(path))
+
+    def test_get_table_when_valid_file_should_return_columnar_positions(self, tmp_path):
+        positions = [{**self.TEST_POSITION, "id": position_id} for position_id in (3, 1)]
+        repo = self._make_repo(tmp_path, json.dumps(positions))
+
+        actual = repo.get_table()
+
+        assert actual.ids.tolist() == [3, 1]
+        assert actual.instrument_ids.tolist() == [1001, 1001]
+
+    def test_get_table_when_file_not_found_should_raise_exception_message(self, tmp_path):
+        repo = PositionsDataRepo(str(tmp_path / "missing.json"))
+
+        with pytest.raises(PositionDataRepoException) as ex:
+            repo.get_table()
+
+        assert "Positions file not found" in str(ex.value)
+
+    @pytest.mark.parametrize("content", ['{"positions": []}', '[{"id": 1}]', '[{"id": "one"}]'])
+    def test_get_table_when_deserialize_failed_should_raise_exception_message(self, tmp_path, content):
+        repo = self._make_repo(tmp_path, content)
+
+        with pytest.raises(PositionDataRepoException) as ex:
+            repo.get_table()
+
+        assert "Failed to deserialize" in str(ex.value)
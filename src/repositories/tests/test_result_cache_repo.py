@@ -0,0 +1,50 @@
+import os
+
+import pytest
+
+from repositories.result_cache_repo import ResultCacheRepo, ResultCacheRepoException
+
+
+class TestResultCacheRepo:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        self.cache_dir = tmp_path / "results"
+        self.repo = ResultCacheRepo(str(self.cache_dir), max_size_bytes=10)
+
+    def test_get_when_key_not_cached_should_return_none(self):
+        assert self.repo.get("missing") is None
+
+    def test_get_when_key_cached_should_return_stored_value(self):
+        self.repo.put("key", "value")
+
+        assert self.repo.get("key") == "value"
+
+    def test_put_when_max_size_exceeded_should_evict_least_recently_used(self):
+        self.repo.put("a", "1234")
+        self.repo.put("b", "1234")
+        os.utime(self.cache_dir / "a.json", ns=(1, 1))
+        os.utime(self.cache_dir / "b.json", ns=(2, 2))
+        self.repo.get("a")
+
+        self.repo.put("c", "1234")
+
+        assert self.repo.get("a") == "1234"
+        assert self.repo.get("b") is None
+        assert self.repo.get("c") == "1234"
+
+    def test_put_when_value_larger_than_max_size_should_keep_latest_entry(self):
+        self.repo.put("a", "1234")
+
+        self.repo.put("b", "12345678901")
+
+        assert self.repo.get("a") is None
+        assert self.repo.get("b") == "12345678901"
+
+    def test_put_when_write_failed_should_raise_expected_exception_message(self, tmp_path):
+        (tmp_path / "file").write_text("")
+        repo = ResultCacheRepo(str(tmp_path / "file"), max_size_bytes=10)
+
+        with pytest.raises(ResultCacheRepoException) as ex:
+            repo.put("key", "value")
+
+        assert "Failed to write cached result: key" in str(ex.value)
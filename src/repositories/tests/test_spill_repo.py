@@ -0,0 +1,48 @@
+import pytest
+
+from repositories.spill_repo import SpillRepo, SpillRepoException
+
+
+class TestSpillRepo:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        self.directory = tmp_path / "spill"
+        self.repo = SpillRepo(str(self.directory))
+
+    def test_iter_chunks_should_return_chunks_in_write_order(self):
+        self.repo.clear()
+        for i in range(12):
+            self.repo.append_chunk(str(i))
+
+        assert list(self.repo.iter_chunks()) == [str(i) for i in range(12)]
+
+    def test_clear_should_remove_chunks_of_previous_run(self):
+        self.repo.clear()
+        self.repo.append_chunk("old")
+
+        self.repo.clear()
+        self.repo.append_chunk("new")
+
+        assert list(self.repo.iter_chunks()) == ["new"]
+
+    def test_remove_should_remove_directory_and_ignore_a_missing_one(self):
+        self.repo.clear()
+        self.repo.append_chunk("chunk")
+
+        self.repo.remove()
+        self.repo.remove()
+
+        assert not self.directory.exists()
+
+    def test_write_file_should_write_all_parts(self):
+        self.repo.clear()
+
+        actual = self.repo.write_file("payload.json", iter(["{", "}"]))
+
+        assert actual.read_text(encoding="utf-8") == "{}"
+
+    def test_append_chunk_when_directory_missing_should_raise_expected_error_message(self):
+        with pytest.raises(SpillRepoException) as ex:
+            self.repo.append_chunk("chunk")
+
+        assert "Failed to write spill chunk" in str(ex.value)
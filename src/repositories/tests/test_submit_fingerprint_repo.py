@@ -0,0 +1,45 @@
+import pytest
+
+from models.submit_fingerprints import SubmitFingerprints
+from repositories.submit_fingerprint_repo import SubmitFingerprintRepo, SubmitFingerprintRepoException
+
+
+class TestSubmitFingerprintRepo:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        self.path = tmp_path / "state" / "submit.json"
+        self.repo = SubmitFingerprintRepo(str(self.path))
+
+    def test_load_when_file_missing_should_return_none(self):
+        assert self.repo.load() is None
+
+    def test_load_when_saved_should_return_saved_fingerprints(self):
+        fingerprints = SubmitFingerprints(dates=["2020-01-01"], positions={"1": "abc"}, basket="def")
+
+        self.repo.save(fingerprints)
+
+        assert self.repo.load() == fingerprints
+        assert [path.name for path in self.path.parent.iterdir()] == ["submit.json"]
+
+    def test_load_when_file_corrupt_should_return_none(self):
+        self.path.parent.mkdir()
+        self.path.write_text("{not json", encoding="utf-8")
+
+        assert self.repo.load() is None
+
+    def test_clear_when_saved_should_remove_fingerprints(self):
+        self.repo.save(SubmitFingerprints(dates=["2020-01-01"], positions={"1": "abc"}, basket="def"))
+
+        self.repo.clear()
+        self.repo.clear()
+
+        assert self.repo.load() is None
+
+    def test_save_when_path_not_writable_should_raise_expected_error_message(self, tmp_path):
+        (tmp_path / "file").write_text("", encoding="utf-8")
+        repo = SubmitFingerprintRepo(str(tmp_path / "file" / "submit.json"))
+
+        with pytest.raises(SubmitFingerprintRepoException) as ex:
+            repo.save(SubmitFingerprints(dates=[], positions={}, basket=None))
+
+        assert "Failed to write submit fingerprints" in str(ex.value)
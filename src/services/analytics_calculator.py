@@ -0,0 +1,78 @@
+from numpy import concatenate, cumprod, errstate, full, maximum, nan, nan_to_num, sqrt, vstack, zeros
+from numpy.typing import NDArray
+from pandas import DatetimeIndex, Series
+
+from entities.financial_metrics import AnalyticsMetric, BaseMetric, FinancialAnalytics, FinancialMetrics
+
+
+class AnalyticsCalculator:
+    def __init__(self, rolling_window: int = 20):
+        if rolling_window < 2:
+            raise AnalyticsCalculatorException("Rolling window must span at least 2 periods")
+        self.rolling_window = rolling_window
+
+    def calculate(self, financial_metrics: FinancialMetrics) -> FinancialAnalytics:
+        metrics: list[BaseMetric] = [*financial_metrics.positions.values(), financial_metrics.basket]
+        # one row per position plus the basket as last row, every stage runs once over all rows
+        returns = nan_to_num(vstack([metric.get_values("return_per_period_percentage") for metric in metrics]))
+
+        growth = cumprod(1.0 + returns, axis=1)
+        cumulative_return = growth - 1.0
+        drawdown = self._calculate_drawdown(growth)
+        max_drawdown = drawdown.min(axis=1)
+        rolling_volatility = self._calculate_rolling_volatility(returns)
+
+        analytics = [
+            self._to_analytics_metric(
+                financial_metrics.dates,
+                cumulative_return[row],
+                rolling_volatility[row],
+                drawdown[row],
+                max_drawdown[row],
+            )
+            for row in range(len(metrics))
+        ]
+        return FinancialAnalytics(
+            positions=dict(zip(financial_metrics.positions, analytics[:-1], strict=True)),
+            basket=analytics[-1],
+        )
+
+    def _calculate_drawdown(self, growth: NDArray) -> NDArray:
+        with errstate(divide="ignore", invalid="ignore"):
+            drawdown: NDArray = nan_to_num(growth / maximum.accumulate(growth, axis=1) - 1.0)
+        return drawdown
+
+    def _calculate_rolling_volatility(self, returns: NDArray) -> NDArray:
+        window = self.rolling_window
+        rolling_volatility = full(returns.shape, nan)
+        if returns.shape[1] < window:
+            return rolling_volatility
+
+        # windowed sums from prefix sums keep the pass O(dates) regardless of the window size
+        padded_returns = concatenate([zeros((returns.shape[0], 1)), returns], axis=1)
+        sums = padded_returns.cumsum(axis=1)
+        squared_sums = (padded_returns**2).cumsum(axis=1)
+        window_sums = sums[:, window:] - sums[:, :-window]
+        window_squared_sums = squared_sums[:, window:] - squared_sums[:, :-window]
+        variance = (window_squared_sums - window_sums**2 / window) / (window - 1)
+        rolling_volatility[:, window - 1 :] = sqrt(maximum(variance, 0.0))
+        return rolling_volatility
+
+    def _to_analytics_metric(
+        self,
+        dates: DatetimeIndex,
+        cumulative_return: NDArray,
+        rolling_volatility: NDArray,
+        drawdown: NDArray,
+        max_drawdown: float,
+    ) -> AnalyticsMetric:
+        return AnalyticsMetric(
+            cumulative_return=Series(cumulative_return, index=dates, copy=False),
+            rolling_volatility=Series(rolling_volatility, index=dates, copy=False),
+            drawdown=Series(drawdown, index=dates, copy=False),
+            max_drawdown=float(max_drawdown),
+        )
+
+
+class AnalyticsCalculatorException(Exception):
+    pass
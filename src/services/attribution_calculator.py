@@ -0,0 +1,64 @@
+from numpy import (
+    absolute,
+    argpartition,
+    argsort,
+    array,
+    errstate,
+    int64,
+    nan_to_num,
+    take_along_axis,
+    vstack,
+    where,
+    zeros,
+)
+from numpy.typing import NDArray
+
+from entities.financial_metrics import FinancialAttribution, FinancialMetrics
+
+DEFAULT_TOP_CONTRIBUTORS = 10
+
+
+class AttributionCalculator:
+    def __init__(self, top_contributors: int = DEFAULT_TOP_CONTRIBUTORS):
+        if top_contributors < 1:
+            raise AttributionCalculatorException("At least one top contributor is required")
+        self.top_contributors = top_contributors
+
+    def calculate(self, financial_metrics: FinancialMetrics) -> FinancialAttribution:
+        dates_count = len(financial_metrics.dates)
+        position_ids = array(list(financial_metrics.positions), dtype=int64)
+        if not len(position_ids):
+            return FinancialAttribution(
+                contributions=zeros((0, dates_count)),
+                top_position_ids=zeros((0, dates_count), dtype=int64),
+                top_contributions=zeros((0, dates_count)),
+            )
+
+        # the same nan skipping sums as the basket, every position return is divided by the basket value_start
+        # in one broadcast, so the contributions of a date add up to the basket return percentage
+        metrics = financial_metrics.positions.values()
+        returns = nan_to_num(vstack([metric.get_values("return_per_period") for metric in metrics]))
+        basket_value_start = nan_to_num(vstack([metric.value_start.to_numpy(dtype=float) for metric in metrics])).sum(
+            axis=0
+        )
+        with errstate(divide="ignore", invalid="ignore"):
+            contributions = where(basket_value_start == 0, 0.0, returns / basket_value_start)
+
+        top_rows = self._get_top_rows(contributions)
+        return FinancialAttribution(
+            contributions=contributions,
+            top_position_ids=position_ids[top_rows],
+            top_contributions=take_along_axis(contributions, top_rows, axis=0),
+        )
+
+    def _get_top_rows(self, contributions: NDArray) -> NDArray:
+        # partial sort: only the top rows of every date are ordered, by descending absolute contribution
+        top_count = min(self.top_contributors, contributions.shape[0])
+        magnitudes = -absolute(contributions)
+        top_rows = argpartition(magnitudes, top_count - 1, axis=0)[:top_count]
+        order = argsort(take_along_axis(magnitudes, top_rows, axis=0), axis=0, kind="stable")
+        return take_along_axis(top_rows, order, axis=0)
+
+
+class AttributionCalculatorException(Exception):
+    pass
@@ -1,27 +1,21 @@
-from pandas import Series, concat
+from typing import Sequence
+
+from numpy import add, fmax, full, nan, nan_to_num, unique, vstack, zeros
+from numpy.typing import NDArray
+from pandas import Index, Series, concat
 from pandas.core.groupby import DataFrameGroupBy
 
 from entities.financial_metrics import BasketMetric, PositionMetric
 
 
 class BasketCalculator:
-    def __init__(self) -> None:
-        self.is_open_series: list[Series[float]] = []
-        self.value_series: list[Series[float]] = []
-        self.value_start_series: list[Series[float]] = []
-        self.return_per_period_series: list[Series[float]] = []
-
-    def add_to_basket(self, position_metric: PositionMetric) -> None:
-        self.is_open_series.append(position_metric.is_open)
-        self.value_series.append(position_metric.value)
-        self.value_start_series.append(position_metric.value_start)
-        self.return_per_period_series.append(position_metric.return_per_period)
-
-    def calculate(self) -> BasketMetric:
-        is_open_aggregate = concat(self.is_open_series).groupby(level=0)
-        value_aggregate = concat(self.value_series).groupby(level=0)
-        value_start_aggregate = concat(self.value_start_series).groupby(level=0)
-        return_per_period_aggregate = concat(self.return_per_period_series).groupby(level=0)
+    # the calculator holds no state, the positions of a basket are passed to each call, so calculations do not
+    # add up across calls and one instance can serve several threads at once
+    def calculate(self, position_metrics: Sequence[PositionMetric]) -> BasketMetric:
+        is_open_aggregate = concat([metric.is_open for metric in position_metrics]).groupby(level=0)
+        value_aggregate = concat([metric.value for metric in position_metrics]).groupby(level=0)
+        value_start_aggregate = concat([metric.value_start for metric in position_metrics]).groupby(level=0)
+        return_per_period_aggregate = concat([metric.return_per_period for metric in position_metrics]).groupby(level=0)
         return BasketMetric(
             is_open=self._is_open_calculate(is_open_aggregate),
             price=self._price_local_calculate(is_open_aggregate),
@@ -32,6 +26,57 @@ class BasketCalculator:
             ),
         )
 
+    def calculate_groups(
+        self, position_metrics: Sequence[PositionMetric], group_keys: dict[str, NDArray]
+    ) -> dict[str, dict[str, BasketMetric]]:
+        # group keys hold one key per position, in the order of position_metrics
+        date_index = position_metrics[0].value.index
+        is_open = vstack([metric.get_values("is_open") for metric in position_metrics])
+        # missing values are skipped by the sums, as in the groupby aggregation of calculate
+        value = nan_to_num(vstack([metric.get_values("value") for metric in position_metrics]))
+        value_start = nan_to_num(vstack([metric.value_start.to_numpy(dtype=float) for metric in position_metrics]))
+        return_per_period = nan_to_num(vstack([metric.get_values("return_per_period") for metric in position_metrics]))
+        return {
+            grouping: self._calculate_group_metrics(keys, date_index, is_open, value, value_start, return_per_period)
+            for grouping, keys in group_keys.items()
+        }
+
+    def _calculate_group_metrics(
+        self,
+        keys: NDArray,
+        date_index: Index,
+        is_open: NDArray,
+        value: NDArray,
+        value_start: NDArray,
+        return_per_period: NDArray,
+    ) -> dict[str, BasketMetric]:
+        group_names, group_index = unique(keys, return_inverse=True)
+        shape = (len(group_names), is_open.shape[1])
+        # segment reductions: every position row is added into the row of its group in one call per metric
+        group_is_open = full(shape, nan)
+        fmax.at(group_is_open, group_index, is_open)
+        group_value = zeros(shape)
+        add.at(group_value, group_index, value)
+        group_value_start = zeros(shape)
+        add.at(group_value_start, group_index, value_start)
+        group_return_per_period = zeros(shape)
+        add.at(group_return_per_period, group_index, return_per_period)
+
+        group_metrics = {}
+        for row, group_name in enumerate(group_names):
+            group_return_per_period_series = Series(group_return_per_period[row], index=date_index)
+            group_value_start_series = Series(group_value_start[row], index=date_index)
+            group_metrics[str(group_name)] = BasketMetric(
+                is_open=Series(group_is_open[row], index=date_index),
+                price=Series(0.0, index=date_index),
+                value=Series(group_value[row], index=date_index),
+                return_per_period=group_return_per_period_series,
+                return_per_period_percentage=(group_return_per_period_series / group_value_start_series).mask(
+                    group_value_start_series == 0, 0.0
+                ),
+            )
+        return group_metrics
+
     def _is_open_calculate(self, is_open_aggregate: DataFrameGroupBy) -> Series[float]:
         return is_open_aggregate.max()
 
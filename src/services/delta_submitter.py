@@ -0,0 +1,100 @@
+from hashlib import sha256
+
+from numpy import array, float64
+
+from models.performativ_api import BasePayload, BasketPayload, PositionPayload, PostSubmitPayload
+from models.submit_fingerprints import SubmitFingerprints
+from repositories.performativ_api_repo import PerformativApiRepo, PerformativApiRepoException
+from repositories.submit_fingerprint_repo import SubmitFingerprintRepo
+
+PAYLOAD_FIELDS = ["IsOpen", "Price", "Value", "ReturnPerPeriod", "ReturnPerPeriodPercentage"]
+
+
+class DeltaSubmitter:
+    def __init__(self, performativ_api_repo: PerformativApiRepo, submit_fingerprint_repo: SubmitFingerprintRepo):
+        self._performativ_api_repo = performativ_api_repo
+        self._submit_fingerprint_repo = submit_fingerprint_repo
+
+    def submit(self, payload: PostSubmitPayload) -> dict[str, str]:
+        delta_payloads = self.build_delta_payloads(payload, self._submit_fingerprint_repo.load())
+        if delta_payloads is None:
+            result = self._performativ_api_repo.post_submit_financial_metrics(payload)
+        else:
+            try:
+                result = {"message": "No changes since the last submit"}
+                for delta_payload in delta_payloads:
+                    result = self._performativ_api_repo.post_submit_financial_metrics(delta_payload)
+            except PerformativApiRepoException:
+                # the full payload is always a valid submit, whatever part of the delta was accepted
+                result = self._performativ_api_repo.post_submit_financial_metrics(payload)
+
+        self._submit_fingerprint_repo.save(self.get_fingerprints(payload))
+        return result
+
+    def reset(self) -> None:
+        self._submit_fingerprint_repo.clear()
+
+    def build_delta_payloads(
+        self, payload: PostSubmitPayload, previous: SubmitFingerprints | None
+    ) -> list[PostSubmitPayload] | None:
+        # None when only the full payload can bring the submitted state up to date
+        if previous is None or payload.dates[: len(previous.dates)] != previous.dates:
+            return None
+        if not previous.positions.keys() <= payload.positions.keys():
+            return None
+
+        previous_dates_count = len(previous.dates)
+        appended_dates = payload.dates[previous_dates_count:]
+        changed_positions: dict[str, PositionPayload] = {}
+        appended_positions: dict[str, PositionPayload] = {}
+        for position_id, position_payload in payload.positions.items():
+            if previous.positions.get(position_id) != self._fingerprint(position_payload, previous_dates_count):
+                changed_positions[position_id] = position_payload
+            elif appended_dates:
+                appended_positions[position_id] = PositionPayload(
+                    **self._slice_values(position_payload, previous_dates_count)
+                )
+
+        basket = payload.basket
+        is_basket_changed = basket is not None and previous.basket != self._fingerprint(basket, previous_dates_count)
+
+        delta_payloads = []
+        # positions whose history changed are sent in full, over every date
+        if changed_positions or is_basket_changed:
+            delta_payloads.append(
+                PostSubmitPayload(
+                    positions=changed_positions, basket=basket if is_basket_changed else None, dates=payload.dates
+                )
+            )
+        # positions with an unchanged history only send the values of the appended dates
+        if appended_dates:
+            delta_payloads.append(
+                PostSubmitPayload(
+                    positions=appended_positions,
+                    basket=(
+                        BasketPayload(**self._slice_values(basket, previous_dates_count))
+                        if basket is not None and not is_basket_changed
+                        else None
+                    ),
+                    dates=appended_dates,
+                )
+            )
+        return delta_payloads
+
+    def get_fingerprints(self, payload: PostSubmitPayload) -> SubmitFingerprints:
+        dates_count = len(payload.dates)
+        return SubmitFingerprints(
+            dates=payload.dates,
+            positions={
+                position_id: self._fingerprint(position_payload, dates_count)
+                for position_id, position_payload in payload.positions.items()
+            },
+            basket=self._fingerprint(payload.basket, dates_count) if payload.basket is not None else None,
+        )
+
+    def _fingerprint(self, metric_payload: BasePayload, dates_count: int) -> str:
+        series = array([getattr(metric_payload, field)[:dates_count] for field in PAYLOAD_FIELDS], dtype=float64)
+        return sha256(series.tobytes()).hexdigest()
+
+    def _slice_values(self, metric_payload: BasePayload, start: int) -> dict[str, list[float]]:
+        return {field: getattr(metric_payload, field)[start:] for field in PAYLOAD_FIELDS}
@@ -0,0 +1,123 @@
+from numpy import (
+    add,
+    errstate,
+    float64,
+    int64,
+    isfinite,
+    isnan,
+    ones,
+    unique,
+    where,
+    zeros,
+)
+from numpy.typing import NDArray
+from pandas import DatetimeIndex, Series
+
+from entities.financial_metrics import BasketMetric
+from entities.market_data import MarketData, MarketDataException
+from entities.positions_table import PositionsTable
+
+
+class EventBasketCalculator:
+    def calculate(
+        self,
+        positions_table: PositionsTable,
+        market_data: MarketData,
+        target_currency: str,
+        date_index: DatetimeIndex,
+    ) -> BasketMetric:
+        # positions are reduced to open and close events per instrument and currency key, a cumulative sum of
+        # the quantity events over the dates gives the open quantity of every key on every day
+        days = date_index.values.astype("datetime64[D]").astype(int64)
+        instrument_ids, instrument_rows = unique(positions_table.instrument_ids, return_inverse=True)
+        currencies, currency_rows = unique(positions_table.instrument_currencies, return_inverse=True)
+        keys, key_rows = unique(instrument_rows * len(currencies) + currency_rows, return_inverse=True)
+        try:
+            fx_rates = market_data.get_currencies_fx_rates(currencies, target_currency)[keys % max(len(currencies), 1)]
+            unit_values = market_data.get_instruments_prices(instrument_ids)[keys // max(len(currencies), 1)] * fx_rates
+        except MarketDataException as e:
+            raise EventBasketCalculatorException(str(e)) from e
+        previous_unit_values = zeros(unit_values.shape)
+        # the first day starts from 0, as the shifted value of PositionCalculator
+        previous_unit_values[:, 1:] = unit_values[:, :-1]
+
+        shape = (len(keys), len(days) + 1)
+        open_columns = days.searchsorted(positions_table.open_days, side="left")
+        close_columns = days.searchsorted(positions_table.close_days, side="left")
+        quantities = positions_table.quantities.astype(float64)
+        open_notionals = positions_table.open_prices * quantities
+        close_notionals = positions_table.close_prices * quantities
+        is_opened = (positions_table.open_days >= days[0]) & (positions_table.open_days <= days[-1])
+        is_closed = (positions_table.close_days >= days[0]) & (positions_table.close_days <= days[-1])
+        is_same_day = positions_table.open_days == positions_table.close_days
+        # a position without close price has a missing close day return, it is skipped as in the groupby sums
+        has_close_price = isfinite(positions_table.close_prices)
+
+        # open count and quantity of every key and day, positions opened before the window count from day one
+        events = self._sum_events(shape, key_rows, open_columns, quantities)
+        events -= self._sum_events(shape, key_rows, close_columns, quantities)
+        open_count, open_quantity = events[0].cumsum(axis=1)[:, :-1], events[1].cumsum(axis=1)[:, :-1]
+        previous_open_count, previous_open_quantity = zeros(open_count.shape), zeros(open_quantity.shape)
+        previous_open_count[:, 1:], previous_open_quantity[:, 1:] = open_count[:, :-1], open_quantity[:, :-1]
+
+        opened = is_opened & ~is_same_day
+        opened_count, opened_quantity, opened_notional = self._sum_events(
+            shape, key_rows[opened], open_columns[opened], quantities[opened], open_notionals[opened]
+        )[:, :, :-1]
+        all_opened_count, _, all_opened_notional = self._sum_events(
+            shape, key_rows[is_opened], open_columns[is_opened], quantities[is_opened], open_notionals[is_opened]
+        )[:, :, :-1]
+        closed = is_closed & ~is_same_day & has_close_price
+        closed_count, closed_quantity, closed_notional = self._sum_events(
+            shape, key_rows[closed], close_columns[closed], quantities[closed], close_notionals[closed]
+        )[:, :, :-1]
+        same_day = is_opened & is_same_day & has_close_price
+        same_day_count, _, same_day_return = self._sum_events(
+            shape,
+            key_rows[same_day],
+            open_columns[same_day],
+            quantities[same_day],
+            close_notionals[same_day] - open_notionals[same_day],
+        )[:, :, :-1]
+
+        # every term covers positions with the same missing market data, so skipping a missing term skips the
+        # same positions as the groupby sums of BasketCalculator
+        value = self._sum_terms((open_count, open_quantity * unit_values))
+        value_start = self._sum_terms(
+            (previous_open_count, previous_open_quantity * previous_unit_values),
+            (all_opened_count, all_opened_notional * fx_rates),
+        )
+        return_per_period = self._sum_terms(
+            (open_count - opened_count, (open_quantity - opened_quantity) * (unit_values - previous_unit_values)),
+            (opened_count, opened_quantity * unit_values - opened_notional * fx_rates),
+            (closed_count, closed_notional * fx_rates - closed_quantity * previous_unit_values),
+            (same_day_count, same_day_return * fx_rates),
+        )
+        with errstate(divide="ignore", invalid="ignore"):
+            return_per_period_percentage = where(value_start == 0, 0.0, return_per_period / value_start)
+        return BasketMetric(
+            is_open=Series((open_count.sum(axis=0) > 0).astype(float64), index=date_index),
+            price=Series(0.0, index=date_index),
+            value=Series(value, index=date_index),
+            return_per_period=Series(return_per_period, index=date_index),
+            return_per_period_percentage=Series(return_per_period_percentage, index=date_index),
+        )
+
+    def _sum_events(
+        self, shape: tuple[int, int], key_rows: NDArray, columns: NDArray, *amounts: NDArray
+    ) -> NDArray[float64]:
+        # event count and summed amounts per key and day, the extra last column collects events after the window
+        events = zeros((1 + len(amounts), *shape))
+        for row, values in enumerate((ones(len(key_rows)), *amounts)):
+            add.at(events[row], (key_rows, columns), values)
+        return events
+
+    def _sum_terms(self, *terms: tuple[NDArray, NDArray]) -> NDArray[float64]:
+        # a term of a key and day is skipped when it holds no position or its market data is missing
+        total = zeros(terms[0][1].shape[1])
+        for count, term in terms:
+            total += where((count == 0) | isnan(term), 0.0, term).sum(axis=0)
+        return total
+
+class EventBasketCalculatorException(Exception):
+    pass
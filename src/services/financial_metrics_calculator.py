@@ -1,97 +1,526 @@
 from datetime import date
 from typing import Iterator
 
+from numpy import array, nan
+from numpy.typing import NDArray
 from pandas import (
     DataFrame,
     DatetimeIndex,
+    Timestamp,
     date_range,
+    unique,
 )
 
-from entities.financial_metrics import FinancialMetrics, PositionMetric
-from models.performativ_api import FxRatesData, PricesData
+from entities.basket_accumulator import BasketAccumulator
+from entities.financial_metrics import BasketMetric, FinancialMetrics, PositionMetric, SpilledFinancialMetrics
+from entities.market_data import MarketData
+from entities.positions_table import PositionRow, PositionsTable
+from entities.watch_state import WatchState
+from models.basket_engine import BasketEngine
+from models.basket_grouping import BasketGrouping
 from models.performativ_resource import PerformativResource
 from models.positions_data import PositionsData
+from models.reporting_window import ReportingWindow
+from models.scenario import Scenario
+from repositories.enviroment_loader import config
+from repositories.market_data_store_repo import MarketDataStoreRepo
+from repositories.spill_repo import SpillRepo
+from services.analytics_calculator import AnalyticsCalculator
+from services.attribution_calculator import AttributionCalculator
 from services.basket_calculator import BasketCalculator
+from services.event_basket_calculator import EventBasketCalculator
+from services.market_data_aligner import MarketDataAligner
+from services.memory_tracker import MemoryTracker
 from services.performativ_resource_loader import PerformativResourceLoader
 from services.position_calculator import PositionCalculator
+from services.risk_calculator import RiskCalculator
+from services.scenario_calculator import ScenarioCalculator
 
 
 class FinancialMetricsCalculator:
     def __init__(
         self,
-        positions_data: PositionsData,
+        positions_data: PositionsData | PositionsTable,
         performativ_resource_loader: PerformativResourceLoader | None = None,
         position_calculator: PositionCalculator | None = None,
         basket_calculator: BasketCalculator | None = None,
+        market_data_store_repo: MarketDataStoreRepo | None = None,
+        analytics_calculator: AnalyticsCalculator | None = None,
+        market_data_aligner: MarketDataAligner | None = None,
+        basket_groupings: list[BasketGrouping] | None = None,
+        scenario_calculator: ScenarioCalculator | None = None,
+        memory_tracker: MemoryTracker | None = None,
+        basket_engine: BasketEngine = BasketEngine.GROUPBY,
+        event_basket_calculator: EventBasketCalculator | None = None,
+        risk_calculator: RiskCalculator | None = None,
+        attribution_calculator: AttributionCalculator | None = None,
     ):
-        self._positions_data = positions_data
+        self._positions_table = (
+            positions_data
+            if isinstance(positions_data, PositionsTable)
+            else PositionsTable.from_positions_data(positions_data)
+        )
         self._performativ_resource_loader = performativ_resource_loader or PerformativResourceLoader(
-            self._positions_data
+            self._positions_table
         )
         self._position_calculator = position_calculator or PositionCalculator()
         self._basket_calculator = basket_calculator or BasketCalculator()
+        self._market_data_store_repo = market_data_store_repo or (
+            MarketDataStoreRepo(config.MARKET_DATA_STORE_DIR) if config.MARKET_DATA_STORE_DIR else None
+        )
+        self._market_data_aligner = market_data_aligner or MarketDataAligner(config.MARKET_DATA_FILL_POLICY)
+        # analytics are an optional stage, disabled unless a calculator is supplied
+        self._analytics_calculator = analytics_calculator
+        self._basket_groupings = basket_groupings or []
+        self._scenario_calculator = scenario_calculator or ScenarioCalculator()
+        self._memory_tracker = memory_tracker or MemoryTracker()
+        self._basket_engine = basket_engine
+        self._event_basket_calculator = event_basket_calculator or EventBasketCalculator()
+        # risk is an optional stage as well, calculated from the positions table and the market data
+        self._risk_calculator = risk_calculator
+        self._attribution_calculator = attribution_calculator
 
-    def calculate(self, target_currency: str, start_date: date, end_date: date) -> FinancialMetrics:
+    def calculate(
+        self,
+        target_currency: str,
+        start_date: date,
+        end_date: date,
+        performativ_resource: PerformativResource | None = None,
+    ) -> FinancialMetrics:
         try:
             positions = {}
             date_index = date_range(start_date, end_date)
 
-            for position_id, position_metric in self._calculate_position_metrics(target_currency, date_index):
-                positions[position_id] = position_metric
-                self._basket_calculator.add_to_basket(position_metric)
+            with self._memory_tracker.stage("load_market_data"):
+                market_data = self._load_market_data(target_currency, date_index, performativ_resource)
+
+            # every intermediate of the calculation is local to this call, so the calculator can be reused and
+            # run on several threads at once
+            position_metrics = []
+            with self._memory_tracker.stage("position_metrics"):
+                for position_id, position_metric in self._calculate_position_metrics(
+                    target_currency, date_index, market_data
+                ):
+                    positions[position_id] = position_metric
+                    position_metrics.append(position_metric)
+
+            with self._memory_tracker.stage("basket"):
+                financial_metrics = FinancialMetrics(
+                    positions=positions,
+                    basket=(
+                        self._event_basket_calculator.calculate(
+                            self._positions_table, market_data, target_currency, date_index
+                        )
+                        if self._basket_engine == BasketEngine.EVENT
+                        else self._basket_calculator.calculate(position_metrics)
+                    ),
+                    dates=date_index,
+                )
+                if self._basket_groupings:
+                    financial_metrics.sub_baskets = self._basket_calculator.calculate_groups(
+                        position_metrics, self._get_group_keys()
+                    )
+            if self._analytics_calculator is not None:
+                with self._memory_tracker.stage("analytics"):
+                    financial_metrics.analytics = self._analytics_calculator.calculate(financial_metrics)
+            if self._risk_calculator is not None:
+                with self._memory_tracker.stage("risk"):
+                    financial_metrics.risk = self._risk_calculator.calculate(
+                        self._positions_table, market_data, target_currency, date_index
+                    )
+            if self._attribution_calculator is not None:
+                with self._memory_tracker.stage("attribution"):
+                    financial_metrics.attribution = self._attribution_calculator.calculate(financial_metrics)
+            return financial_metrics
+        except Exception as e:
+            raise FinancialMetricsCalculatorException(str(e)) from e
+
+    def calculate_chunked(
+        self,
+        target_currency: str,
+        start_date: date,
+        end_date: date,
+        spill_repo: SpillRepo,
+        chunk_size: int,
+        precision: int,
+        performativ_resource: PerformativResource | None = None,
+    ) -> SpilledFinancialMetrics:
+        # out-of-core mode: positions are calculated in batches of chunk_size and every batch is serialized
+        # to the spill repo, so memory holds one batch and the O(dates) basket accumulators
+        try:
+            if chunk_size <= 0:
+                raise FinancialMetricsCalculatorException("Chunk size must be positive")
+            date_index = date_range(start_date, end_date)
+
+            with self._memory_tracker.stage("load_market_data"):
+                market_data = self._load_market_data(target_currency, date_index, performativ_resource)
+
+            basket_accumulator = BasketAccumulator.empty(len(date_index))
+            spill_repo.clear()
+            with self._memory_tracker.stage("position_metrics"):
+                for chunk_start in range(0, len(self._positions_table), chunk_size):
+                    chunk_table = self._positions_table.take(slice(chunk_start, chunk_start + chunk_size))
+                    chunk_positions = {}
+                    for position_id, position_metric in self._calculate_position_metrics(
+                        target_currency, date_index, market_data, chunk_table
+                    ):
+                        chunk_positions[position_id] = position_metric
+                        basket_accumulator.add(position_metric)
+                    spill_repo.append_chunk(SpilledFinancialMetrics.to_position_fragment(chunk_positions, precision))
+
+            return SpilledFinancialMetrics(
+                basket=basket_accumulator.finalize(date_index),
+                dates=date_index,
+                positions_count=len(self._positions_table),
+            )
+        except Exception as e:
+            raise FinancialMetricsCalculatorException(str(e)) from e
+
+    def calculate_streamed(
+        self,
+        target_currency: str,
+        start_date: date,
+        end_date: date,
+        precision: int,
+        performativ_resource: PerformativResource | None = None,
+    ) -> Iterator[str]:
+        # yields an NDJSON record per position as soon as it is calculated and a last basket and dates record,
+        # no position is held after its record is yielded
+        try:
+            date_index = date_range(start_date, end_date)
+
+            with self._memory_tracker.stage("load_market_data"):
+                market_data = self._load_market_data(target_currency, date_index, performativ_resource)
 
-            return FinancialMetrics(
-                positions=positions,
-                basket=self._basket_calculator.calculate(),
+            basket_accumulator = BasketAccumulator.empty(len(date_index))
+            for position_id, position_metric in self._calculate_position_metrics(
+                target_currency, date_index, market_data
+            ):
+                basket_accumulator.add(position_metric)
+                yield SpilledFinancialMetrics.to_ndjson_position_record(position_id, position_metric, precision)
+
+            yield SpilledFinancialMetrics(
+                basket=basket_accumulator.finalize(date_index),
                 dates=date_index,
+                positions_count=len(self._positions_table),
+            ).to_ndjson_summary_record(precision)
+        except Exception as e:
+            raise FinancialMetricsCalculatorException(str(e)) from e
+
+    def calculate_windows(
+        self,
+        target_currency: str,
+        windows: list[ReportingWindow],
+        performativ_resource: PerformativResource | None = None,
+    ) -> dict[str, FinancialMetrics]:
+        # market data and position metrics are calculated once over the union of the windows,
+        # every window is a slice of them with its own basket
+        try:
+            if not windows:
+                raise FinancialMetricsCalculatorException("At least one reporting window is required")
+            if len({window.name for window in windows}) != len(windows):
+                raise FinancialMetricsCalculatorException("Reporting window names must be unique")
+            date_index = date_range(
+                min(window.start_date for window in windows), max(window.end_date for window in windows)
+            )
+
+            with self._memory_tracker.stage("load_market_data"):
+                market_data = self._load_market_data(target_currency, date_index, performativ_resource)
+
+            with self._memory_tracker.stage("position_metrics"):
+                position_metrics = list(self._calculate_position_metrics(target_currency, date_index, market_data))
+
+            with self._memory_tracker.stage("basket"):
+                return {
+                    window.name: self._slice_window(
+                        position_metrics,
+                        date_index,
+                        date_range(window.start_date, window.end_date),
+                        target_currency,
+                        market_data,
+                    )
+                    for window in windows
+                }
+        except Exception as e:
+            raise FinancialMetricsCalculatorException(str(e)) from e
+
+    def start_watch(
+        self,
+        target_currency: str,
+        start_date: date,
+        end_date: date,
+        performativ_resource: PerformativResource | None = None,
+    ) -> tuple[WatchState, FinancialMetrics]:
+        # the full calculation of a watch session, its state is updated by update_watch on every edit
+        try:
+            date_index = date_range(start_date, end_date)
+            with self._memory_tracker.stage("load_market_data"):
+                market_data = self._load_market_data(target_currency, date_index, performativ_resource)
+
+            watch_state = WatchState.empty(date_index, market_data)
+            with self._memory_tracker.stage("position_metrics"):
+                for row, (_, position_metric) in enumerate(
+                    self._calculate_position_metrics(target_currency, date_index, market_data)
+                ):
+                    watch_state.add(self._positions_table.get_position(row), position_metric)
+            return watch_state, self._get_watch_financial_metrics(watch_state, list(watch_state.positions))
+        except Exception as e:
+            raise FinancialMetricsCalculatorException(str(e)) from e
+
+    def update_watch(
+        self, target_currency: str, watch_state: WatchState, positions_table: PositionsTable
+    ) -> FinancialMetrics:
+        # positions are diffed by id, removed and changed positions are taken out of the basket sums and only the
+        # added and changed ones are calculated again
+        try:
+            positions = list(positions_table.iter_positions())
+            changed_rows = [
+                row for row, position in enumerate(positions) if watch_state.positions.get(position.id) != position
+            ]
+            changed_table = positions_table.take(array(changed_rows, dtype=int))
+            market_data = watch_state.market_data
+            missing_instrument_ids = self._get_instrument_ids(changed_table) - set(market_data.instrument_ids)
+            missing_fx_pairs = self._get_fx_pairs(target_currency, changed_table) - set(market_data.fx_pairs)
+            if missing_instrument_ids or missing_fx_pairs:
+                # only the market data of new instruments and currencies is fetched, the positions that kept theirs
+                # are not calculated again
+                watch_state.market_data = market_data.merge(
+                    self._fetch_universe_market_data(
+                        target_currency, watch_state.date_index, missing_instrument_ids, missing_fx_pairs
+                    )
+                )
+
+            position_ids = [position.id for position in positions]
+            for position_id in watch_state.positions.keys() - set(position_ids):
+                watch_state.remove(position_id)
+            for row, (position_id, position_metric) in enumerate(
+                self._calculate_position_metrics(
+                    target_currency, watch_state.date_index, watch_state.market_data, changed_table
+                )
+            ):
+                if position_id in watch_state.positions:
+                    watch_state.remove(position_id)
+                watch_state.add(changed_table.get_position(row), position_metric)
+            return self._get_watch_financial_metrics(watch_state, position_ids)
+        except Exception as e:
+            raise FinancialMetricsCalculatorException(str(e)) from e
+
+    def _get_watch_financial_metrics(self, watch_state: WatchState, position_ids: list[int]) -> FinancialMetrics:
+        financial_metrics = FinancialMetrics(
+            positions={position_id: watch_state.position_metrics[position_id] for position_id in position_ids},
+            basket=watch_state.get_basket(),
+            dates=watch_state.date_index,
+        )
+        if self._analytics_calculator is not None:
+            financial_metrics.analytics = self._analytics_calculator.calculate(financial_metrics)
+        if self._attribution_calculator is not None:
+            financial_metrics.attribution = self._attribution_calculator.calculate(financial_metrics)
+        return financial_metrics
+
+    def _slice_window(
+        self,
+        position_metrics: list[tuple[int, PositionMetric]],
+        date_index: DatetimeIndex,
+        window_index: DatetimeIndex,
+        target_currency: str,
+        market_data: MarketData,
+    ) -> FinancialMetrics:
+        window = slice(window_index[0], window_index[-1])
+        first_day_column = date_index.get_loc(window_index[0])
+        basket_accumulator = BasketAccumulator.empty(len(window_index))
+        positions = {}
+        # position metrics are yielded in the row order of the positions table
+        for row, (position_id, position_metric) in enumerate(position_metrics):
+            # the series changed on the first day are copied, the others stay views of the union metrics
+            window_metric = PositionMetric(
+                is_open=position_metric.is_open.loc[window],
+                price=position_metric.price.loc[window],
+                value=position_metric.value.loc[window],
+                return_per_period=position_metric.return_per_period.loc[window].copy(),
+                return_per_period_percentage=position_metric.return_per_period_percentage.loc[window].copy(),
+                value_start=position_metric.value_start.loc[window].copy(),
+            )
+            if first_day_column > 0:
+                position = self._positions_table.get_position(row)
+                fx_rate = self._get_fx_rate(position, target_currency, market_data, first_day_column)
+                self._start_window(window_metric, position, fx_rate)
+            positions[position_id] = window_metric
+            basket_accumulator.add(window_metric)
+        return FinancialMetrics(
+            positions=positions, basket=basket_accumulator.finalize(window_index), dates=window_index
+        )
+
+    def _start_window(self, position_metric: PositionMetric, position: PositionRow, fx_rate: float) -> None:
+        # the first day of a window starts from 0 as in PositionCalculator.calculate_value_start, instead of the
+        # value of the previous day, unless the position opens on it
+        first_day = position_metric.value_start.index[0]
+        if Timestamp(position.open_date) == first_day:
+            return
+        is_close_day = position.close_date is not None and Timestamp(position.close_date) == first_day
+        if is_close_day:
+            close_price = position.close_price if position.close_price is not None else nan
+            value_end = close_price * fx_rate * position.quantity
+        else:
+            value_end = position_metric.value.iloc[0]
+        is_active = position_metric.is_open.iloc[0] == 1.0 or is_close_day
+        position_metric.value_start.iloc[0] = 0.0
+        position_metric.return_per_period.iloc[0] = value_end if is_active else 0.0
+        position_metric.return_per_period_percentage.iloc[0] = 0.0
+
+    def _get_fx_rate(self, position: PositionRow, target_currency: str, market_data: MarketData, column: int) -> float:
+        if position.instrument_currency == target_currency:
+            return 1.0
+        fx_rates = market_data.get_fx_rates(f"{position.instrument_currency}{target_currency}")
+        return float(fx_rates[column]) if fx_rates is not None else nan
+
+    def calculate_scenarios(
+        self,
+        target_currency: str,
+        start_date: date,
+        end_date: date,
+        scenarios: list[Scenario],
+        performativ_resource: PerformativResource | None = None,
+    ) -> dict[str, BasketMetric]:
+        try:
+            date_index = date_range(start_date, end_date)
+            # market data is loaded once and every scenario is evaluated from it in one batch
+            market_data = self._load_market_data(target_currency, date_index, performativ_resource)
+            return self._scenario_calculator.calculate(
+                self._positions_table, market_data, target_currency, date_index, scenarios
             )
         except Exception as e:
             raise FinancialMetricsCalculatorException(str(e)) from e
 
     def _calculate_position_metrics(
-        self, target_currency: str, date_index: DatetimeIndex
+        self,
+        target_currency: str,
+        date_index: DatetimeIndex,
+        market_data: MarketData,
+        positions_table: PositionsTable | None = None,
     ) -> Iterator[tuple[int, PositionMetric]]:
+        if positions_table is None:
+            positions_table = self._positions_table
+        for pos in positions_table.iter_positions():
+            fx_df = self._get_fx_pair_dataframe(date_index, pos.instrument_currency, target_currency, market_data)
+            prices_df = self._get_instrument_prices_dataframe(date_index, str(pos.instrument_id), market_data)
+
+            requirements = self._position_calculator.load_calculation_requirements(pos, fx_df, prices_df)
+            yield (
+                pos.id,
+                self._position_calculator.calculate(requirements, date_index),
+            )
+
+    def _load_market_data(
+        self, target_currency: str, date_index: DatetimeIndex, performativ_resource: PerformativResource | None = None
+    ) -> MarketData:
         start_date = date_index[0].date()
         end_date = date_index[-1].date()
 
-        resource_data = self._load_resource_data(target_currency, start_date, end_date)
-        for pos in self._positions_data.positions:
-            fx_df = self._get_fx_pair_dataframe(
-                date_index, pos.instrument_currency, target_currency, resource_data.fx_rates
-            )
-            prices_df = self._get_instrument_prices_dataframe(date_index, str(pos.instrument_id), resource_data.prices)
+        if self._market_data_store_repo is None:
+            return self._fetch_market_data(target_currency, date_index, performativ_resource)
 
-            self._position_calculator.load_calculation_requirements(pos, fx_df, prices_df)
-            yield (
-                pos.id,
-                self._position_calculator.calculate(date_index),
+        stored_market_data = self._market_data_store_repo.load()
+        if stored_market_data is None or len(stored_market_data.dates) == 0:
+            self._market_data_store_repo.save(
+                self._fetch_market_data(target_currency, date_index, performativ_resource)
             )
+            stored_market_data = self._market_data_store_repo.load()
+        elif not stored_market_data.covers(
+            self._get_instrument_ids(), self._get_fx_pairs(target_currency), start_date, end_date
+        ):
+            self._market_data_store_repo.save(
+                self._extend_market_data(stored_market_data, target_currency, date_index, performativ_resource)
+            )
+            stored_market_data = self._market_data_store_repo.load()
+
+        if stored_market_data is None:
+            raise FinancialMetricsCalculatorException("Market data store is empty after saving")
+        return stored_market_data.slice(start_date, end_date)
+
+    def _extend_market_data(
+        self,
+        stored_market_data: MarketData,
+        target_currency: str,
+        date_index: DatetimeIndex,
+        performativ_resource: PerformativResource | None = None,
+    ) -> MarketData:
+        # the store keeps the instruments and FX pairs of every run, e.g. a prefetched universe, over the union of
+        # their date ranges, so only what the store is missing is fetched and every stored row covers every date
+        store_index = date_range(
+            min(date_index[0], Timestamp(stored_market_data.dates[0])),
+            max(date_index[-1], Timestamp(stored_market_data.dates[-1])),
+        )
+        instrument_ids = self._get_instrument_ids() | set(stored_market_data.instrument_ids)
+        fx_pairs = self._get_fx_pairs(target_currency) | set(stored_market_data.fx_pairs)
+        market_data = stored_market_data if len(stored_market_data.dates) == len(store_index) else None
+        if performativ_resource is not None and len(date_index) == len(store_index):
+            resource_market_data = self._market_data_aligner.align(performativ_resource, store_index)
+            market_data = resource_market_data if market_data is None else market_data.merge(resource_market_data)
+        if market_data is not None:
+            instrument_ids -= set(market_data.instrument_ids)
+            fx_pairs -= set(market_data.fx_pairs)
+        if not instrument_ids and not fx_pairs and market_data is not None:
+            return market_data
+        fetched_market_data = self._fetch_universe_market_data(target_currency, store_index, instrument_ids, fx_pairs)
+        return fetched_market_data if market_data is None else market_data.merge(fetched_market_data)
+
+    def _fetch_market_data(
+        self, target_currency: str, date_index: DatetimeIndex, performativ_resource: PerformativResource | None = None
+    ) -> MarketData:
+        # a resource loaded ahead of time, e.g. while streaming the positions file, is not fetched again
+        resource_data = performativ_resource or self._performativ_resource_loader.load_resources(
+            target_currency, date_index[0].date(), date_index[-1].date()
+        )
+        return self._market_data_aligner.align(resource_data, date_index)
+
+    def _fetch_universe_market_data(
+        self, target_currency: str, date_index: DatetimeIndex, instrument_ids: set[str], fx_pairs: set[str]
+    ) -> MarketData:
+        resource_data = self._performativ_resource_loader.load_universe_resources(
+            sorted(instrument_ids), sorted(fx_pairs), date_index[0].date(), date_index[-1].date()
+        )
+        return self._market_data_aligner.align(resource_data, date_index)
+
+    def _get_instrument_ids(self, positions_table: PositionsTable | None = None) -> set[str]:
+        if positions_table is None:
+            positions_table = self._positions_table
+        return {str(instrument_id) for instrument_id in unique(positions_table.instrument_ids)}
+
+    def _get_fx_pairs(self, target_currency: str, positions_table: PositionsTable | None = None) -> set[str]:
+        if positions_table is None:
+            positions_table = self._positions_table
+        currencies = unique(positions_table.instrument_currencies)
+        return {f"{currency}{target_currency}" for currency in currencies if currency != target_currency}
 
-    def _load_resource_data(self, target_currency: str, start_date: date, end_date: date) -> PerformativResource:
-        return self._performativ_resource_loader.load_resources(target_currency, start_date, end_date)
+    def _get_group_keys(self) -> dict[str, NDArray]:
+        group_columns = {
+            BasketGrouping.CURRENCY: self._positions_table.instrument_currencies,
+            BasketGrouping.INSTRUMENT: self._positions_table.instrument_ids.astype(str),
+            BasketGrouping.TAG: self._positions_table.tags,
+        }
+        return {grouping.value: group_columns[grouping] for grouping in self._basket_groupings}
 
     def _get_fx_pair_dataframe(
-        self, date_series: DatetimeIndex, local_currency: str, target_currency: str, fx_rates_data: FxRatesData
+        self, date_series: DatetimeIndex, local_currency: str, target_currency: str, market_data: MarketData
     ) -> DataFrame:
         if local_currency == target_currency:
-            fx_df = DataFrame(fx_rates_data, index=date_series)
-            return fx_df.assign(date=date_series, rate=1)
+            return DataFrame({"rate": 1.0}, index=date_series)
         fx_pair = f"{local_currency}{target_currency}"
-        fx_rates = fx_rates_data.model_dump()["items"].get(fx_pair)
+        fx_rates = market_data.get_fx_rates(fx_pair)
         if fx_rates is None:
             raise FinancialMetricsCalculatorException(f"Fx rates data is not available for {fx_pair}")
 
-        return DataFrame(fx_rates, index=date_series)
+        return DataFrame({"rate": fx_rates}, index=date_series, copy=False)
 
     def _get_instrument_prices_dataframe(
-        self, date_series: DatetimeIndex, instrument_id: str, prices_data: PricesData
+        self, date_series: DatetimeIndex, instrument_id: str, market_data: MarketData
     ) -> DataFrame:
-        prices = prices_data.model_dump()["items"].get(instrument_id)
+        prices = market_data.get_prices(instrument_id)
 
         if prices is None:
             raise FinancialMetricsCalculatorException(f"Prices data is not available for {instrument_id}")
 
-        return DataFrame(prices, index=date_series)
+        return DataFrame({"price": prices}, index=date_series, copy=False)
 
 
 class FinancialMetricsCalculatorException(Exception):
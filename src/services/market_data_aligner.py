@@ -0,0 +1,61 @@
+from numpy import arange, array, datetime64, float64, full, int64, isnan, lexsort, maximum, nan, ones, repeat, where
+from numpy.typing import NDArray
+from pandas import DatetimeIndex
+
+from entities.market_data import MarketData
+from models.market_data_fill_policy import MarketDataFillPolicy
+from models.performativ_api import FxRateData, PriceData
+from models.performativ_resource import PerformativResource
+
+
+class MarketDataAligner:
+    def __init__(self, fill_policy: MarketDataFillPolicy = MarketDataFillPolicy.FORWARD_FILL):
+        self.fill_policy = fill_policy
+
+    def align(self, resource: PerformativResource, date_index: DatetimeIndex) -> MarketData:
+        calendar = date_index.values.astype("datetime64[D]")
+        instrument_ids = list(resource.prices.items)
+        fx_pairs = list(resource.fx_rates.items)
+        return MarketData(
+            dates=calendar,
+            instrument_ids=instrument_ids,
+            prices=self._align_series([resource.prices.items[key] for key in instrument_ids], "price", calendar),
+            fx_pairs=fx_pairs,
+            fx_rates=self._align_series([resource.fx_rates.items[key] for key in fx_pairs], "rate", calendar),
+        )
+
+    def _align_series(
+        self, series: list[list[PriceData]] | list[list[FxRateData]], value_field: str, calendar: NDArray[datetime64]
+    ) -> NDArray[float64]:
+        aligned = full((len(series), len(calendar)), nan)
+        if not series or not len(calendar):
+            return aligned
+
+        # every series is flattened into one set of (row, date, value) points and placed in a single pass
+        rows = repeat(arange(len(series), dtype=int64), [len(items) for items in series])
+        dates = array([item.date for items in series for item in items], dtype="datetime64[D]")
+        values = array([getattr(item, value_field) for items in series for item in items], dtype=float64)
+
+        order = lexsort((dates, rows))
+        rows, dates, values = rows[order], dates[order], values[order]
+        columns = calendar.searchsorted(dates, side="left")
+
+        in_calendar = (columns < len(calendar)) & (calendar[columns.clip(max=len(calendar) - 1)] == dates)
+        if self.fill_policy == MarketDataFillPolicy.FORWARD_FILL:
+            # points before the window seed the forward fill of the first day
+            in_calendar |= dates < calendar[0]
+        rows, columns, values = rows[in_calendar], columns[in_calendar], values[in_calendar]
+
+        # points are ordered by row then date, the latest one wins where several land on the same cell
+        is_last_in_cell = ones(len(rows), dtype=bool)
+        is_last_in_cell[:-1] = (rows[1:] != rows[:-1]) | (columns[1:] != columns[:-1])
+        aligned[rows[is_last_in_cell], columns[is_last_in_cell]] = values[is_last_in_cell]
+
+        if self.fill_policy == MarketDataFillPolicy.FORWARD_FILL:
+            return self._forward_fill(aligned)
+        return aligned
+
+    def _forward_fill(self, aligned: NDArray[float64]) -> NDArray[float64]:
+        last_valid_columns = maximum.accumulate(where(isnan(aligned), 0, arange(aligned.shape[1])), axis=1)
+        filled: NDArray[float64] = aligned[arange(aligned.shape[0])[:, None], last_valid_columns]
+        return filled
@@ -0,0 +1,130 @@
+import json
+import os
+import resource
+import sys
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from threading import Event, Lock, Thread, get_ident
+from typing import Iterator
+
+MIB = 1024 * 1024
+RSS_SAMPLE_INTERVAL_SECONDS = 0.01
+
+# rough bytes per position and date held at the peak of a run: the retained position metric series,
+# the per-position DataFrames, the basket concat and groupby copies and the payload lists of python floats
+ESTIMATED_BYTES_PER_POSITION_DAY = 6 * 8 + 10 * 8 + 4 * 8 * 2 + 5 * 32 + 5 * 20
+
+
+@dataclass
+class StageMemory:
+    stage: str
+    rss_before_bytes: int
+    rss_after_bytes: int
+    rss_peak_bytes: int
+    traced_peak_bytes: int | None
+
+
+class MemoryTracker:
+    def __init__(self, trace_allocations: bool = False, budget_bytes: int | None = None):
+        # both tracemalloc and the RSS sampling thread cost time, the tracker is a no-op unless asked for
+        self.trace_allocations = trace_allocations
+        self.budget_bytes = budget_bytes
+        self.enabled = trace_allocations or budget_bytes is not None
+        self.stages: list[StageMemory] = []
+        # the RSS and the tracemalloc peak are process wide, the stages of calculations running at the same time
+        # would reset and mix each other's peaks, so an enabled tracker only records the stages of one thread
+        self._thread_id: int | None = None
+        self._thread_lock = Lock()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        if not self.enabled:
+            yield
+            return
+
+        self._claim_thread()
+        if self.trace_allocations:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        rss_before = get_rss_bytes()
+        sampler = RssSampler(rss_before)
+        sampler.start()
+        try:
+            yield
+        finally:
+            sampler.stop()
+            traced_peak = tracemalloc.get_traced_memory()[1] if self.trace_allocations else None
+            self.stages.append(
+                StageMemory(
+                    stage=name,
+                    rss_before_bytes=rss_before,
+                    rss_after_bytes=get_rss_bytes(),
+                    rss_peak_bytes=sampler.peak_bytes,
+                    traced_peak_bytes=traced_peak,
+                )
+            )
+        if self.budget_bytes is not None and sampler.peak_bytes > self.budget_bytes:
+            raise MemoryTrackerException(
+                f"Stage {name} peaked at {sampler.peak_bytes / MIB:.1f} MiB, "
+                f"over the memory budget of {self.budget_bytes / MIB:.1f} MiB"
+            )
+
+    def _claim_thread(self) -> None:
+        with self._thread_lock:
+            if self._thread_id is None:
+                self._thread_id = get_ident()
+            elif self._thread_id != get_ident():
+                raise MemoryTrackerException(
+                    "The memory tracker records the stages of a single thread, "
+                    "use a calculator without memory tracking for concurrent calculations"
+                )
+
+    def check_budget(self, positions_count: int, dates_count: int) -> None:
+        if self.budget_bytes is None:
+            return
+        estimate = get_rss_bytes() + estimate_run_bytes(positions_count, dates_count)
+        if estimate > self.budget_bytes:
+            raise MemoryTrackerException(
+                f"Estimated peak memory of {estimate / MIB:.1f} MiB for {positions_count} positions over "
+                f"{dates_count} dates exceeds the memory budget of {self.budget_bytes / MIB:.1f} MiB"
+            )
+
+    def get_report(self, **sections: object) -> str:
+        return json.dumps({"stages": [asdict(stage) for stage in self.stages], **sections}, indent=4)
+
+
+class RssSampler(Thread):
+    def __init__(self, initial_bytes: int):
+        super().__init__(daemon=True)
+        self.peak_bytes = initial_bytes
+        self._stopped = Event()
+
+    def run(self) -> None:
+        while not self._stopped.wait(RSS_SAMPLE_INTERVAL_SECONDS):
+            self.peak_bytes = max(self.peak_bytes, get_rss_bytes())
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self.join()
+        self.peak_bytes = max(self.peak_bytes, get_rss_bytes())
+
+
+def estimate_run_bytes(positions_count: int, dates_count: int) -> int:
+    return positions_count * dates_count * ESTIMATED_BYTES_PER_POSITION_DAY
+
+
+def get_rss_bytes() -> int:
+    try:
+        # the second field of statm is the resident set size in pages
+        with open("/proc/self/statm", "r", encoding="utf-8") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        # without procfs only the peak is available, in kilobytes on linux and bytes on macOS
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+class MemoryTrackerException(Exception):
+    pass
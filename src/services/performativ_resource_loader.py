@@ -1,9 +1,11 @@
 from asyncio import gather, run
 from datetime import date
 
+from numpy import array
 from numpy.typing import NDArray
-from pandas import DataFrame
+from pandas import unique
 
+from entities.positions_table import PositionsTable
 from models.performativ_api import FxRatesData, GetFxRatesParams, GetInstrumentPricesParams, PricesData
 from models.performativ_resource import PerformativResource
 from models.positions_data import PositionsData
@@ -13,20 +15,33 @@ from repositories.performativ_api_repo import PerformativApiRepo
 class PerformativResourceLoader:
     def __init__(
         self,
-        positions_data: PositionsData,
+        positions_data: PositionsData | PositionsTable,
         performativ_api_repo: PerformativApiRepo | None = None,
     ):
-        self._positions_data = positions_data
+        self._positions_table = (
+            positions_data
+            if isinstance(positions_data, PositionsTable)
+            else PositionsTable.from_positions_data(positions_data)
+        )
         self._performativ_api_repo = performativ_api_repo or PerformativApiRepo()
 
     def load_resources(self, target_currency: str, start_date: date, end_date: date) -> PerformativResource:
         return run(self._load_resources(target_currency, start_date, end_date))
 
+    def load_universe_resources(
+        self, instrument_ids: list[str], fx_pairs: list[str], start_date: date, end_date: date
+    ) -> PerformativResource:
+        # market data of an explicit instrument and FX pair universe, independent of the loaded positions
+        return run(self._load_universe_resources(array(instrument_ids), array(fx_pairs), start_date, end_date))
+
     async def _load_resources(self, target_currency: str, start_date: date, end_date: date) -> PerformativResource:
-        positions_df = DataFrame(self._positions_data.model_dump()["positions"])
-        fx_pairs = self._get_unique_fx_pairs(positions_df, target_currency)
-        instrument_ids = self._get_unique_instrument_ids(positions_df)
+        return await self._load_universe_resources(
+            self._get_unique_instrument_ids(), self._get_unique_fx_pairs(target_currency), start_date, end_date
+        )
 
+    async def _load_universe_resources(
+        self, instrument_ids: NDArray, fx_pairs: NDArray, start_date: date, end_date: date
+    ) -> PerformativResource:
         start_date_param = start_date.strftime("%Y%m%d")
         end_date_param = end_date.strftime("%Y%m%d")
         fx_rates_task = self._get_fx_rates_by_dates(fx_pairs, start_date_param, end_date_param)
@@ -36,16 +51,17 @@ class PerformativResourceLoader:
 
         return PerformativResource(fx_rates=fx_rates, prices=prices)
 
-    def _get_unique_fx_pairs(self, positions_df: DataFrame, target_currency: str) -> NDArray:
-        return (  # type: ignore
-            positions_df[positions_df["instrument_currency"] != target_currency]["instrument_currency"]
-            + target_currency
-        ).unique()
+    def _get_unique_fx_pairs(self, target_currency: str) -> NDArray:
+        currencies = self._positions_table.instrument_currencies
+        return unique(currencies[currencies != target_currency]) + target_currency  # type: ignore
 
-    def _get_unique_instrument_ids(self, positions_df: DataFrame) -> NDArray:
-        return positions_df["instrument_id"].unique()  # type: ignore
+    def _get_unique_instrument_ids(self) -> NDArray:
+        return unique(self._positions_table.instrument_ids)  # type: ignore
 
     async def _get_fx_rates_by_dates(self, fx_pairs: NDArray, start_date: str, end_date: str) -> FxRatesData:
+        # a fetch of missing market data may only miss instruments, it does not request an empty list of pairs
+        if len(fx_pairs) == 0:
+            return FxRatesData(items={})
         return await self._performativ_api_repo.get_fx_rates_by_dates(
             params=GetFxRatesParams(pairs=",".join(fx_pairs), start_date=start_date, end_date=end_date)
         )
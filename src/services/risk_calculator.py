@@ -0,0 +1,68 @@
+from numpy import bincount, errstate, int64, isfinite, quantile, sqrt, unique, where
+from pandas import DatetimeIndex
+
+from entities.financial_metrics import RiskMetrics
+from entities.market_data import MarketData, MarketDataException
+from entities.positions_table import PositionsTable
+
+DEFAULT_VAR_CONFIDENCE = 0.99
+
+
+class RiskCalculator:
+    def __init__(self, confidence: float = DEFAULT_VAR_CONFIDENCE):
+        if not 0.0 < confidence < 1.0:
+            raise RiskCalculatorException("VaR confidence must be between 0 and 1")
+        self.confidence = confidence
+
+    def calculate(
+        self,
+        positions_table: PositionsTable,
+        market_data: MarketData,
+        target_currency: str,
+        date_index: DatetimeIndex,
+    ) -> RiskMetrics:
+        if len(date_index) < 3:
+            raise RiskCalculatorException("Risk needs at least 3 dates")
+        # positions held on the last date are reduced to one exposure per instrument and currency,
+        # no position series is involved
+        last_day = date_index[-1].to_datetime64().astype("datetime64[D]").astype(int64)
+        is_held = (positions_table.open_days <= last_day) & (positions_table.close_days > last_day)
+        instrument_ids, instrument_rows = unique(positions_table.instrument_ids[is_held], return_inverse=True)
+        currencies, currency_rows = unique(positions_table.instrument_currencies[is_held], return_inverse=True)
+        currencies_count = max(len(currencies), 1)
+        keys, key_rows = unique(instrument_rows * currencies_count + currency_rows, return_inverse=True)
+
+        try:
+            unit_values = (
+                market_data.get_instruments_prices(instrument_ids)[keys // currencies_count]
+                * market_data.get_currencies_fx_rates(currencies, target_currency)[keys % currencies_count]
+            )
+        except MarketDataException as e:
+            raise RiskCalculatorException(str(e)) from e
+        quantities = bincount(key_rows, weights=positions_table.quantities[is_held], minlength=len(keys))
+        # an exposure without a last price cannot be valued, it does not take part in the risk
+        exposures = where(isfinite(unit_values[:, -1]), quantities * unit_values[:, -1], 0.0)
+
+        with errstate(divide="ignore", invalid="ignore"):
+            returns = unit_values[:, 1:] / unit_values[:, :-1] - 1.0
+        # a missing price is taken as no move, the covariance keeps every date of the window
+        returns = where(isfinite(returns), returns, 0.0)
+        observations = returns.shape[1]
+        centered = returns - returns.mean(axis=1, keepdims=True)
+        covariance = centered @ centered.T / (observations - 1)
+
+        # historical VaR from the P&L the current exposures would have made on every past date
+        profits_and_losses = exposures @ returns
+        return RiskMetrics(
+            instrument_ids=[str(instrument_id) for instrument_id in instrument_ids[keys // currencies_count]],
+            currencies=[str(currency) for currency in currencies[keys % currencies_count]],
+            exposures=exposures,
+            covariance=covariance,
+            portfolio_volatility=float(sqrt(max(exposures @ covariance @ exposures, 0.0))),
+            value_at_risk=float(-quantile(profits_and_losses, 1.0 - self.confidence)) if len(keys) else 0.0,
+            confidence=self.confidence,
+            observations=observations,
+        )
+
+class RiskCalculatorException(Exception):
+    pass
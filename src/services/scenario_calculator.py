@@ -0,0 +1,133 @@
+from numpy import (
+    arange,
+    errstate,
+    float64,
+    int64,
+    nan,
+    nansum,
+    ones,
+    unique,
+    where,
+    zeros,
+)
+from numpy.typing import NDArray
+from pandas import DatetimeIndex, Series
+
+from entities.financial_metrics import BasketMetric
+from entities.market_data import MarketData, MarketDataException
+from entities.positions_table import PositionsTable
+from models.scenario import Scenario, ShockType
+
+
+class ScenarioCalculator:
+    def __init__(self, position_block_size: int = 1024):
+        if position_block_size < 1:
+            raise ScenarioCalculatorException("Position block size must be at least 1")
+        # scenario x position x date arrays are built for this many positions at a time to bound memory
+        self.position_block_size = position_block_size
+
+    def calculate(
+        self,
+        positions_table: PositionsTable,
+        market_data: MarketData,
+        target_currency: str,
+        date_index: DatetimeIndex,
+        scenarios: list[Scenario],
+    ) -> dict[str, BasketMetric]:
+        instrument_ids, instrument_rows = unique(positions_table.instrument_ids, return_inverse=True)
+        currencies, currency_rows = unique(positions_table.instrument_currencies, return_inverse=True)
+        try:
+            instruments_prices = market_data.get_instruments_prices(instrument_ids)
+            currencies_fx_rates = market_data.get_currencies_fx_rates(currencies, target_currency)
+        except MarketDataException as e:
+            raise ScenarioCalculatorException(str(e)) from e
+        # shocked market data: scenario x instrument x date and scenario x currency x date
+        prices = self._shock(
+            instruments_prices,
+            scenarios,
+            [scenario.price_shocks for scenario in scenarios],
+            {int(instrument_id): row for row, instrument_id in enumerate(instrument_ids)},
+        )
+        # the target currency converts at 1.0 in every scenario
+        fx_rates = self._shock(
+            currencies_fx_rates,
+            scenarios,
+            [scenario.fx_shocks for scenario in scenarios],
+            {str(currency): row for row, currency in enumerate(currencies) if currency != target_currency},
+        )
+
+        days = date_index.values.astype("datetime64[D]").astype(int64)
+        # only the basket's open flag is kept, a date is open when any position of any block is open on it
+        is_open = zeros(len(days), dtype=bool)
+        shape = (len(scenarios), len(days))
+        value, value_start, return_per_period = zeros(shape), zeros(shape), zeros(shape)
+        for start in range(0, len(positions_table), self.position_block_size):
+            block = arange(start, min(start + self.position_block_size, len(positions_table)))
+            block_is_open, block_value, block_value_start, block_return_per_period = self._calculate_block(
+                positions_table, block, days, prices[:, instrument_rows[block]], fx_rates[:, currency_rows[block]]
+            )
+            is_open |= block_is_open.any(axis=0)
+            value += nansum(block_value, axis=1)
+            value_start += nansum(block_value_start, axis=1)
+            return_per_period += nansum(block_return_per_period, axis=1)
+
+        basket_is_open = is_open.astype(float64)
+        with errstate(divide="ignore", invalid="ignore"):
+            return_per_period_percentage = where(value_start == 0, 0.0, return_per_period / value_start)
+        return {
+            scenario.name: BasketMetric(
+                is_open=Series(basket_is_open, index=date_index),
+                price=Series(0.0, index=date_index),
+                value=Series(value[row], index=date_index),
+                return_per_period=Series(return_per_period[row], index=date_index),
+                return_per_period_percentage=Series(return_per_period_percentage[row], index=date_index),
+            )
+            for row, scenario in enumerate(scenarios)
+        }
+
+    def _calculate_block(
+        self, positions_table: PositionsTable, block: NDArray, days: NDArray, prices: NDArray, fx_rates: NDArray
+    ) -> tuple[NDArray, NDArray, NDArray, NDArray]:
+        # the same daily rules as PositionCalculator, as position x date masks broadcast over the scenarios
+        open_days = positions_table.open_days[block, None]
+        close_days = positions_table.close_days[block, None]
+        quantities = positions_table.quantities[block, None].astype(float64)
+        is_pre_open = days < open_days
+        is_open = ~is_pre_open & (days < close_days)
+        is_open_day = days == open_days
+        is_close_day = days == close_days
+
+        value = where(is_pre_open, 0.0, prices) * (is_open * quantities) * fx_rates
+        # the first day starts from 0 unless the position opens on it, as in PositionCalculator
+        value_start = zeros(value.shape)
+        value_start[..., 1:] = value[..., :-1]
+        value_start = where(is_open_day, positions_table.open_prices[block, None] * quantities * fx_rates, value_start)
+        value_end = where(days < close_days, value, nan)
+        value_end = where(is_close_day, positions_table.close_prices[block, None] * quantities * fx_rates, value_end)
+        return_per_period = where(is_open | is_close_day, value_end - value_start, 0.0)
+        return is_open, value, value_start, return_per_period
+
+    def _shock(
+        self,
+        values: NDArray,
+        scenarios: list[Scenario],
+        shocks: list[dict],
+        rows: dict,
+    ) -> NDArray:
+        # shocks of instruments or currencies outside the positions do not change anything
+        scale = ones((len(scenarios), values.shape[0]))
+        shift = zeros((len(scenarios), values.shape[0]))
+        for scenario_row, scenario in enumerate(scenarios):
+            for key, shock in shocks[scenario_row].items():
+                row = rows.get(key)
+                if row is None:
+                    continue
+                if scenario.shock_type == ShockType.ADDITIVE:
+                    shift[scenario_row, row] = shock
+                else:
+                    scale[scenario_row, row] = 1.0 + shock
+        shocked: NDArray = values * scale[:, :, None] + shift[:, :, None]
+        return shocked
+
+class ScenarioCalculatorException(Exception):
+    pass
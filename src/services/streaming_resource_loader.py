@@ -0,0 +1,76 @@
+from asyncio import Queue, Task, create_task, gather, get_running_loop, run, to_thread
+from datetime import date
+from typing import Iterable
+
+from models.performativ_api import FxRatesData, GetFxRatesParams, GetInstrumentPricesParams, PricesData
+from models.performativ_resource import PerformativResource
+from models.positions_data import PositionDTO, PositionsData
+from repositories.performativ_api_repo import PerformativApiRepo
+
+
+class StreamingResourceLoader:
+    def __init__(self, performativ_api_repo: PerformativApiRepo | None = None):
+        self._performativ_api_repo = performativ_api_repo or PerformativApiRepo()
+
+    def load(
+        self, positions: Iterable[PositionDTO], target_currency: str, start_date: date, end_date: date
+    ) -> tuple[PositionsData, PerformativResource]:
+        return run(self._load(positions, target_currency, start_date, end_date))
+
+    async def _load(
+        self, positions: Iterable[PositionDTO], target_currency: str, start_date: date, end_date: date
+    ) -> tuple[PositionsData, PerformativResource]:
+        start_date_param = start_date.strftime("%Y%m%d")
+        end_date_param = end_date.strftime("%Y%m%d")
+        loop = get_running_loop()
+        parsed_positions: Queue[PositionDTO | None] = Queue()
+
+        def parse_positions() -> None:
+            try:
+                for position in positions:
+                    loop.call_soon_threadsafe(parsed_positions.put_nowait, position)
+            finally:
+                loop.call_soon_threadsafe(parsed_positions.put_nowait, None)
+
+        # the positions file is parsed on a worker thread while this loop sends a request for every new
+        # instrument and fx pair as soon as the parser yields it
+        parser = create_task(to_thread(parse_positions))
+        prices_tasks: dict[int, Task[PricesData]] = {}
+        fx_rates_tasks: dict[str, Task[FxRatesData]] = {}
+        loaded_positions: list[PositionDTO] = []
+        try:
+            while (position := await parsed_positions.get()) is not None:
+                loaded_positions.append(position)
+                if position.instrument_id not in prices_tasks:
+                    prices_tasks[position.instrument_id] = create_task(
+                        self._performativ_api_repo.get_instruments_prices_by_dates(
+                            [
+                                GetInstrumentPricesParams(
+                                    instrument_id=str(position.instrument_id),
+                                    start_date=start_date_param,
+                                    end_date=end_date_param,
+                                )
+                            ]
+                        )
+                    )
+                fx_pair = f"{position.instrument_currency}{target_currency}"
+                if position.instrument_currency != target_currency and fx_pair not in fx_rates_tasks:
+                    fx_rates_tasks[fx_pair] = create_task(
+                        self._performativ_api_repo.get_fx_rates_by_dates(
+                            GetFxRatesParams(pairs=fx_pair, start_date=start_date_param, end_date=end_date_param)
+                        )
+                    )
+            await parser
+            prices_results = await gather(*prices_tasks.values())
+            fx_rates_results = await gather(*fx_rates_tasks.values())
+        except BaseException:
+            for task in [parser, *prices_tasks.values(), *fx_rates_tasks.values()]:
+                task.cancel()
+            raise
+
+        return PositionsData(positions=loaded_positions), PerformativResource(
+            fx_rates=FxRatesData(
+                items={pair: rates for result in fx_rates_results for pair, rates in result.items.items()}
+            ),
+            prices=PricesData(items={key: prices for result in prices_results for key, prices in result.items.items()}),
+        )
@@ -0,0 +1,70 @@
+import pytest
+from numpy import nan, testing
+from pandas import Series, date_range
+
+from entities.financial_metrics import BasketMetric, FinancialMetrics, PositionMetric
+from services.analytics_calculator import AnalyticsCalculator, AnalyticsCalculatorException
+
+
+class TestAnalyticsCalculator:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.test_date_index = date_range("2023-01-01", "2023-01-06")
+        self.test_returns = {
+            1: [0.0, 0.1, -0.2, 0.05, nan, 0.1],
+            2: [0.0, 0.0, 0.0, 0.0, 0.0, 0.0],
+        }
+        self.test_basket_returns = [0.0, 0.05, -0.1, 0.025, 0.0, 0.05]
+        self.financial_metrics = FinancialMetrics(
+            positions={
+                position_id: self._make_metric(PositionMetric, returns, value_start=Series(0.0, self.test_date_index))
+                for position_id, returns in self.test_returns.items()
+            },
+            basket=self._make_metric(BasketMetric, self.test_basket_returns),
+            dates=self.test_date_index,
+        )
+        self.calculator = AnalyticsCalculator(rolling_window=3)
+
+    def _make_metric(self, metric_type, returns, **kwargs):
+        return metric_type(
+            is_open=Series(1.0, index=self.test_date_index),
+            price=Series(0.0, index=self.test_date_index),
+            value=Series(0.0, index=self.test_date_index),
+            return_per_period=Series(0.0, index=self.test_date_index),
+            return_per_period_percentage=Series(returns, index=self.test_date_index),
+            **kwargs,
+        )
+
+    def test_init_when_rolling_window_too_short_should_raise_expected_exception_message(self):
+        with pytest.raises(AnalyticsCalculatorException) as ex:
+            AnalyticsCalculator(rolling_window=1)
+
+        assert "Rolling window must span at least 2 periods" in str(ex.value)
+
+    def test_calculate_should_return_cumulative_linked_return(self):
+        actual = self.calculator.calculate(self.financial_metrics)
+
+        expected = (1 + Series(self.test_returns[1]).fillna(0.0)).cumprod() - 1
+        testing.assert_allclose(actual.positions[1].cumulative_return.to_numpy(), expected.to_numpy())
+        testing.assert_allclose(actual.positions[2].cumulative_return.to_numpy(), [0.0] * 6)
+        assert actual.basket.cumulative_return.index.equals(self.test_date_index)
+
+    def test_calculate_should_return_drawdown_from_running_max(self):
+        actual = self.calculator.calculate(self.financial_metrics)
+
+        growth = (1 + Series(self.test_returns[1]).fillna(0.0)).cumprod()
+        expected = growth / growth.cummax() - 1
+        testing.assert_allclose(actual.positions[1].drawdown.to_numpy(), expected.to_numpy())
+        assert actual.positions[1].max_drawdown == pytest.approx(expected.min())
+        assert actual.positions[2].max_drawdown == 0.0
+
+    def test_calculate_should_return_rolling_volatility(self):
+        actual = self.calculator.calculate(self.financial_metrics)
+
+        expected = Series(self.test_basket_returns).rolling(3).std()
+        testing.assert_allclose(actual.basket.rolling_volatility.to_numpy(), expected.to_numpy())
+
+    def test_calculate_when_fewer_dates_than_window_should_return_nan_volatility(self):
+        actual = AnalyticsCalculator(rolling_window=10).calculate(self.financial_metrics)
+
+        assert actual.basket.rolling_volatility.isna().all()
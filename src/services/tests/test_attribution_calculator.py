@@ -0,0 +1,68 @@
+import pytest
+from numpy import absolute, argsort, nan, random, take_along_axis, testing
+from pandas import Series, date_range
+
+from entities.financial_metrics import FinancialMetrics, PositionMetric
+from services.attribution_calculator import AttributionCalculator, AttributionCalculatorException
+from services.basket_calculator import BasketCalculator
+
+
+class TestAttributionCalculator:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.test_date_index = date_range("2023-01-01", "2023-01-10")
+        self.calculator = AttributionCalculator(top_contributors=3)
+
+    def _make_financial_metrics(self, positions_count: int) -> FinancialMetrics:
+        rng = random.default_rng(5)
+        positions = {}
+        for position_id in range(100, 100 + positions_count):
+            return_per_period = rng.normal(0.0, 10.0, len(self.test_date_index))
+            value_start = rng.uniform(0.0, 1000.0, len(self.test_date_index))
+            # missing market data and days without any position
+            return_per_period[rng.random(len(self.test_date_index)) < 0.1] = nan
+            value_start[0] = 0.0
+            return_per_period[0] = 0.0
+            positions[position_id] = PositionMetric(
+                is_open=Series(1.0, index=self.test_date_index),
+                price=Series(1.0, index=self.test_date_index),
+                value=Series(value_start, index=self.test_date_index),
+                return_per_period=Series(return_per_period, index=self.test_date_index),
+                return_per_period_percentage=Series(0.0, index=self.test_date_index),
+                value_start=Series(value_start, index=self.test_date_index),
+            )
+        return FinancialMetrics(
+            positions=positions,
+            basket=BasketCalculator().calculate(list(positions.values())),
+            dates=self.test_date_index,
+        )
+
+    def test_calculate_should_split_the_basket_return_percentage_by_position(self):
+        financial_metrics = self._make_financial_metrics(8)
+
+        actual = self.calculator.calculate(financial_metrics)
+
+        assert actual.contributions.shape == (8, len(self.test_date_index))
+        testing.assert_allclose(
+            actual.contributions.sum(axis=0), financial_metrics.basket.get_values("return_per_period_percentage")
+        )
+
+    def test_calculate_should_return_top_contributors_by_absolute_contribution(self):
+        financial_metrics = self._make_financial_metrics(8)
+
+        actual = self.calculator.calculate(financial_metrics)
+
+        expected_rows = argsort(-absolute(actual.contributions), axis=0, kind="stable")[:3]
+        testing.assert_array_equal(actual.top_position_ids[:, 1:], (expected_rows + 100)[:, 1:])
+        testing.assert_allclose(actual.top_contributions, take_along_axis(actual.contributions, expected_rows, axis=0))
+
+    def test_calculate_when_fewer_positions_than_top_contributors_should_rank_every_position(self):
+        actual = self.calculator.calculate(self._make_financial_metrics(2))
+
+        assert actual.top_position_ids.shape == (2, len(self.test_date_index))
+
+    def test_init_when_no_top_contributors_should_raise_expected_error_message(self):
+        with pytest.raises(AttributionCalculatorException) as ex:
+            AttributionCalculator(0)
+
+        assert "At least one top contributor is required" in str(ex.value)
@@ -1,5 +1,5 @@
-from numpy import nan
-from pandas import Series, date_range
+from numpy import array, nan
+from pandas import Series, date_range, testing
 
 from entities.financial_metrics import PositionMetric
 from services.basket_calculator import BasketCalculator
@@ -55,24 +55,83 @@ class TestBasketCalculator:
             0.0,
         ]
 
-        for i in range(0, 4):
-            calculator.add_to_basket(
-                PositionMetric(
-                    is_open=Series(test_is_open_series[i], index=test_date_index),
-                    price=Series(0.0, index=test_date_index),
-                    value=Series(test_value_series[i], index=test_date_index),
-                    value_start=Series(test_value_start_series[i], index=test_date_index),
-                    return_per_period=Series(test_return_per_period_series[i], index=test_date_index),
-                    return_per_period_percentage=Series(
-                        test_return_per_period_percentage_series[i], index=test_date_index
-                    ),
-                )
+        position_metrics = [
+            PositionMetric(
+                is_open=Series(test_is_open_series[i], index=test_date_index),
+                price=Series(0.0, index=test_date_index),
+                value=Series(test_value_series[i], index=test_date_index),
+                value_start=Series(test_value_start_series[i], index=test_date_index),
+                return_per_period=Series(test_return_per_period_series[i], index=test_date_index),
+                return_per_period_percentage=Series(test_return_per_period_percentage_series[i], index=test_date_index),
             )
+            for i in range(0, 4)
+        ]
 
-        actual = calculator.calculate()
+        actual = calculator.calculate(position_metrics)
 
         assert actual.is_open.to_list() == expected_is_open_series
         assert actual.price.to_list() == [0.0] * 10
         assert actual.value.to_list() == expected_value_series
         assert actual.return_per_period.to_list() == expected_return_per_period_series
         assert actual.return_per_period_percentage.to_list() == expected_return_per_period_percentage_series
+
+    def test_calculate_groups_should_match_calculate_of_each_group(self):
+        test_date_index = date_range("2023-01-01", "2023-01-05")
+        test_values = [[100.0, 110.0, nan, 0.0, 0.0], [50.0, 55.0, 60.0, 66.0, 0.0], [10.0, 20.0, 30.0, 40.0, 50.0]]
+        test_keys = array(["EUR", "USD", "EUR"])
+
+        def make_position_metric(values):
+            value = Series(values, index=test_date_index)
+            return PositionMetric(
+                is_open=(value > 0).astype(float),
+                price=Series(0.0, index=test_date_index),
+                value=value,
+                value_start=value.shift(1, fill_value=0.0),
+                return_per_period=value.diff().fillna(0.0),
+                return_per_period_percentage=Series(0.0, index=test_date_index),
+            )
+
+        calculator = BasketCalculator()
+
+        actual = calculator.calculate_groups(
+            [make_position_metric(values) for values in test_values], {"currency": test_keys}
+        )
+
+        assert list(actual) == ["currency"]
+        assert list(actual["currency"]) == ["EUR", "USD"]
+        for group_key, group_metric in actual["currency"].items():
+            expected = calculator.calculate(
+                [
+                    make_position_metric(values)
+                    for values, key in zip(test_values, test_keys, strict=True)
+                    if key == group_key
+                ]
+            )
+            testing.assert_series_equal(group_metric.is_open, expected.is_open, check_names=False, check_freq=False)
+            testing.assert_series_equal(group_metric.value, expected.value, check_names=False, check_freq=False)
+            testing.assert_series_equal(
+                group_metric.return_per_period, expected.return_per_period, check_names=False, check_freq=False
+            )
+            testing.assert_series_equal(
+                group_metric.return_per_period_percentage,
+                expected.return_per_period_percentage,
+                check_names=False,
+                check_freq=False,
+            )
+
+    def test_calculate_when_called_again_should_not_add_up_previous_positions(self):
+        test_date_index = date_range("2023-01-01", "2023-01-02")
+        position_metric = PositionMetric(
+            is_open=Series(1.0, index=test_date_index),
+            price=Series(0.0, index=test_date_index),
+            value=Series([10.0, 11.0], index=test_date_index),
+            value_start=Series([10.0, 10.0], index=test_date_index),
+            return_per_period=Series([0.0, 1.0], index=test_date_index),
+            return_per_period_percentage=Series([0.0, 0.1], index=test_date_index),
+        )
+        calculator = BasketCalculator()
+
+        first = calculator.calculate([position_metric])
+        second = calculator.calculate([position_metric])
+
+        assert second.value.to_list() == first.value.to_list() == [10.0, 11.0]
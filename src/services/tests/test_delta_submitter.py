@@ -0,0 +1,128 @@
+import json
+
+import pytest
+from httpx import AsyncClient, MockTransport, Request, Response
+
+from models.performativ_api import BasketPayload, PositionPayload, PostSubmitPayload
+from repositories.performativ_api_repo import PerformativApiRepo
+from repositories.submit_fingerprint_repo import SubmitFingerprintRepo
+from services.delta_submitter import PAYLOAD_FIELDS, DeltaSubmitter
+
+
+class StandInSubmitServer:
+    # keeps the submitted values by series and date, later submits overwrite earlier values of the same date
+    def __init__(self) -> None:
+        self.requests: list[dict] = []
+        self.series: dict[str, dict[str, list[float]]] = {}
+        self.failing = False
+
+    def handle(self, request: Request) -> Response:
+        if self.failing:
+            self.failing = False
+            return Response(400)
+        body = json.loads(request.content)
+        self.requests.append(body)
+        submitted = dict(body["positions"])
+        if body["basket"] is not None:
+            submitted["basket"] = body["basket"]
+        for series_id, values in submitted.items():
+            for i, date in enumerate(body["dates"]):
+                self.series.setdefault(series_id, {})[date] = [values[field][i] for field in PAYLOAD_FIELDS]
+        return Response(200, json={"message": "Submission evaluated."})
+
+
+class TestDeltaSubmitter:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        self.server = StandInSubmitServer()
+        client = AsyncClient(transport=MockTransport(self.server.handle), base_url="http://stand-in")
+        self.submitter = DeltaSubmitter(
+            PerformativApiRepo(client=client, max_concurrency=2, submit_chunk_size=0, submit_gzip=False),
+            SubmitFingerprintRepo(str(tmp_path / "submit.json")),
+        )
+
+    def _make_payload(self, dates_count: int, values: dict[str, float]) -> PostSubmitPayload:
+        def make_series(value: float) -> dict[str, list[float]]:
+            return {field: [value + i for i in range(dates_count)] for field in PAYLOAD_FIELDS}
+
+        return PostSubmitPayload(
+            positions={position_id: PositionPayload(**make_series(value)) for position_id, value in values.items()},
+            basket=BasketPayload(**make_series(sum(values.values()))),
+            dates=[f"2020-01-{day + 1:02d}" for day in range(dates_count)],
+        )
+
+    def _get_full_submit_state(self, payload: PostSubmitPayload) -> dict[str, dict[str, list[float]]]:
+        server = StandInSubmitServer()
+        server.handle(Request("POST", "http://stand-in/submit", content=payload.model_dump_json()))
+        return server.series
+
+    def test_submit_when_no_previous_state_should_post_full_payload(self):
+        payload = self._make_payload(3, {"1": 1.0, "2": 2.0})
+
+        self.submitter.submit(payload)
+
+        assert len(self.server.requests) == 1
+        assert self.server.requests[0]["dates"] == payload.dates
+
+    def test_submit_when_dates_appended_should_post_only_appended_dates(self):
+        self.submitter.submit(self._make_payload(3, {"1": 1.0, "2": 2.0}))
+        payload = self._make_payload(5, {"1": 1.0, "2": 2.0})
+
+        self.submitter.submit(payload)
+
+        delta_request = self.server.requests[-1]
+        assert len(self.server.requests) == 2
+        assert delta_request["dates"] == ["2020-01-04", "2020-01-05"]
+        assert delta_request["positions"]["1"]["Value"] == [4.0, 5.0]
+        assert self.server.series == self._get_full_submit_state(payload)
+
+    def test_submit_when_position_changed_or_added_should_post_it_in_full(self):
+        self.submitter.submit(self._make_payload(3, {"1": 1.0, "2": 2.0}))
+        payload = self._make_payload(4, {"1": 1.0, "2": 7.0, "3": 3.0})
+
+        self.submitter.submit(payload)
+
+        changed_request, appended_request = self.server.requests[1:]
+        assert sorted(changed_request["positions"]) == ["2", "3"]
+        assert changed_request["dates"] == payload.dates
+        assert changed_request["basket"] is not None
+        assert list(appended_request["positions"]) == ["1"]
+        assert appended_request["basket"] is None
+        assert self.server.series == self._get_full_submit_state(payload)
+
+    def test_submit_when_reset_should_post_full_payload(self):
+        payload = self._make_payload(3, {"1": 1.0, "2": 2.0})
+        self.submitter.submit(payload)
+
+        self.submitter.reset()
+        self.submitter.submit(payload)
+
+        assert self.server.requests[-1] == json.loads(payload.model_dump_json())
+
+    def test_submit_when_nothing_changed_should_not_post(self):
+        payload = self._make_payload(3, {"1": 1.0})
+        self.submitter.submit(payload)
+
+        actual = self.submitter.submit(payload)
+
+        assert actual == {"message": "No changes since the last submit"}
+        assert len(self.server.requests) == 1
+
+    def test_submit_when_position_removed_should_post_full_payload(self):
+        self.submitter.submit(self._make_payload(3, {"1": 1.0, "2": 2.0}))
+        payload = self._make_payload(4, {"1": 1.0})
+
+        self.submitter.submit(payload)
+
+        assert self.server.requests[-1] == json.loads(payload.model_dump_json())
+
+    def test_submit_when_delta_post_failed_should_fall_back_to_full_payload(self):
+        self.submitter.submit(self._make_payload(3, {"1": 1.0}))
+        payload = self._make_payload(4, {"1": 1.0})
+        self.server.failing = True
+
+        actual = self.submitter.submit(payload)
+
+        assert actual == {"message": "Submission evaluated."}
+        assert self.server.requests[-1] == json.loads(payload.model_dump_json())
+        assert self.server.series == self._get_full_submit_state(payload)
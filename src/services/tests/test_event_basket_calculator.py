@@ -0,0 +1,124 @@
+import pytest
+from numpy import array, datetime64, isnan, nan, random, testing, timedelta64
+from pandas import DataFrame, date_range
+
+from entities.market_data import MarketData
+from entities.positions_table import PositionsTable
+from services.basket_calculator import BasketCalculator
+from services.event_basket_calculator import EventBasketCalculator, EventBasketCalculatorException
+from services.position_calculator import PositionCalculator
+
+
+class TestEventBasketCalculator:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.test_date_index = date_range("2023-01-01", "2023-01-31")
+        self.calculator = EventBasketCalculator()
+
+    def _make_positions_table(self, positions_count: int) -> PositionsTable:
+        # opens before and inside the window, same day closes, missing close prices and offsetting quantities
+        rng = random.default_rng(7)
+        first_day = datetime64("2023-01-01", "D")
+        records = []
+        for position_id in range(positions_count):
+            open_day = first_day + timedelta64(int(rng.integers(-10, 35)), "D")
+            close_day = open_day + timedelta64(int(rng.integers(0, 20)), "D") if rng.random() < 0.6 else None
+            records.append(
+                {
+                    "id": position_id,
+                    "open_date": str(open_day),
+                    "close_date": str(close_day) if close_day is not None else None,
+                    "open_price": float(rng.uniform(1.0, 100.0)),
+                    "close_price": float(rng.uniform(1.0, 100.0)) if close_day and rng.random() < 0.9 else None,
+                    "quantity": int(rng.integers(-5, 10)),
+                    "instrument_id": int(rng.integers(1000, 1004)),
+                    "instrument_currency": str(rng.choice(["USD", "EUR", "GBP"])),
+                }
+            )
+        return PositionsTable.from_records(records)
+
+    def _make_market_data(self) -> MarketData:
+        rng = random.default_rng(11)
+        prices = rng.uniform(1.0, 100.0, (4, len(self.test_date_index)))
+        fx_rates = rng.uniform(0.5, 2.0, (2, len(self.test_date_index)))
+        # gaps left by the none fill policy
+        prices[rng.random(prices.shape) < 0.1] = nan
+        fx_rates[rng.random(fx_rates.shape) < 0.1] = nan
+        return MarketData(
+            dates=self.test_date_index.values.astype("datetime64[D]"),
+            instrument_ids=["1000", "1001", "1002", "1003"],
+            prices=prices,
+            fx_pairs=["EURUSD", "GBPUSD"],
+            fx_rates=fx_rates,
+        )
+
+    def _calculate_basket(self, positions_table: PositionsTable, market_data: MarketData):
+        position_calculator = PositionCalculator()
+        position_metrics = []
+        for position in positions_table.iter_positions():
+            fx_rates = (
+                market_data.get_fx_rates(f"{position.instrument_currency}USD")
+                if position.instrument_currency != "USD"
+                else 1.0
+            )
+            requirements = position_calculator.load_calculation_requirements(
+                position,
+                DataFrame({"rate": fx_rates}, index=self.test_date_index),
+                DataFrame({"price": market_data.get_prices(str(position.instrument_id))}, index=self.test_date_index),
+            )
+            position_metrics.append(position_calculator.calculate(requirements, self.test_date_index))
+        return BasketCalculator().calculate(position_metrics)
+
+    def test_calculate_should_match_position_and_basket_calculators(self):
+        positions_table = self._make_positions_table(200)
+        market_data = self._make_market_data()
+
+        actual = self.calculator.calculate(positions_table, market_data, "USD", self.test_date_index)
+
+        expected = self._calculate_basket(positions_table, market_data)
+        for field_name in ("is_open", "price", "value", "return_per_period", "return_per_period_percentage"):
+            testing.assert_allclose(
+                actual.get_values(field_name), expected.get_values(field_name), rtol=1e-9, atol=1e-7, err_msg=field_name
+            )
+        assert not isnan(actual.get_values("value")).any()
+
+    def test_calculate_when_fx_rates_missing_should_raise_expected_error_message(self):
+        market_data = self._make_market_data()
+        market_data.fx_pairs = ["EURUSD"]
+        market_data.fx_rates = market_data.fx_rates[:1]
+        market_data.__post_init__()
+
+        with pytest.raises(EventBasketCalculatorException) as ex:
+            self.calculator.calculate(self._make_positions_table(50), market_data, "USD", self.test_date_index)
+
+        assert "Fx rates data is not available for GBPUSD" in str(ex.value)
+
+    def test_calculate_when_single_position_should_return_its_series(self):
+        positions_table = PositionsTable.from_records(
+            [
+                {
+                    "id": 1,
+                    "open_date": "2023-01-02",
+                    "close_date": "2023-01-04",
+                    "open_price": 9.0,
+                    "close_price": 12.0,
+                    "quantity": 2,
+                    "instrument_id": 1000,
+                    "instrument_currency": "USD",
+                }
+            ]
+        )
+        date_index = date_range("2023-01-01", "2023-01-05")
+        market_data = MarketData(
+            dates=date_index.values.astype("datetime64[D]"),
+            instrument_ids=["1000"],
+            prices=array([[10.0, 10.0, 11.0, 13.0, 14.0]]),
+            fx_pairs=[],
+            fx_rates=array([]).reshape(0, 5),
+        )
+
+        actual = self.calculator.calculate(positions_table, market_data, "USD", date_index)
+
+        assert actual.get_values("is_open").tolist() == [0.0, 1.0, 1.0, 0.0, 0.0]
+        assert actual.get_values("value").tolist() == [0.0, 20.0, 22.0, 0.0, 0.0]
+        assert actual.get_values("return_per_period").tolist() == [0.0, 2.0, 2.0, 2.0, 0.0]
@@ -1,13 +1,28 @@
+import json
+from asyncio import sleep
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
 from unittest.mock import Mock
 
 import pytest
+from httpx import AsyncClient, MockTransport, Request, Response
+from numpy import array, empty
 from pandas import DataFrame, date_range
 
 from entities.financial_metrics import FinancialMetrics
+from entities.market_data import MarketData
+from entities.positions_table import PositionsTable
+from models.basket_engine import BasketEngine
+from models.basket_grouping import BasketGrouping
 from models.performativ_api import FxRateData, FxRatesData, PriceData, PricesData
 from models.performativ_resource import PerformativResource
 from models.positions_data import PositionDTO, PositionsData
+from models.reporting_window import ReportingWindow
+from models.scenario import Scenario
+from repositories.performativ_api_repo import PerformativApiRepo
+from repositories.spill_repo import SpillRepo
 from services.financial_metrics_calculator import FinancialMetricsCalculator, FinancialMetricsCalculatorException
+from services.performativ_resource_loader import PerformativResourceLoader
 
 
 class TestFinancialMetricsCalculator:
@@ -52,8 +67,19 @@ class TestFinancialMetricsCalculator:
 
         assert isinstance(actual, FinancialMetrics)
 
+    def _make_market_data(self, date_index, instrument_ids=(), fx_pairs=()) -> MarketData:
+        return MarketData(
+            dates=date_index.values.astype("datetime64[D]"),
+            instrument_ids=list(instrument_ids),
+            prices=array([[float(i)] * len(date_index) for i in range(len(instrument_ids))]).reshape(
+                len(instrument_ids), len(date_index)
+            ),
+            fx_pairs=list(fx_pairs),
+            fx_rates=empty((len(fx_pairs), len(date_index))),
+        )
+
     def test_get_fx_pair_dataframe_when_fx_pair_not_in_resource_should_raise_expected_exception_message(self):
-        test_fx_rates_data = FxRatesData(items={})
+        test_fx_rates_data = self._make_market_data(date_range("2023-01-01", "2023-01-01"))
 
         with pytest.raises(FinancialMetricsCalculatorException) as ex:
             self.calculator._get_fx_pair_dataframe(
@@ -63,8 +89,8 @@ class TestFinancialMetricsCalculator:
         assert "Fx rates data is not available for EURUSD" in str(ex)
 
     def test_get_fx_pair_dataframe_when_same_local_target_should_return_value_one(self):
-        test_fx_rates_data = FxRatesData(items={})
         test_date_index = date_range("2023-01-01", "2023-01-10")
+        test_fx_rates_data = self._make_market_data(test_date_index)
 
         actual = self.calculator._get_fx_pair_dataframe(test_date_index, "EUR", "EUR", test_fx_rates_data)
 
@@ -72,7 +98,7 @@ class TestFinancialMetricsCalculator:
         assert actual["rate"].to_list() == [1] * len(test_date_index)
 
     def test_get_instrument_prices_dataframe_when_fx_pair_not_in_resource_should_raise_expected_exception_message(self):
-        test_fx_rates_data = FxRatesData(items={})
+        test_fx_rates_data = self._make_market_data(date_range("2023-01-01", "2023-01-01"))
 
         with pytest.raises(FinancialMetricsCalculatorException) as ex:
             self.calculator._get_instrument_prices_dataframe(
@@ -80,3 +106,542 @@ class TestFinancialMetricsCalculator:
             )
 
         assert "Prices data is not available for 1001" in str(ex)
+
+    def test_get_instrument_prices_dataframe_should_return_prices_without_copy(self):
+        test_date_index = date_range("2023-01-01", "2023-01-03")
+        test_market_data = self._make_market_data(test_date_index, instrument_ids=["1000", "1001"])
+
+        actual = self.calculator._get_instrument_prices_dataframe(test_date_index, "1001", test_market_data)
+
+        assert actual["price"].to_list() == [1.0, 1.0, 1.0]
+        assert actual["price"].to_numpy().base is not None
+
+    def test_calculate_when_market_data_store_covers_window_should_not_load_resources(self):
+        test_date_index = date_range("2023-01-01", "2023-01-10")
+        mock_market_data_store_repo = Mock()
+        mock_market_data_store_repo.load.return_value = self._make_market_data(
+            test_date_index, instrument_ids=["1000"], fx_pairs=["EURUSD"]
+        )
+        calculator = FinancialMetricsCalculator(
+            self.calculator._positions_table,
+            self.mock_perfomativ_resource_loader,
+            Mock(),
+            Mock(),
+            mock_market_data_store_repo,
+        )
+
+        calculator.calculate("USD", test_date_index[2].date(), test_date_index[5].date())
+
+        self.mock_perfomativ_resource_loader.load_resources.assert_not_called()
+        mock_market_data_store_repo.save.assert_not_called()
+
+    def test_calculate_when_market_data_store_empty_should_save_loaded_resources(self):
+        mock_market_data_store_repo = Mock()
+        mock_market_data_store_repo.load.side_effect = [
+            None,
+            self._make_market_data(
+                date_range("2023-01-01", "2023-01-02"), instrument_ids=["1000"], fx_pairs=["EURUSD"]
+            ),
+        ]
+        self.mock_perfomativ_resource_loader.load_resources.return_value = PerformativResource(
+            fx_rates=FxRatesData(items={"EURUSD": [FxRateData(date="2023-01-01", rate=1.1)] * 2}),
+            prices=PricesData(items={"1000": [PriceData(date="2023-01-01", price=1001)] * 2}),
+        )
+        calculator = FinancialMetricsCalculator(
+            self.calculator._positions_table,
+            self.mock_perfomativ_resource_loader,
+            Mock(),
+            Mock(),
+            mock_market_data_store_repo,
+        )
+
+        calculator.calculate("USD", "2023-01-01", "2023-01-02")
+
+        saved_market_data = mock_market_data_store_repo.save.call_args.args[0]
+        assert saved_market_data.instrument_ids == ["1000"]
+        assert saved_market_data.get_fx_rates("EURUSD").tolist() == [1.1, 1.1]
+
+    def test_calculate_when_market_data_store_misses_instruments_should_fetch_and_merge_only_missing(self):
+        store_date_index = date_range("2023-01-01", "2023-01-10")
+        stored_market_data = self._make_market_data(store_date_index, instrument_ids=["2000"], fx_pairs=["SEKUSD"])
+        mock_market_data_store_repo = Mock()
+        mock_market_data_store_repo.load.side_effect = lambda: (
+            mock_market_data_store_repo.save.call_args.args[0]
+            if mock_market_data_store_repo.save.called
+            else stored_market_data
+        )
+        self.mock_perfomativ_resource_loader.load_universe_resources.return_value = PerformativResource(
+            fx_rates=FxRatesData(items={"EURUSD": [FxRateData(date="2023-01-01", rate=1.1)]}),
+            prices=PricesData(items={"1000": [PriceData(date="2023-01-01", price=1001)]}),
+        )
+        calculator = FinancialMetricsCalculator(
+            self.calculator._positions_table,
+            self.mock_perfomativ_resource_loader,
+            Mock(),
+            Mock(),
+            mock_market_data_store_repo,
+        )
+
+        calculator.calculate("USD", date(2023, 1, 3), date(2023, 1, 6))
+
+        self.mock_perfomativ_resource_loader.load_universe_resources.assert_called_once_with(
+            ["1000"], ["EURUSD"], date(2023, 1, 1), date(2023, 1, 10)
+        )
+        saved_market_data = mock_market_data_store_repo.save.call_args.args[0]
+        assert saved_market_data.instrument_ids == ["2000", "1000"]
+        assert saved_market_data.fx_pairs == ["SEKUSD", "EURUSD"]
+        assert len(saved_market_data.dates) == len(store_date_index)
+
+    def test_calculate_when_window_ends_after_market_data_store_should_fetch_stored_and_run_universe(self):
+        stored_market_data = self._make_market_data(
+            date_range("2023-01-01", "2023-01-10"), instrument_ids=["1000", "2000"], fx_pairs=["EURUSD"]
+        )
+        mock_market_data_store_repo = Mock()
+        mock_market_data_store_repo.load.side_effect = lambda: (
+            mock_market_data_store_repo.save.call_args.args[0]
+            if mock_market_data_store_repo.save.called
+            else stored_market_data
+        )
+        self.mock_perfomativ_resource_loader.load_universe_resources.return_value = PerformativResource(
+            fx_rates=FxRatesData(items={"EURUSD": [FxRateData(date="2023-01-01", rate=1.1)]}),
+            prices=PricesData(
+                items={
+                    "1000": [PriceData(date="2023-01-01", price=1001)],
+                    "2000": [PriceData(date="2023-01-01", price=2001)],
+                }
+            ),
+        )
+        calculator = FinancialMetricsCalculator(
+            self.calculator._positions_table,
+            self.mock_perfomativ_resource_loader,
+            Mock(),
+            Mock(),
+            mock_market_data_store_repo,
+        )
+
+        calculator.calculate("USD", date(2023, 1, 5), date(2023, 1, 15))
+
+        self.mock_perfomativ_resource_loader.load_universe_resources.assert_called_once_with(
+            ["1000", "2000"], ["EURUSD"], date(2023, 1, 1), date(2023, 1, 15)
+        )
+        saved_market_data = mock_market_data_store_repo.save.call_args.args[0]
+        assert sorted(saved_market_data.instrument_ids) == ["1000", "2000"]
+        assert len(saved_market_data.dates) == 15
+
+    def test_calculate_when_analytics_calculator_supplied_should_attach_analytics(self):
+        self.mock_perfomativ_resource_loader.load_resources.return_value = PerformativResource(
+            fx_rates=FxRatesData(items={"EURUSD": [FxRateData(date="2023-01-01", rate=1.1)]}),
+            prices=PricesData(items={"1000": [PriceData(date="2023-01-01", price=1001)]}),
+        )
+        mock_analytics_calculator = Mock()
+        calculator = FinancialMetricsCalculator(
+            self.calculator._positions_table,
+            self.mock_perfomativ_resource_loader,
+            Mock(),
+            Mock(),
+            analytics_calculator=mock_analytics_calculator,
+        )
+
+        actual = calculator.calculate("USD", "2023-01-01", "2023-01-02")
+
+        mock_analytics_calculator.calculate.assert_called_once_with(actual)
+        assert actual.analytics == mock_analytics_calculator.calculate.return_value
+
+    def test_calculate_when_analytics_calculator_not_supplied_should_not_attach_analytics(self):
+        self.mock_perfomativ_resource_loader.load_resources.return_value = PerformativResource(
+            fx_rates=FxRatesData(items={"EURUSD": [FxRateData(date="2023-01-01", rate=1.1)]}),
+            prices=PricesData(items={"1000": [PriceData(date="2023-01-01", price=1001)]}),
+        )
+
+        actual = self.calculator.calculate("USD", "2023-01-01", "2023-01-02")
+
+        assert actual.analytics is None
+
+    def test_calculate_when_basket_groupings_supplied_should_attach_sub_baskets(self):
+        self.mock_perfomativ_resource_loader.load_resources.return_value = PerformativResource(
+            fx_rates=FxRatesData(items={"EURUSD": [FxRateData(date="2023-01-01", rate=1.1)]}),
+            prices=PricesData(items={"1000": [PriceData(date="2023-01-01", price=1001)]}),
+        )
+        mock_basket_calculator = Mock()
+        calculator = FinancialMetricsCalculator(
+            self.calculator._positions_table,
+            self.mock_perfomativ_resource_loader,
+            Mock(),
+            mock_basket_calculator,
+            basket_groupings=[BasketGrouping.INSTRUMENT, BasketGrouping.CURRENCY],
+        )
+
+        actual = calculator.calculate("USD", "2023-01-01", "2023-01-02")
+
+        group_keys = mock_basket_calculator.calculate_groups.call_args.args[1]
+        assert list(group_keys) == ["instrument", "currency"]
+        assert group_keys["instrument"].tolist() == ["1000"]
+        assert group_keys["currency"].tolist() == ["EUR"]
+        assert actual.sub_baskets == mock_basket_calculator.calculate_groups.return_value
+
+    def test_calculate_scenarios_should_evaluate_scenarios_over_loaded_market_data(self):
+        self.mock_perfomativ_resource_loader.load_resources.return_value = PerformativResource(
+            fx_rates=FxRatesData(items={"EURUSD": [FxRateData(date="2023-01-01", rate=1.1)]}),
+            prices=PricesData(items={"1000": [PriceData(date="2023-01-01", price=1001)]}),
+        )
+        mock_scenario_calculator = Mock()
+        calculator = FinancialMetricsCalculator(
+            self.calculator._positions_table,
+            self.mock_perfomativ_resource_loader,
+            scenario_calculator=mock_scenario_calculator,
+        )
+        scenarios = [Scenario(name="base"), Scenario(name="eur down", fx_shocks={"EUR": -0.1})]
+
+        actual = calculator.calculate_scenarios("USD", "2023-01-01", "2023-01-02", scenarios)
+
+        self.mock_perfomativ_resource_loader.load_resources.assert_called_once()
+        positions_table, market_data, target_currency, _, actual_scenarios = (
+            mock_scenario_calculator.calculate.call_args.args
+        )
+        assert positions_table is self.calculator._positions_table
+        assert market_data.get_fx_rates("EURUSD").tolist() == [1.1, 1.1]
+        assert (target_currency, actual_scenarios) == ("USD", scenarios)
+        assert actual == mock_scenario_calculator.calculate.return_value
+
+    def test_calculate_chunked_should_stream_the_payload_of_calculate(self, tmp_path):
+        positions_data = PositionsData(
+            positions=[
+                PositionDTO(
+                    id=position_id,
+                    open_date=open_date,
+                    close_date=close_date,
+                    instrument_id=instrument_id,
+                    instrument_currency=currency,
+                    open_price=90.0,
+                    close_price=95.0 if close_date else None,
+                    quantity=10,
+                )
+                for position_id, open_date, close_date, instrument_id, currency in [
+                    (1, "2023-01-01", None, 1000, "EUR"),
+                    (2, "2023-01-02", "2023-01-03", 1001, "USD"),
+                    (3, "2022-12-01", None, 1001, "USD"),
+                ]
+            ]
+        )
+        resource = PerformativResource(
+            fx_rates=FxRatesData(
+                items={"EURUSD": [FxRateData(date="2023-01-01", rate=1.1), FxRateData(date="2023-01-03", rate=1.2)]}
+            ),
+            prices=PricesData(
+                items={
+                    "1000": [PriceData(date="2023-01-01", price=100.0), PriceData(date="2023-01-02", price=101.0)],
+                    "1001": [PriceData(date="2023-01-01", price=10.0), PriceData(date="2023-01-04", price=12.0)],
+                }
+            ),
+        )
+        spill_repo = SpillRepo(str(tmp_path / "spill"))
+        expected = FinancialMetricsCalculator(positions_data).calculate("USD", "2023-01-01", "2023-01-04", resource)
+
+        actual = FinancialMetricsCalculator(positions_data).calculate_chunked(
+            "USD", "2023-01-01", "2023-01-04", spill_repo, 2, 8, resource
+        )
+
+        actual_payload = "".join(actual.iter_submit_api_payload(spill_repo.iter_chunks(), 8))
+        assert len(list(spill_repo.iter_chunks())) == 2
+        assert json.loads(actual_payload) == json.loads(expected.to_submit_api_payload(8).model_dump_json())
+
+    def test_calculate_when_calculator_reused_across_threads_should_return_the_same_payload(self):
+        positions_data = PositionsData(
+            positions=[
+                PositionDTO(
+                    id=position_id,
+                    open_date=open_date,
+                    close_date=close_date,
+                    instrument_id=instrument_id,
+                    instrument_currency=currency,
+                    open_price=90.0,
+                    close_price=95.0 if close_date else None,
+                    quantity=10,
+                )
+                for position_id, open_date, close_date, instrument_id, currency in [
+                    (1, "2023-01-01", None, 1000, "EUR"),
+                    (2, "2023-01-02", "2023-01-03", 1001, "USD"),
+                    (3, "2022-12-01", None, 1001, "USD"),
+                ]
+            ]
+        )
+        resource = PerformativResource(
+            fx_rates=FxRatesData(
+                items={"EURUSD": [FxRateData(date="2023-01-01", rate=1.1), FxRateData(date="2023-01-03", rate=1.2)]}
+            ),
+            prices=PricesData(
+                items={
+                    "1000": [PriceData(date="2023-01-01", price=100.0), PriceData(date="2023-01-02", price=101.0)],
+                    "1001": [PriceData(date="2023-01-01", price=10.0), PriceData(date="2023-01-04", price=12.0)],
+                }
+            ),
+        )
+        items = {"fx-rates": resource.fx_rates.model_dump(mode="json")["items"]}
+        items["prices"] = resource.prices.model_dump(mode="json")["items"]
+
+        async def handler(request: Request) -> Response:
+            await sleep(0.001)
+            key = request.url.params.get("instrument_id") or request.url.params["pairs"]
+            return Response(200, json={key: items[request.url.path.strip("/")][key]})
+
+        # one API repo and client policy serve the market data requests of every thread
+        performativ_api_repo = PerformativApiRepo(
+            client=AsyncClient(transport=MockTransport(handler), base_url="http://stand-in"), max_concurrency=2
+        )
+        calculator = FinancialMetricsCalculator(
+            positions_data,
+            PerformativResourceLoader(positions_data, performativ_api_repo),
+            basket_groupings=[BasketGrouping.CURRENCY],
+        )
+        expected = json.loads(
+            FinancialMetricsCalculator(positions_data, basket_groupings=[BasketGrouping.CURRENCY])
+            .calculate("USD", "2023-01-01", "2023-01-04", resource)
+            .to_submit_api_payload(8)
+            .model_dump_json()
+        )
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            actual = list(
+                executor.map(
+                    lambda _: calculator.calculate("USD", date(2023, 1, 1), date(2023, 1, 4))
+                    .to_submit_api_payload(8)
+                    .model_dump_json(),
+                    range(8),
+                )
+            )
+
+        assert [json.loads(payload) for payload in actual] == [expected] * 8
+
+    def test_calculate_when_event_basket_engine_should_not_sum_positions_in_basket_calculator(self):
+        self.mock_perfomativ_resource_loader.load_resources.return_value = PerformativResource(
+            fx_rates=FxRatesData(items={"EURUSD": [FxRateData(date="2023-01-01", rate=1.1)]}),
+            prices=PricesData(items={"1000": [PriceData(date="2023-01-01", price=1001)]}),
+        )
+        mock_basket_calculator = Mock()
+        mock_event_basket_calculator = Mock()
+        calculator = FinancialMetricsCalculator(
+            self.calculator._positions_table,
+            self.mock_perfomativ_resource_loader,
+            basket_calculator=mock_basket_calculator,
+            basket_engine=BasketEngine.EVENT,
+            event_basket_calculator=mock_event_basket_calculator,
+        )
+
+        actual = calculator.calculate("USD", "2023-01-01", "2023-01-02")
+
+        positions_table, market_data, target_currency, date_index = (
+            mock_event_basket_calculator.calculate.call_args.args
+        )
+        assert positions_table is self.calculator._positions_table
+        assert market_data.get_prices("1000").tolist() == [1001.0, 1001.0]
+        assert (target_currency, len(date_index)) == ("USD", 2)
+        assert actual.basket == mock_event_basket_calculator.calculate.return_value
+        assert list(actual.positions) == [1]
+        mock_basket_calculator.calculate.assert_not_called()
+
+    def test_calculate_windows_should_match_a_calculation_per_window(self):
+        positions_data = PositionsData(
+            positions=[
+                PositionDTO(
+                    id=position_id,
+                    open_date=open_date,
+                    close_date=close_date,
+                    instrument_id=1000,
+                    instrument_currency=currency,
+                    open_price=90.0,
+                    close_price=95.0 if close_date else None,
+                    quantity=10,
+                )
+                for position_id, open_date, close_date, currency in [
+                    (1, "2022-12-20", None, "EUR"),
+                    (2, "2023-01-02", "2023-01-03", "USD"),
+                    (3, "2023-01-03", None, "USD"),
+                    (4, "2023-01-01", "2023-01-04", "EUR"),
+                ]
+            ]
+        )
+        resource = PerformativResource(
+            fx_rates=FxRatesData(
+                items={
+                    "EURUSD": [
+                        FxRateData(date=day.date(), rate=1.0 + day.day / 100)
+                        for day in date_range("2022-12-01", "2023-01-05")
+                    ]
+                }
+            ),
+            prices=PricesData(
+                items={
+                    "1000": [
+                        PriceData(date=day.date(), price=100.0 + day.day)
+                        for day in date_range("2022-12-01", "2023-01-05")
+                    ]
+                }
+            ),
+        )
+        windows = [
+            ReportingWindow(name="inception", start_date=date(2023, 1, 1), end_date=date(2023, 1, 5)),
+            ReportingWindow(name="from second", start_date=date(2023, 1, 2), end_date=date(2023, 1, 5)),
+            ReportingWindow(name="from third", start_date=date(2023, 1, 3), end_date=date(2023, 1, 4)),
+            ReportingWindow(name="from fourth", start_date=date(2023, 1, 4), end_date=date(2023, 1, 5)),
+        ]
+
+        actual = FinancialMetricsCalculator(positions_data).calculate_windows("USD", windows, resource)
+
+        assert list(actual) == ["inception", "from second", "from third", "from fourth"]
+        for window in windows:
+            expected = FinancialMetricsCalculator(positions_data).calculate(
+                "USD", window.start_date, window.end_date, resource
+            )
+            assert json.loads(actual[window.name].to_submit_api_payload(8).model_dump_json()) == json.loads(
+                expected.to_submit_api_payload(8).model_dump_json()
+            ), window.name
+
+    def test_update_watch_should_match_a_full_calculation_of_the_edited_positions(self):
+        def make_positions_table(positions):
+            return PositionsTable.from_positions_data(
+                PositionsData(
+                    positions=[
+                        PositionDTO(
+                            id=position_id,
+                            open_date=open_date,
+                            close_date=close_date,
+                            instrument_id=instrument_id,
+                            instrument_currency=currency,
+                            open_price=90.0,
+                            close_price=95.0 if close_date else None,
+                            quantity=quantity,
+                        )
+                        for position_id, open_date, close_date, instrument_id, currency, quantity in positions
+                    ]
+                )
+            )
+
+        resource = PerformativResource(
+            fx_rates=FxRatesData(
+                items={
+                    "EURUSD": [
+                        FxRateData(date=day.date(), rate=1.0 + day.day / 100)
+                        for day in date_range("2022-12-01", "2023-01-05")
+                    ]
+                }
+            ),
+            prices=PricesData(
+                items={
+                    instrument_id: [
+                        PriceData(date=day.date(), price=offset + day.day)
+                        for day in date_range("2022-12-01", "2023-01-05")
+                    ]
+                    for instrument_id, offset in [("1000", 100.0), ("2000", 50.0)]
+                }
+            ),
+        )
+        initial_table = make_positions_table(
+            [
+                (1, "2022-12-20", None, 1000, "EUR", 10),
+                (2, "2023-01-02", "2023-01-03", 1000, "USD", 10),
+                (3, "2023-01-03", None, 1000, "USD", 10),
+            ]
+        )
+        edited_table = make_positions_table(
+            [
+                (3, "2023-01-03", None, 1000, "USD", 20),
+                (1, "2022-12-20", None, 1000, "EUR", 10),
+                (4, "2023-01-01", "2023-01-04", 1000, "EUR", 5),
+            ]
+        )
+        new_instrument_table = make_positions_table(
+            [(1, "2022-12-20", None, 1000, "EUR", 10), (5, "2023-01-02", None, 2000, "USD", 3)]
+        )
+        mock_resource_loader = Mock()
+        mock_resource_loader.load_universe_resources.return_value = PerformativResource(
+            fx_rates=FxRatesData(items={}), prices=PricesData(items={"2000": resource.prices.items["2000"]})
+        )
+        calculator = FinancialMetricsCalculator(initial_table, mock_resource_loader)
+
+        watch_state, _ = calculator.start_watch(
+            "USD",
+            date(2023, 1, 1),
+            date(2023, 1, 5),
+            PerformativResource(
+                fx_rates=resource.fx_rates, prices=PricesData(items={"1000": resource.prices.items["1000"]})
+            ),
+        )
+        actual_edited = calculator.update_watch("USD", watch_state, edited_table)
+        mock_resource_loader.load_universe_resources.assert_not_called()
+        calculator._position_calculator.calculate = Mock(wraps=calculator._position_calculator.calculate)
+        actual_new_instrument = calculator.update_watch("USD", watch_state, new_instrument_table)
+
+        mock_resource_loader.load_universe_resources.assert_called_once_with(
+            ["2000"], [], date(2023, 1, 1), date(2023, 1, 5)
+        )
+        assert calculator._position_calculator.calculate.call_count == 1
+        for actual, positions_table in [(actual_edited, edited_table), (actual_new_instrument, new_instrument_table)]:
+            expected = FinancialMetricsCalculator(positions_table).calculate(
+                "USD", date(2023, 1, 1), date(2023, 1, 5), resource
+            )
+            assert json.loads(actual.to_submit_api_payload(8).model_dump_json()) == json.loads(
+                expected.to_submit_api_payload(8).model_dump_json()
+            )
+
+    def test_calculate_streamed_should_yield_the_records_of_the_calculated_payload(self):
+        positions_table = PositionsTable.from_records(
+            [
+                {
+                    "id": position_id,
+                    "open_date": open_date,
+                    "close_date": close_date,
+                    "open_price": 90.0,
+                    "close_price": 95.0 if close_date else None,
+                    "quantity": 10,
+                    "instrument_id": 1000,
+                    "instrument_currency": currency,
+                    "tag": None,
+                }
+                for position_id, open_date, close_date, currency in [
+                    (1, "2022-12-20", None, "EUR"),
+                    (2, "2023-01-02", "2023-01-03", "USD"),
+                ]
+            ]
+        )
+        resource = PerformativResource(
+            fx_rates=FxRatesData(
+                items={
+                    "EURUSD": [FxRateData(date=day.date(), rate=1.1) for day in date_range("2023-01-01", "2023-01-04")]
+                }
+            ),
+            prices=PricesData(
+                items={
+                    "1000": [
+                        PriceData(date=day.date(), price=100.0 + day.day)
+                        for day in date_range("2023-01-01", "2023-01-04")
+                    ]
+                }
+            ),
+        )
+
+        actual = [
+            json.loads(record)
+            for record in FinancialMetricsCalculator(positions_table).calculate_streamed(
+                "USD", date(2023, 1, 1), date(2023, 1, 4), 8, resource
+            )
+        ]
+
+        expected = json.loads(
+            FinancialMetricsCalculator(positions_table)
+            .calculate("USD", date(2023, 1, 1), date(2023, 1, 4), resource)
+            .to_submit_api_payload(8)
+            .model_dump_json()
+        )
+        assert actual == [
+            {"id": "1", "position": expected["positions"]["1"]},
+            {"id": "2", "position": expected["positions"]["2"]},
+            {"basket": expected["basket"], "dates": expected["dates"]},
+        ]
+
+    def test_calculate_windows_when_names_repeat_should_raise_expected_exception_message(self):
+        window = ReportingWindow(name="mtd", start_date=date(2023, 1, 1), end_date=date(2023, 1, 5))
+
+        with pytest.raises(FinancialMetricsCalculatorException) as ex:
+            self.calculator.calculate_windows("USD", [window, window])
+
+        assert "Reporting window names must be unique" in str(ex.value)
@@ -0,0 +1,70 @@
+import pytest
+from numpy import nan, testing
+from pandas import date_range
+
+from models.market_data_fill_policy import MarketDataFillPolicy
+from models.performativ_api import FxRateData, FxRatesData, PriceData, PricesData
+from models.performativ_resource import PerformativResource
+from services.market_data_aligner import MarketDataAligner
+
+
+class TestMarketDataAligner:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.test_date_index = date_range("2023-01-06", "2023-01-10")
+        self.test_resource = PerformativResource(
+            fx_rates=FxRatesData(
+                items={
+                    "EURUSD": [FxRateData(date=f"2023-01-{day:02d}", rate=1.0 + day / 100) for day in range(6, 11)],
+                    "GBPUSD": [
+                        FxRateData(date="2023-01-09", rate=1.29),
+                        FxRateData(date="2023-01-05", rate=1.25),
+                    ],
+                }
+            ),
+            prices=PricesData(
+                items={
+                    "1000": [
+                        PriceData(date="2023-01-06", price=100.0),
+                        PriceData(date="2023-01-09", price=103.0),
+                        PriceData(date="2023-01-11", price=105.0),
+                    ],
+                    "1001": [],
+                    "1002": [
+                        PriceData(date="2023-01-07", price=10.0),
+                        PriceData(date="2023-01-07", price=11.0),
+                    ],
+                }
+            ),
+        )
+
+    def test_align_when_forward_fill_should_fill_gaps_with_last_known_value(self):
+        actual = MarketDataAligner(MarketDataFillPolicy.FORWARD_FILL).align(self.test_resource, self.test_date_index)
+
+        testing.assert_array_equal(actual.get_prices("1000"), [100.0, 100.0, 100.0, 103.0, 103.0])
+        testing.assert_array_equal(actual.get_prices("1001"), [nan] * 5)
+        testing.assert_array_equal(actual.get_prices("1002"), [nan, 11.0, 11.0, 11.0, 11.0])
+        testing.assert_array_equal(actual.get_fx_rates("GBPUSD"), [1.25, 1.25, 1.25, 1.29, 1.29])
+        testing.assert_allclose(actual.get_fx_rates("EURUSD"), [1.06, 1.07, 1.08, 1.09, 1.10])
+
+    def test_align_when_no_fill_should_leave_gaps_empty(self):
+        actual = MarketDataAligner(MarketDataFillPolicy.NONE).align(self.test_resource, self.test_date_index)
+
+        testing.assert_array_equal(actual.get_prices("1000"), [100.0, nan, nan, 103.0, nan])
+        testing.assert_array_equal(actual.get_fx_rates("GBPUSD"), [nan, nan, nan, 1.29, nan])
+
+    def test_align_should_index_by_calendar_dates(self):
+        actual = MarketDataAligner().align(self.test_resource, self.test_date_index)
+
+        testing.assert_array_equal(actual.dates, self.test_date_index.values.astype("datetime64[D]"))
+        assert actual.instrument_ids == ["1000", "1001", "1002"]
+        assert actual.fx_pairs == ["EURUSD", "GBPUSD"]
+        assert actual.prices.shape == (3, 5)
+
+    def test_align_when_resource_empty_should_return_empty_market_data(self):
+        actual = MarketDataAligner().align(
+            PerformativResource(fx_rates=FxRatesData(items={}), prices=PricesData(items={})), self.test_date_index
+        )
+
+        assert actual.prices.shape == (0, 5)
+        assert actual.fx_rates.shape == (0, 5)
@@ -0,0 +1,92 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from services.memory_tracker import MemoryTracker, MemoryTrackerException, estimate_run_bytes, get_rss_bytes
+
+
+class TestMemoryTracker:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.tracker = MemoryTracker(trace_allocations=True)
+
+    def test_stage_when_tracing_should_record_peak_of_the_stage(self):
+        with self.tracker.stage("allocate"):
+            buffer = bytearray(8 * 1024 * 1024)
+            del buffer
+        with self.tracker.stage("idle"):
+            pass
+
+        allocate, idle = self.tracker.stages
+        assert allocate.stage == "allocate"
+        assert allocate.traced_peak_bytes >= 8 * 1024 * 1024
+        assert idle.traced_peak_bytes < 8 * 1024 * 1024
+        assert allocate.rss_peak_bytes >= allocate.rss_before_bytes > 0
+
+    def test_stage_when_disabled_should_not_record(self):
+        tracker = MemoryTracker()
+
+        with tracker.stage("calculate"):
+            pass
+
+        assert tracker.stages == []
+
+    def test_stage_when_over_budget_should_raise_expected_error_message(self):
+        tracker = MemoryTracker(budget_bytes=1024)
+
+        with pytest.raises(MemoryTrackerException) as ex:
+            with tracker.stage("calculate"):
+                pass
+
+        assert "Stage calculate peaked at" in str(ex.value)
+        assert "over the memory budget of 0.0 MiB" in str(ex.value)
+
+    def test_stage_when_recorded_from_another_thread_should_raise_expected_error_message(self):
+        def record():
+            with self.tracker.stage("calculate"):
+                pass
+
+        record()
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            with pytest.raises(MemoryTrackerException) as ex:
+                executor.submit(record).result()
+
+        assert "The memory tracker records the stages of a single thread" in str(ex.value)
+        assert len(self.tracker.stages) == 1
+
+    def test_stage_when_disabled_should_allow_several_threads(self):
+        tracker = MemoryTracker()
+
+        def record():
+            with tracker.stage("calculate"):
+                pass
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            list(executor.map(lambda _: record(), range(4)))
+
+        assert tracker.stages == []
+
+    def test_check_budget_when_estimate_exceeds_budget_should_raise_expected_error_message(self):
+        tracker = MemoryTracker(budget_bytes=get_rss_bytes() + estimate_run_bytes(1000, 100))
+
+        tracker.check_budget(10, 100)
+        with pytest.raises(MemoryTrackerException) as ex:
+            tracker.check_budget(100_000, 700)
+
+        assert "for 100000 positions over 700 dates exceeds the memory budget" in str(ex.value)
+
+    def test_get_report_should_return_stages_as_json(self):
+        with self.tracker.stage("payload"):
+            pass
+
+        actual = json.loads(self.tracker.get_report())
+
+        assert [stage["stage"] for stage in actual["stages"]] == ["payload"]
+        assert set(actual["stages"][0]) == {
+            "stage",
+            "rss_before_bytes",
+            "rss_after_bytes",
+            "rss_peak_bytes",
+            "traced_peak_bytes",
+        }
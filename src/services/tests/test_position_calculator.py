@@ -2,6 +2,7 @@ import pytest
 from numpy import nan
 from pandas import DataFrame, Series, date_range, isna, testing
 
+from entities.positions_table import PositionsTable
 from models.positions_data import PositionDTO
 from services.position_calculator import PositionCalculator
 
@@ -31,25 +32,31 @@ class TestPositionCalculator:
         self.calculator = PositionCalculator()
 
     def test_calculate_open_value_should_return_expected_series(self):
-        self.calculator.load_calculation_requirements(self.test_position, self.test_fx_rates, self.test_prices)
+        requirements = self.calculator.load_calculation_requirements(
+            self.test_position, self.test_fx_rates, self.test_prices
+        )
 
-        actual = self.calculator._calculate_open_value()
+        actual = self.calculator._calculate_open_value(requirements)
 
         assert actual == 1030.2
 
     def test_calculate_close_value_should_return_expected_series(self):
-        self.calculator.load_calculation_requirements(self.test_position, self.test_fx_rates, self.test_prices)
+        requirements = self.calculator.load_calculation_requirements(
+            self.test_position, self.test_fx_rates, self.test_prices
+        )
 
-        actual = self.calculator._calculate_close_value()
+        actual = self.calculator._calculate_close_value(requirements)
 
         assert actual == 1092
 
     def test_calculate_close_value_when_none_should_return_nan(self):
         self.test_position.close_price = None
         self.test_position.close_date = None
-        self.calculator.load_calculation_requirements(self.test_position, self.test_fx_rates, self.test_prices)
+        requirements = self.calculator.load_calculation_requirements(
+            self.test_position, self.test_fx_rates, self.test_prices
+        )
 
-        actual = self.calculator._calculate_close_value()
+        actual = self.calculator._calculate_close_value(requirements)
 
         assert isna(actual)
 
@@ -64,10 +71,12 @@ class TestPositionCalculator:
     )
     def test_calculate_price_local_should_return_expected_series(self, start_date, end_date, expected):
         test_date_index = date_range(start_date, end_date)
-        self.calculator.load_calculation_requirements(self.test_position, self.test_fx_rates, self.test_prices)
+        requirements = self.calculator.load_calculation_requirements(
+            self.test_position, self.test_fx_rates, self.test_prices
+        )
         expected_series = Series(expected, index=test_date_index)
 
-        actual = self.calculator.calculate_price_local(test_date_index)
+        actual = self.calculator.calculate_price_local(requirements, test_date_index)
 
         testing.assert_series_equal(actual, expected_series, check_names=False)
 
@@ -87,9 +96,11 @@ class TestPositionCalculator:
             index=date_range("2023-01-01", "2023-01-10"),
         ).reindex(test_date_index)
         expected_series = Series(expected, index=test_date_index)
-        self.calculator.load_calculation_requirements(self.test_position, self.test_fx_rates, self.test_prices)
+        requirements = self.calculator.load_calculation_requirements(
+            self.test_position, self.test_fx_rates, self.test_prices
+        )
 
-        actual = self.calculator.calculate_price(test_date_index, price_local_series)
+        actual = self.calculator.calculate_price(requirements, test_date_index, price_local_series)
 
         testing.assert_series_equal(actual, expected_series, check_names=False)
 
@@ -105,9 +116,11 @@ class TestPositionCalculator:
     def test_calculate_is_open_should_return_expected_series(self, start_date, end_date, expected):
         test_date_index = date_range(start_date, end_date)
         expected_series = Series(expected, index=test_date_index)
-        self.calculator.load_calculation_requirements(self.test_position, self.test_fx_rates, self.test_prices)
+        requirements = self.calculator.load_calculation_requirements(
+            self.test_position, self.test_fx_rates, self.test_prices
+        )
 
-        actual = self.calculator.calculate_is_open(test_date_index)
+        actual = self.calculator.calculate_is_open(requirements, test_date_index)
 
         testing.assert_series_equal(actual, expected_series, check_names=False)
 
@@ -126,9 +139,11 @@ class TestPositionCalculator:
             [0.0, 1.0, 1.0, 1.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0], index=date_range("2023-01-01", "2023-01-10")
         ).reindex(test_date_index)
         expected_series = Series(expected, index=test_date_index)
-        self.calculator.load_calculation_requirements(self.test_position, self.test_fx_rates, self.test_prices)
+        requirements = self.calculator.load_calculation_requirements(
+            self.test_position, self.test_fx_rates, self.test_prices
+        )
 
-        actual = self.calculator.calculate_quantity(test_date_index, is_open_series)
+        actual = self.calculator.calculate_quantity(requirements, test_date_index, is_open_series)
 
         testing.assert_series_equal(actual, expected_series, check_names=False)
 
@@ -151,9 +166,13 @@ class TestPositionCalculator:
             [0.0, 10.0, 10.0, 10.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0], index=date_range("2023-01-01", "2023-01-10")
         ).reindex(test_date_index)
         expected_series = Series(expected, index=test_date_index)
-        self.calculator.load_calculation_requirements(self.test_position, self.test_fx_rates, self.test_prices)
+        requirements = self.calculator.load_calculation_requirements(
+            self.test_position, self.test_fx_rates, self.test_prices
+        )
 
-        actual = self.calculator.calculate_value_local(test_date_index, price_local_series, quantity_series)
+        actual = self.calculator.calculate_value_local(
+            requirements, test_date_index, price_local_series, quantity_series
+        )
 
         testing.assert_series_equal(actual, expected_series, check_names=False)
 
@@ -172,9 +191,11 @@ class TestPositionCalculator:
         value_local_series = Series(
             [0.0, 1010.0, 1020.0, 1030.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0], index=date_range("2023-01-01", "2023-01-10")
         ).reindex(test_date_index)
-        self.calculator.load_calculation_requirements(self.test_position, self.test_fx_rates, self.test_prices)
+        requirements = self.calculator.load_calculation_requirements(
+            self.test_position, self.test_fx_rates, self.test_prices
+        )
 
-        actual = self.calculator.calculate_value(test_date_index, value_local_series)
+        actual = self.calculator.calculate_value(requirements, test_date_index, value_local_series)
 
         testing.assert_series_equal(actual, expected_series, check_names=False)
 
@@ -193,9 +214,11 @@ class TestPositionCalculator:
         value_series = Series(
             [0.0, 1020.1, 1040.4, 1060.9, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0], index=date_range("2023-01-01", "2023-01-10")
         ).reindex(test_date_index)
-        self.calculator.load_calculation_requirements(self.test_position, self.test_fx_rates, self.test_prices)
+        requirements = self.calculator.load_calculation_requirements(
+            self.test_position, self.test_fx_rates, self.test_prices
+        )
 
-        actual = self.calculator.calculate_value_start(test_date_index, value_series)
+        actual = self.calculator.calculate_value_start(requirements, test_date_index, value_series)
 
         testing.assert_series_equal(actual, expected_series, check_names=False)
 
@@ -214,9 +237,11 @@ class TestPositionCalculator:
         value_series = Series(
             [0.0, 1020.1, 1040.4, 1060.9, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0], index=date_range("2023-01-01", "2023-01-10")
         ).reindex(test_date_index)
-        self.calculator.load_calculation_requirements(self.test_position, self.test_fx_rates, self.test_prices)
+        requirements = self.calculator.load_calculation_requirements(
+            self.test_position, self.test_fx_rates, self.test_prices
+        )
 
-        actual = self.calculator.calculate_value_end(test_date_index, value_series)
+        actual = self.calculator.calculate_value_end(requirements, test_date_index, value_series)
 
         testing.assert_series_equal(actual, expected_series, check_names=False)
 
@@ -238,9 +263,11 @@ class TestPositionCalculator:
         value_start = Series(
             [0.0, 1030.2, 1020.1, 1040.4, 1060.9, 0.0, 0.0, 0.0, 0.0, 0.0], index=date_range("2023-01-01", "2023-01-10")
         ).reindex(test_date_index)
-        self.calculator.load_calculation_requirements(self.test_position, self.test_fx_rates, self.test_prices)
+        requirements = self.calculator.load_calculation_requirements(
+            self.test_position, self.test_fx_rates, self.test_prices
+        )
 
-        actual = self.calculator.calculate_return_per_period(test_date_index, value_end, value_start)
+        actual = self.calculator.calculate_return_per_period(requirements, test_date_index, value_end, value_start)
 
         testing.assert_series_equal(actual, expected_series, check_names=False)
 
@@ -266,10 +293,12 @@ class TestPositionCalculator:
         value_start_series = Series(
             [0.0, 1030.2, 1020.1, 1040.4, 1060.9, 0.0, 0.0, 0.0, 0.0, 0.0], index=date_range("2023-01-01", "2023-01-10")
         ).reindex(test_date_index)
-        self.calculator.load_calculation_requirements(self.test_position, self.test_fx_rates, self.test_prices)
+        requirements = self.calculator.load_calculation_requirements(
+            self.test_position, self.test_fx_rates, self.test_prices
+        )
 
         actual = self.calculator.calculate_return_per_period_percentage(
-            test_date_index, value_start_series, return_per_period_series
+            requirements, test_date_index, value_start_series, return_per_period_series
         )
 
         testing.assert_series_equal(actual, expected_series, check_names=False)
@@ -290,9 +319,11 @@ class TestPositionCalculator:
             [0.0, -0.009803921569, 0.019900009803, 0.019703960015, 0.029314732774, 0.0, 0.0, 0.0, 0.0, 0.0],
             index=test_date_index,
         )
-        self.calculator.load_calculation_requirements(self.test_position, self.test_fx_rates, self.test_prices)
+        requirements = self.calculator.load_calculation_requirements(
+            self.test_position, self.test_fx_rates, self.test_prices
+        )
 
-        actual = self.calculator.calculate(test_date_index)
+        actual = self.calculator.calculate(requirements, test_date_index)
 
         testing.assert_series_equal(actual.is_open, expected_is_open_series, check_names=False)
         testing.assert_series_equal(actual.price, expected_price_series, check_names=False)
@@ -301,3 +332,19 @@ class TestPositionCalculator:
         testing.assert_series_equal(
             actual.return_per_period_percentage, expected_return_per_period_percentage_series, check_names=False
         )
+
+    def test_calculate_when_position_row_supplied_should_match_position_dto(self):
+        test_date_index = date_range("2023-01-01", "2023-01-10")
+        test_position_row = PositionsTable.from_records([self.test_position.model_dump()]).get_position(0)
+        requirements = self.calculator.load_calculation_requirements(
+            self.test_position, self.test_fx_rates, self.test_prices
+        )
+        expected = self.calculator.calculate(requirements, test_date_index)
+        requirements = self.calculator.load_calculation_requirements(
+            test_position_row, self.test_fx_rates, self.test_prices
+        )
+
+        actual = self.calculator.calculate(requirements, test_date_index)
+
+        testing.assert_series_equal(actual.value_start, expected.value_start)
+        testing.assert_series_equal(actual.return_per_period, expected.return_per_period)
@@ -0,0 +1,86 @@
+import pytest
+from numpy import array, cov, quantile, sqrt, testing
+from pandas import date_range
+
+from entities.market_data import MarketData
+from entities.positions_table import PositionsTable
+from services.risk_calculator import RiskCalculator, RiskCalculatorException
+
+
+class TestRiskCalculator:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.test_date_index = date_range("2023-01-01", "2023-01-06")
+        self.market_data = MarketData(
+            dates=self.test_date_index.values.astype("datetime64[D]"),
+            instrument_ids=["1000", "1001"],
+            prices=array([[100.0, 101.0, 99.0, 102.0, 103.0, 101.0], [50.0, 49.0, 51.0, 52.0, 50.0, 53.0]]),
+            fx_pairs=["EURUSD"],
+            fx_rates=array([[1.1, 1.12, 1.09, 1.1, 1.11, 1.13]]),
+        )
+        self.calculator = RiskCalculator(0.8)
+
+    def _make_positions_table(self, positions: list[tuple[str | None, int, str, int]]) -> PositionsTable:
+        return PositionsTable.from_records(
+            [
+                {
+                    "id": position_id,
+                    "open_date": "2022-12-01",
+                    "close_date": close_date,
+                    "open_price": 1.0,
+                    "close_price": 1.0 if close_date else None,
+                    "quantity": quantity,
+                    "instrument_id": instrument_id,
+                    "instrument_currency": currency,
+                }
+                for position_id, (close_date, instrument_id, currency, quantity) in enumerate(positions)
+            ]
+        )
+
+    def test_calculate_should_match_covariance_and_var_of_the_held_exposures(self):
+        positions_table = self._make_positions_table(
+            [
+                (None, 1000, "EUR", 10),
+                (None, 1000, "EUR", 5),
+                (None, 1001, "USD", -20),
+                # closed before the last date, it is not held
+                ("2023-01-03", 1001, "USD", 100),
+            ]
+        )
+
+        actual = self.calculator.calculate(positions_table, self.market_data, "USD", self.test_date_index)
+
+        unit_values = array([self.market_data.prices[0] * self.market_data.fx_rates[0], self.market_data.prices[1]])
+        returns = unit_values[:, 1:] / unit_values[:, :-1] - 1.0
+        exposures = array([15.0, -20.0]) * unit_values[:, -1]
+        assert actual.instrument_ids == ["1000", "1001"]
+        assert actual.currencies == ["EUR", "USD"]
+        assert actual.observations == 5
+        testing.assert_allclose(actual.exposures, exposures)
+        testing.assert_allclose(actual.covariance, cov(returns))
+        assert actual.portfolio_volatility == pytest.approx(sqrt(exposures @ cov(returns) @ exposures))
+        assert actual.value_at_risk == pytest.approx(-quantile(exposures @ returns, 0.2))
+
+    def test_calculate_when_nothing_held_should_return_no_risk(self):
+        positions_table = self._make_positions_table([("2023-01-02", 1000, "EUR", 10)])
+
+        actual = self.calculator.calculate(positions_table, self.market_data, "USD", self.test_date_index)
+
+        assert actual.instrument_ids == []
+        assert actual.portfolio_volatility == 0.0
+        assert actual.value_at_risk == 0.0
+
+    def test_calculate_when_too_few_dates_should_raise_expected_error_message(self):
+        positions_table = self._make_positions_table([(None, 1000, "EUR", 10)])
+
+        with pytest.raises(RiskCalculatorException) as ex:
+            self.calculator.calculate(positions_table, self.market_data, "USD", self.test_date_index[:2])
+
+        assert "Risk needs at least 3 dates" in str(ex.value)
+
+    @pytest.mark.parametrize("confidence", [0.0, 1.0, 1.5])
+    def test_init_when_confidence_out_of_range_should_raise_expected_error_message(self, confidence):
+        with pytest.raises(RiskCalculatorException) as ex:
+            RiskCalculator(confidence)
+
+        assert "VaR confidence must be between 0 and 1" in str(ex.value)
@@ -0,0 +1,120 @@
+import pytest
+from numpy import array, nan, testing
+from pandas import DataFrame, date_range
+
+from entities.market_data import MarketData
+from entities.positions_table import PositionsTable
+from models.scenario import Scenario, ShockType
+from services.basket_calculator import BasketCalculator
+from services.position_calculator import PositionCalculator
+from services.scenario_calculator import ScenarioCalculator, ScenarioCalculatorException
+
+
+class TestScenarioCalculator:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.test_date_index = date_range("2023-01-01", "2023-01-06")
+        self.test_positions_table = PositionsTable.from_records(
+            [
+                {
+                    "id": 1,
+                    "open_date": "2023-01-02",
+                    "close_date": "2023-01-05",
+                    "open_price": 102.0,
+                    "close_price": 105.0,
+                    "quantity": 10,
+                    "instrument_id": 1000,
+                    "instrument_currency": "EUR",
+                },
+                {
+                    "id": 2,
+                    "open_date": "2022-12-01",
+                    "close_date": None,
+                    "open_price": 50.0,
+                    "close_price": None,
+                    "quantity": 4,
+                    "instrument_id": 1001,
+                    "instrument_currency": "USD",
+                },
+            ]
+        )
+        self.test_market_data = MarketData(
+            dates=self.test_date_index.values.astype("datetime64[D]"),
+            instrument_ids=["1000", "1001"],
+            prices=array(
+                [[100.0, 101.0, 102.0, 103.0, 104.0, 105.0], [50.0, 51.0, nan, 53.0, 54.0, 55.0]],
+            ),
+            fx_pairs=["EURUSD"],
+            fx_rates=array([[1.0, 1.01, 1.02, 1.03, 1.04, 1.05]]),
+        )
+        self.calculator = ScenarioCalculator(position_block_size=1)
+
+    def _calculate_basket(self, market_data: MarketData):
+        position_calculator = PositionCalculator()
+        position_metrics = []
+        for position in self.test_positions_table.iter_positions():
+            fx_rates = market_data.get_fx_rates("EURUSD") if position.instrument_currency == "EUR" else 1.0
+            requirements = position_calculator.load_calculation_requirements(
+                position,
+                DataFrame({"rate": fx_rates}, index=self.test_date_index),
+                DataFrame({"price": market_data.get_prices(str(position.instrument_id))}, index=self.test_date_index),
+            )
+            position_metrics.append(position_calculator.calculate(requirements, self.test_date_index))
+        return BasketCalculator().calculate(position_metrics)
+
+    def _assert_basket_equal(self, actual, expected):
+        for field_name in ("is_open", "value", "return_per_period", "return_per_period_percentage"):
+            testing.assert_allclose(actual.get_values(field_name), expected.get_values(field_name), err_msg=field_name)
+
+    def test_calculate_when_no_shocks_should_match_position_and_basket_calculators(self):
+        actual = self.calculator.calculate(
+            self.test_positions_table, self.test_market_data, "USD", self.test_date_index, [Scenario(name="base")]
+        )
+
+        self._assert_basket_equal(actual["base"], self._calculate_basket(self.test_market_data))
+
+    def test_calculate_when_shocked_should_match_calculators_over_shocked_market_data(self):
+        scenarios = [
+            Scenario(name="eur down", fx_shocks={"EUR": -0.1, "GBP": 0.5}),
+            Scenario(name="prices up", shock_type=ShockType.ADDITIVE, price_shocks={1000: 2.0, 1001: 1.0}),
+        ]
+        fx_shocked_market_data = MarketData(
+            dates=self.test_market_data.dates,
+            instrument_ids=self.test_market_data.instrument_ids,
+            prices=self.test_market_data.prices,
+            fx_pairs=self.test_market_data.fx_pairs,
+            fx_rates=self.test_market_data.fx_rates * 0.9,
+        )
+        price_shocked_market_data = MarketData(
+            dates=self.test_market_data.dates,
+            instrument_ids=self.test_market_data.instrument_ids,
+            prices=self.test_market_data.prices + array([[2.0], [1.0]]),
+            fx_pairs=self.test_market_data.fx_pairs,
+            fx_rates=self.test_market_data.fx_rates,
+        )
+
+        actual = self.calculator.calculate(
+            self.test_positions_table, self.test_market_data, "USD", self.test_date_index, scenarios
+        )
+
+        assert list(actual) == ["eur down", "prices up"]
+        self._assert_basket_equal(actual["eur down"], self._calculate_basket(fx_shocked_market_data))
+        self._assert_basket_equal(actual["prices up"], self._calculate_basket(price_shocked_market_data))
+
+    def test_calculate_when_prices_missing_should_raise_expected_error_message(self):
+        self.test_market_data.instrument_ids = ["1000"]
+        self.test_market_data.prices = self.test_market_data.prices[:1]
+        self.test_market_data.__post_init__()
+
+        with pytest.raises(ScenarioCalculatorException) as ex:
+            self.calculator.calculate(
+                self.test_positions_table, self.test_market_data, "USD", self.test_date_index, [Scenario(name="base")]
+            )
+
+        assert "Prices data is not available for 1001" in str(ex.value)
+
+    def test_init_when_block_size_invalid_should_raise_expected_error_message(self):
+        with pytest.raises(ScenarioCalculatorException) as ex:
+            ScenarioCalculator(position_block_size=0)
+
+        assert "Position block size must be at least 1" in str(ex.value)
@@ -0,0 +1,67 @@
+from datetime import date
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from models.performativ_api import FxRatesData, GetFxRatesParams, GetInstrumentPricesParams, PricesData
+from models.positions_data import PositionDTO
+from services.streaming_resource_loader import StreamingResourceLoader
+
+
+class TestStreamingResourceLoader:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.mock_performativ_api_repo = Mock()
+        self.mock_performativ_api_repo.get_instruments_prices_by_dates = AsyncMock(
+            side_effect=lambda params: PricesData(items={params[0].instrument_id: []})
+        )
+        self.mock_performativ_api_repo.get_fx_rates_by_dates = AsyncMock(
+            side_effect=lambda params: FxRatesData(items={params.pairs: []})
+        )
+        self.test_positions = [
+            self._make_position(1, 1000, "EUR"),
+            self._make_position(2, 1001, "USD"),
+            self._make_position(3, 1000, "EUR"),
+            self._make_position(4, 1002, "GBP"),
+        ]
+        self.loader = StreamingResourceLoader(self.mock_performativ_api_repo)
+
+    def _make_position(self, position_id, instrument_id, currency) -> PositionDTO:
+        return PositionDTO(
+            id=position_id,
+            open_date="2023-01-01",
+            close_date=None,
+            open_price=1.0,
+            close_price=None,
+            quantity=1,
+            instrument_id=instrument_id,
+            instrument_currency=currency,
+        )
+
+    def test_load_should_return_positions_and_request_each_instrument_and_fx_pair_once(self):
+        actual_positions_data, actual_resource = self.loader.load(
+            iter(self.test_positions), "USD", date(2023, 1, 1), date(2023, 12, 31)
+        )
+
+        assert [position.id for position in actual_positions_data.positions] == [1, 2, 3, 4]
+        assert set(actual_resource.prices.items) == {"1000", "1001", "1002"}
+        assert set(actual_resource.fx_rates.items) == {"EURUSD", "GBPUSD"}
+        assert [
+            call.args[0] for call in self.mock_performativ_api_repo.get_instruments_prices_by_dates.call_args_list
+        ] == [
+            [GetInstrumentPricesParams(instrument_id=instrument_id, start_date="20230101", end_date="20231231")]
+            for instrument_id in ("1000", "1001", "1002")
+        ]
+        assert [call.args[0] for call in self.mock_performativ_api_repo.get_fx_rates_by_dates.call_args_list] == [
+            GetFxRatesParams(pairs=pair, start_date="20230101", end_date="20231231") for pair in ("EURUSD", "GBPUSD")
+        ]
+
+    def test_load_when_positions_parsing_failed_should_raise_parsing_error(self):
+        def failing_positions():
+            yield self.test_positions[0]
+            raise ValueError("Fake parsing error")
+
+        with pytest.raises(ValueError) as ex:
+            self.loader.load(failing_positions(), "USD", date(2023, 1, 1), date(2023, 12, 31))
+
+        assert "Fake parsing error" in str(ex.value)
@@ -2,7 +2,12 @@ from unittest.mock import patch
 
 import pytest
 
-from main import main
+from controllers.main_controller import MainControllerException
+from main import main, prefetch
+from models.basket_engine import BasketEngine
+from models.basket_grouping import BasketGrouping
+from models.financial_metrics_export import ExportFormat, ExportLayout
+from models.reporting_window import ReportingPeriod
 
 
 @patch("main.MainController")
@@ -19,7 +24,29 @@ class TestMain:
     def test_main_when_called_without_optional_arguments_should_set_to_default(self, mock_main_controller):
         main(["--positions-file", "data.json"])
 
-        mock_main_controller.assert_called_once_with("data.json", "USD", "2023-01-01", "2024-11-10")
+        mock_main_controller.assert_called_once_with(
+            "data.json",
+            "USD",
+            "2023-01-01",
+            "2024-11-10",
+            export_file=None,
+            export_layout=ExportLayout.LONG,
+            export_format=ExportFormat.ARROW,
+            analytics_window=None,
+            streaming_startup=False,
+            basket_groupings=[],
+            basket_engine=BasketEngine.GROUPBY,
+            memory_report=False,
+            memory_budget_bytes=None,
+            chunk_size=None,
+            report_periods=[],
+            custom_windows=[],
+            spill_dir=None,
+            risk_file=None,
+            var_confidence=0.99,
+            attribution_file=None,
+            attribution_top=10,
+        )
         mock_main_controller.return_value.run.assert_called_once()
 
     def test_main_when_called__arguments_should_set_to_expected_arguments(self, mock_main_controller):
@@ -32,9 +59,190 @@ class TestMain:
             "2023-06-01",
             "--end-date",
             "2024-06-01",
+            "--export-file",
+            "metrics.parquet",
+            "--export-layout",
+            "wide",
+            "--export-format",
+            "parquet",
+            "--analytics-window",
+            "30",
+            "--streaming-startup",
+            "--basket-groups",
+            "currency",
+            "tag",
+            "--basket-engine",
+            "event",
+            "--memory-report",
+            "--memory-budget",
+            "512",
+            "--report-windows",
+            "mtd",
+            "ytd",
+            "--custom-window",
+            "h1",
+            "2023-06-01",
+            "2023-12-31",
+            "--chunk-size",
+            "1000",
+            "--spill-dir",
+            "/tmp/spill",
+            "--risk-file",
+            "risk.json",
+            "--var-confidence",
+            "0.95",
+            "--attribution-file",
+            "attribution.json",
+            "--attribution-top",
+            "3",
         ]
 
         main(args)
 
-        mock_main_controller.assert_called_once_with("data.json", "EUR", "2023-06-01", "2024-06-01")
+        mock_main_controller.assert_called_once_with(
+            "data.json",
+            "EUR",
+            "2023-06-01",
+            "2024-06-01",
+            export_file="metrics.parquet",
+            export_layout=ExportLayout.WIDE,
+            export_format=ExportFormat.PARQUET,
+            analytics_window=30,
+            streaming_startup=True,
+            basket_groupings=[BasketGrouping.CURRENCY, BasketGrouping.TAG],
+            basket_engine=BasketEngine.EVENT,
+            memory_report=True,
+            memory_budget_bytes=512 * 1024 * 1024,
+            chunk_size=1000,
+            report_periods=[ReportingPeriod.MTD, ReportingPeriod.YTD],
+            custom_windows=[("h1", "2023-06-01", "2023-12-31")],
+            spill_dir="/tmp/spill",
+            risk_file="risk.json",
+            var_confidence=0.95,
+            attribution_file="attribution.json",
+            attribution_top=3,
+        )
         mock_main_controller.return_value.run.assert_called_once()
+
+    def test_main_when_watch_should_print_every_result_and_return_none(self, mock_main_controller, capsys):
+        mock_main_controller.return_value.watch.return_value = iter([("run", "submitted"), ("edit", "resubmitted")])
+
+        actual = main(["--positions-file", "data.json", "--watch", "--watch-interval", "2"])
+
+        assert actual is None
+        mock_main_controller.return_value.watch.assert_called_once_with(2.0)
+        mock_main_controller.return_value.run.assert_not_called()
+        assert capsys.readouterr().out.split() == ["run", "submitted", "edit", "resubmitted"]
+
+    def test_main_when_ndjson_output_should_write_every_record_and_return_none(self, mock_main_controller, capsys):
+        mock_main_controller.return_value.stream.return_value = iter(['{"id":"1"}', '{"dates":[]}'])
+
+        actual = main(["--positions-file", "data.json", "--output-format", "ndjson"])
+
+        assert actual is None
+        mock_main_controller.return_value.run.assert_not_called()
+        assert capsys.readouterr().out == '{"id":"1"}\n{"dates":[]}\n'
+
+    def test_main_when_ndjson_output_and_watch_should_raise_system_exit(self, mock_main_controller, capsys):
+        with pytest.raises(SystemExit):
+            main(["--positions-file", "data.json", "--output-format", "ndjson", "--watch"])
+
+        assert "--watch is not available with --output-format ndjson" in capsys.readouterr().err
+        mock_main_controller.assert_not_called()
+
+    def test_main_when_run_fails_should_still_print_memory_report(self, mock_main_controller, capsys):
+        mock_main_controller.return_value.run.side_effect = MainControllerException("Stage calculate peaked")
+        mock_main_controller.return_value.get_memory_report.return_value = "report"
+
+        with pytest.raises(MainControllerException):
+            main(["--positions-file", "data.json", "--memory-report"])
+
+        assert capsys.readouterr().err == "report\n"
+
+    @pytest.mark.parametrize("mode_args", [["--watch"], ["--output-format", "ndjson"]])
+    def test_main_when_watch_or_ndjson_should_print_memory_report(self, mock_main_controller, mode_args, capsys):
+        mock_main_controller.return_value.watch.return_value = iter([])
+        mock_main_controller.return_value.stream.return_value = iter([])
+        mock_main_controller.return_value.get_memory_report.return_value = "report"
+
+        main(["--positions-file", "data.json", "--memory-report", *mode_args])
+
+        assert capsys.readouterr().err == "report\n"
+
+    def test_main_when_memory_budget_not_positive_should_raise_system_exit(self, mock_main_controller, capsys):
+        with pytest.raises(SystemExit):
+            main(["--positions-file", "data.json", "--memory-budget", "0"])
+
+        assert "--memory-budget must be greater than 0" in capsys.readouterr().err
+        mock_main_controller.assert_not_called()
+
+    @pytest.mark.parametrize(
+        "analytics_args, expected_error_message",
+        [
+            (["--analytics-window", "1", "--export-file", "metrics.arrow"], "--analytics-window must be at least 2"),
+            (["--analytics-window", "0", "--export-file", "metrics.arrow"], "--analytics-window must be at least 2"),
+            (["--analytics-window", "20"], "--analytics-window requires --export-file"),
+        ],
+    )
+    def test_main_when_analytics_window_invalid_should_raise_system_exit(
+        self, mock_main_controller, analytics_args, expected_error_message, capsys
+    ):
+        with pytest.raises(SystemExit):
+            main(["--positions-file", "data.json", *analytics_args])
+
+        assert expected_error_message in capsys.readouterr().err
+        mock_main_controller.assert_not_called()
+
+    def test_main_when_chunk_size_not_positive_should_raise_system_exit(self, mock_main_controller, capsys):
+        with pytest.raises(SystemExit):
+            main(["--positions-file", "data.json", "--chunk-size", "0"])
+
+        assert "--chunk-size must be greater than 0" in capsys.readouterr().err
+        mock_main_controller.assert_not_called()
+
+
+@patch("main.PrefetchController")
+class TestPrefetch:
+    def test_prefetch_when_called_without_optional_arguments_should_set_to_default(self, mock_prefetch_controller):
+        prefetch(["--positions-file", "data.json"])
+
+        mock_prefetch_controller.assert_called_once_with(
+            "2023-01-01",
+            "2024-11-10",
+            ["USD"],
+            path_to_positions_file="data.json",
+            instrument_ids=[],
+            currencies=[],
+            store_dir=None,
+        )
+        mock_prefetch_controller.return_value.run.assert_called_once()
+
+    def test_prefetch_when_called_with_arguments_should_set_to_expected_arguments(self, mock_prefetch_controller):
+        prefetch(
+            [
+                "--instruments",
+                "1000",
+                "1001",
+                "--currencies",
+                "EUR",
+                "--target-currencies",
+                "USD",
+                "GBP",
+                "--start-date",
+                "2024-01-01",
+                "--end-date",
+                "2024-06-01",
+                "--store-dir",
+                "/tmp/market-data",
+            ]
+        )
+
+        mock_prefetch_controller.assert_called_once_with(
+            "2024-01-01",
+            "2024-06-01",
+            ["USD", "GBP"],
+            path_to_positions_file=None,
+            instrument_ids=["1000", "1001"],
+            currencies=["EUR"],
+            store_dir="/tmp/market-data",
+        )